@@ -1,130 +1,70 @@
 import pygame
-import tools
+import config
 import population
-import environment
-import health
+import rendering
+import scheduler
+import overlay
+import profiling
 import numpy as np
 
 
-# TODO implement frame counter and limit rates to 60fps
-def render_plot(people, frame, configurations):
+def render_plot():
     """
-    Renders live scrolling plot on screen.
-
-    Parameters
-    ----------
-    people : People object
-        The population whose statistics are to be plotted.
-    frame : int
-        The moment in time - as a frame number - at which the plot should be displayed.
-    configurations : dict
-        Configuration dictionary from yaml file.
+    Renders live scrolling plot on screen. Statistics are added to the plot each frame with plot_overlay.add; this
+    only draws the plot when it has changed.
 
     Returns
     -------
-    None
+    list of pygame Rects
+        Regions of the screen drawn on.
 
     """
-    delta_y = 0
-    counts = list(people.status_numbers.values())
-    rounded_counts = tools.round_to_total(counts, total=100)
-    for count, colours in zip(rounded_counts, list(configurations['appearance']['people'].items())):
-        if count == 0:
-            continue
-        pygame.draw.rect(screen,
-                         colours[1],
-                         ((configurations['appearance']['origins']['plot'][0] + frame) // 2,
-                          configurations['appearance']['origins']['plot'][1] + delta_y,
-                          1, count),
-                         0)
-        delta_y += count
-
-
-def render_population(people, configurations):
+    with profiler.phase('render_plot'):
+        return plot_overlay.draw(screen)
+
+
+def render_population(people):
     """
-    Renders live simulation to screen. Note: origin parameter is currently unused.
+    Renders live simulation to screen, one batched blit per health status.
 
     Parameters
     ----------
     people : People object
         The population whose simulation is to be displayed.
-    configurations : dict
-        Configuration dictionary from yaml file.
 
     Returns
     -------
-    None
+    list of pygame Rects
+        Regions of the screen changed since the previous frame.
 
     """
-    for i, person in enumerate(people.persons):
-        if person.status == health.healthy:
-            pygame.draw.circle(screen,
-                               configurations['appearance']['people']['healthy_colour'],
-                               tuple(person.pos.astype(int)),
-                               configurations['people']['radius'])
-
-        if person.status == health.infected:
-            pygame.draw.circle(screen,
-                               configurations['appearance']['people']['infected_colour'],
-                               tuple(person.pos.astype(int)),
-                               configurations['people']['radius'])
-
-        if person.status == health.recovered:
-            pygame.draw.circle(screen,
-                               configurations['appearance']['people']['recovered_colour'],
-                               tuple(person.pos.astype(int)),
-                               configurations['people']['radius'])
-
-        if person.days_dead < health.dead.frame_limit and person.status == health.dead:
-            pygame.draw.circle(screen,
-                               configurations['appearance']['people']['dead_colour'],
-                               tuple(person.pos.astype(int)),
-                               configurations['people']['radius'])
-
-
-def render_text(people, configurations):
+    with profiler.phase('render_population'):
+        return population_renderer.draw(screen, people)
+
+
+def render_text(people):
     """
-    Renders live text updates of the population statistics to screen.
+    Renders live text updates of the population statistics to screen. Only labels whose counts changed are redrawn.
 
     Parameters
     ----------
     people : People object
         The population whose statistics are to be displayed.
-    configurations : dict
-        Configuration dictionary from yaml file.
 
     Returns
     -------
-    None
+    list of pygame Rects
+        Regions of the screen drawn on.
 
     """
-    # Cover text area
-    pygame.draw.rect(screen,
-                     configurations['appearance']['background']['bg_colour'],
-                     (650, configurations['environment']['dimensions'][1] + 5,
-                      configurations['environment']['dimensions'][0] - 650,
-                      150),
-                     0)
-    i = 0
-    j = 0
-    for stat, colours in zip(list(people.status_numbers.items()), list(configurations['appearance']['people'].items())):
-        text = font.render(f"{stat[0]}: {stat[1]}".capitalize(),
-                           True,
-                           colours[1])
-        screen.blit(text,
-                    (configurations['appearance']['origins']['text'][0] + (i * 140),
-                     (configurations['appearance']['origins']['text'][1] + (j * 50))))
-        if i == 1:
-            i = 0
-            j += 1
-        else:
-            i += 1
+    with profiler.phase('render_text'):
+        return stats_overlay.draw(screen, people.status_numbers)
 
 
 if __name__ == '__main__':
 
     pygame.init()
-    configs = tools.load_yaml('config.yaml')
+    configs = config.load()
     # set the pygame window name
     pygame.display.set_caption('Pandemic Simulation')
     font = pygame.font.SysFont(configs['appearance']['text']['font'], configs['appearance']['text']['size'])
@@ -136,21 +76,43 @@ if __name__ == '__main__':
     # Set up the drawing window
     screen = pygame.display.set_mode(configs['environment']['dimensions'] + area_for_plots_and_text)
 
-    # Create environment object
-    our_world = environment.Area(np.array(configs['environment']['dimensions']))
-    # Create a population for our environment
-    our_population = population.People(our_world,
-                                       configs['people']['number'],
-                                       configs['people']['initially_infected'],
-                                       configs['people']['radius'],
-                                       configs['people']['age_range']
-                                       )
-
+    # Create a population, its environment and its health statuses
+    our_population = population.People.from_config(configs)
+
+    population_renderer = rendering.PopulationRenderer(configs)
+    plot_overlay = overlay.ScrollingPlot(configs['appearance']['origins']['plot'],
+                                         overlay.plot_width(configs),
+                                         overlay.status_colours(configs),
+                                         configs['appearance']['background']['bg_colour'],
+                                         configs['appearance']['plot_frames_per_column'])
+    stats_overlay = overlay.StatsText(overlay.LabelCache(font),
+                                      configs['appearance']['origins']['text'],
+                                      overlay.status_colours(configs),
+                                      configs['appearance']['background']['bg_colour'])
+
+    # Time each phase of the simulation and rendering if enabled
+    profiler = profiling.NULL
+    if configs['profiling']['enabled']:
+        profiler = profiling.Profiler(trace=bool(configs['profiling']['trace']))
+    our_population.profiler = profiler
+    show_timings = configs['profiling']['enabled'] and configs['profiling']['overlay']
+    timing_overlay = overlay.TimingText(overlay.LabelCache(pygame.font.SysFont(configs['appearance']['text']['font'],
+                                                                               14)),
+                                        configs['appearance']['origins']['simulation'],
+                                        (0, 0, 0),
+                                        configs['appearance']['background']['bg_colour'])
     screen.fill(configs['appearance']['background']['bg_colour'])
+    pygame.display.flip()
+
+    frame_scheduler = scheduler.FrameScheduler(configs['timing']['tick_rate'],
+                                               configs['timing']['render_rate'],
+                                               configs['timing']['max_ticks_per_frame'],
+                                               configs['timing']['fast_forward_render_rate'])
 
     frame_number = 1
     # Run until the user asks to quit
     running = True
+    flip_display = False
     while running:
 
         # Did the user click a button?
@@ -160,45 +122,53 @@ if __name__ == '__main__':
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_s:
                     print("You pressed 'a'")
-
-        # Fill the background with the background colour
-        pygame.draw.rect(screen,
-                         configs['appearance']['background']['bg_colour'],
-                         (0,
-                          0,
-                          configs['environment']['dimensions'][0],
-                          configs['environment']['dimensions'][1] + 5),  # 5 pixels buffer
-                         0)
+                elif event.key == pygame.K_f:
+                    frame_scheduler.toggle_fast_forward()
+                elif event.key == pygame.K_p and profiler.enabled:
+                    show_timings = not show_timings
+                    population_renderer.clear(screen)
+                    flip_display = True
+
+        dirty_rects = []
+        # Run the simulation ticks due before this frame is rendered
+        for _ in frame_scheduler.ticks():
+            # Update positions and characteristics of each person in the population
+            our_population.update(frame_number,
+                                  configs['pandemic']['at_risk_age'],
+                                  configs['pandemic']['collision_detection'],
+                                  configs['events'])
+            our_population.test_population()
+
+            if not our_population.infection_free:
+                if configs['appearance']['show']['plot']:
+                    plot_overlay.add(our_population.status_numbers)
+            frame_number += 1
+
+        dirty_rects += render_population(our_population)
 
         if configs['appearance']['show']['plot'] or configs['appearance']['show']['text']:
             # Draw line between simulation and the plot
-            pygame.draw.rect(screen,
-                             (220, 220, 220),
-                             (0,
-                              configs['environment']['dimensions'][1],
-                              configs['environment']['dimensions'][0], 1),
-                             0)
-
-        # Update positions and characteristics of each person in the population
-        our_population.update(frame_number,
-                              configs['pandemic']['at_risk_age'],
-                              configs['pandemic']['collision_detection'],
-                              configs['events'])
-        our_population.test_population()
-
-        render_population(our_population, configs)
-        if not our_population.infection_free:
-            if configs['appearance']['show']['plot']:
-                render_plot(our_population,
-                            frame_number,
-                            configs)
+            dirty_rects.append(pygame.draw.rect(screen,
+                                                (220, 220, 220),
+                                                (0,
+                                                 configs['environment']['dimensions'][1],
+                                                 configs['environment']['dimensions'][0], 1),
+                                                0))
+        if configs['appearance']['show']['plot']:
+            dirty_rects += render_plot()
         if configs['appearance']['show']['text']:
-            render_text(our_population,
-                        configs)
+            dirty_rects += render_text(our_population)
+        if show_timings:
+            dirty_rects += timing_overlay.draw(screen, profiler.timings())
 
-        # Flip the display
-        pygame.display.flip()
-        frame_number += 1
+        # Send the changed regions to the display, or flip the whole display
+        if configs['appearance']['dirty_rects'] and not flip_display:
+            pygame.display.update(dirty_rects)
+        else:
+            pygame.display.flip()
+            flip_display = False
 
     # Done! Time to quit.
+    if configs['profiling']['trace']:
+        profiler.write_trace(configs['profiling']['trace'])
     pygame.quit()
@@ -0,0 +1,277 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import config
+import health
+import environment
+import population
+import quadtree
+import tiling
+
+# Population sizes above which the 'basic' mode, which is vectorised but still compares every pair of people, and the
+# object quadtree, built one Python object per person, are skipped
+QUADRATIC_LIMIT = 2000
+
+
+def make_population(configurations, n_people, density, seed=0):
+    """
+    A population of a given size and density in a square area.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    n_people : int
+        Population size.
+    density : float
+        People per 10,000 square pixels.
+    seed : int
+        Seed of the population's random number generator.
+
+    Returns
+    -------
+    People object
+
+    """
+    side = max(int(np.sqrt(n_people / density * 10000)), 4 * configurations['people']['radius'])
+    rng = np.random.default_rng(seed)
+    return population.People(environment.Area(np.array([side, side])),
+                             n_people,
+                             max(1, n_people // 100),
+                             configurations['people']['radius'],
+                             configurations['people']['age_range'],
+                             statuses=health.build_statuses(configurations, rng),
+                             rng=rng)
+
+
+def collide(people, mode):
+    """The collision stage of People.update on its own."""
+    return people.contact_pairs(mode)
+
+
+def snapshot(people, tiled_collider=None):
+    """
+    A function returning a fresh copy of a population in its current state, so that every timed call of a case starts
+    from the same state whatever the previous calls did, see People.state. The copies share tiled_collider, if given,
+    so that the 'tiled' mode's worker pool is started once rather than timed on every call.
+    """
+    header, arrays = people.state()
+
+    def setup():
+        fresh = population.People.from_state(copy.deepcopy(header),
+                                              {name: array.copy() for name, array in arrays.items()})
+        fresh.tiled_collider = tiled_collider
+        return fresh
+    return setup
+
+
+def time_call(function, setup, min_time=0.2, max_repeats=50):
+    """
+    Median wall clock time of repeated calls of function, repeating until min_time has elapsed. Each call is given a
+    new population from setup, which is not timed.
+    """
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeats and (len(times) < 3 or time.perf_counter() - start < min_time):
+        people = setup()
+        t0 = time.perf_counter()
+        function(people)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def peak_memory(function, setup):
+    """Peak memory, in bytes, allocated during one call of function on a new population from setup."""
+    people = setup()
+    tracemalloc.start()
+    try:
+        function(people)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def cases(configurations, people, surface=None):
+    """
+    The benchmark cases for one population, as a dictionary of case name to function of the population. Each call
+    is given a fresh copy of the population in its initial state (see snapshot), and the update cases simulate one
+    frame, the first, so every call does the same work.
+
+    Render cases are only included when an offscreen pygame surface is given.
+    """
+    def update(mode):
+        return lambda p: p.update(1, configurations['pandemic']['at_risk_age'], mode, configurations['events'])
+
+    n = len(people)
+    found = {}
+    for mode in config.COLLISION_MODES:
+        # 'auto' only picks one of the other modes, after measuring them over many frames, which a single call from a
+        # fresh population does not do
+        if mode == 'auto' or (mode == 'basic' and n > QUADRATIC_LIMIT):
+            continue
+        found[f'update/{mode}'] = update(mode)
+        found[f'collide/{mode}'] = lambda p, mode=mode: collide(p, mode)
+
+    half = people.box.dimensions / 2
+    domains = [quadtree.Rectangle(x, y, 4 * people.size, 4 * people.size)
+               for x, y in np.random.default_rng(1).random((100, 2)) * people.box.dimensions]
+    tree = quadtree.FlatQuadtree(people.store.pos)
+    found['quadtree/build'] = lambda p: quadtree.FlatQuadtree(p.store.pos)
+    found['quadtree/query'] = lambda p: [tree.query(domain) for domain in domains]
+    if n <= QUADRATIC_LIMIT:
+        def build_objects(p):
+            qtree = quadtree.Quadtree(quadtree.Rectangle(half[0], half[1], half[0], half[1]))
+            for person in p:
+                qtree.insert(quadtree.Point(person.pos[0], person.pos[1], person))
+        found['quadtree/object_build'] = build_objects
+    found['test_population'] = lambda p: p.test_population()
+
+    if surface is not None:
+        import overlay
+        import rendering
+        import pygame
+        renderer = rendering.PopulationRenderer(configurations)
+        plot = overlay.ScrollingPlot((0, 0), 900, overlay.status_colours(configurations),
+                                     configurations['appearance']['background']['bg_colour'])
+        font = pygame.font.Font(None, configurations['appearance']['text']['size'])
+        text = overlay.StatsText(overlay.LabelCache(font), (0, 0), overlay.status_colours(configurations),
+                                 configurations['appearance']['background']['bg_colour'])
+
+        def render_plot(p):
+            plot.add(p.status_numbers)
+            plot.draw(surface)
+
+        found['render/population'] = lambda p: renderer.draw(surface, p)
+        found['render/plot'] = render_plot
+        found['render/text'] = lambda p: text.draw(surface, p.status_numbers)
+    return found
+
+
+def run(configurations, sizes, densities, render=True, min_time=0.2):
+    """
+    Runs every benchmark case over a sweep of population sizes and densities.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    sizes : list of ints
+        Population sizes.
+    densities : list of floats
+        People per 10,000 square pixels.
+    render : bool
+        Whether to include the render cases, drawn on an offscreen surface.
+    min_time : float
+        Minimum time, in seconds, spent timing each case.
+
+    Returns
+    -------
+    list of dicts
+        One result per case, size and density with the seconds per call, agent updates per second and peak memory.
+
+    """
+    surface = None
+    if render:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        import pygame
+        pygame.font.init()
+        surface = pygame.Surface((2000, 2000))
+
+    tiled_collider = tiling.TiledCollider()
+    results = []
+    for n_people in sizes:
+        for density in densities:
+            people = make_population(configurations, n_people, density)
+            setup = snapshot(people, tiled_collider)
+            for name, function in cases(configurations, people, surface).items():
+                seconds = time_call(function, setup, min_time)
+                results.append({'case': name,
+                                'n_people': n_people,
+                                'density': density,
+                                'seconds_per_call': seconds,
+                                'agent_updates_per_second': n_people / seconds if seconds else float('inf'),
+                                'peak_memory_bytes': peak_memory(function, setup),
+                                })
+                print(f"{name:24} n={n_people:<8} density={density:<6} {seconds * 1000:10.3f} ms "
+                      f"{results[-1]['agent_updates_per_second']:14.0f} agents/s "
+                      f"{results[-1]['peak_memory_bytes'] / 2 ** 20:8.2f} MiB", file=sys.stderr)
+    tiled_collider.close()
+    return results
+
+
+def save(results, path):
+    """Writes benchmark results, with a description of the machine, to a json file."""
+    document = {'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.platform(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'results': results,
+                }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Finds the cases that got slower between two sets of benchmark results.
+
+    Parameters
+    ----------
+    baseline, current : list of dicts
+        Results as returned by run (or the 'results' of a saved file).
+    threshold : float
+        Fractional drop in throughput counted as a regression.
+
+    Returns
+    -------
+    list of tuples
+        Case, population size, density and the ratio of current to baseline throughput of each regression.
+
+    """
+    reference = {(r['case'], r['n_people'], r['density']): r['agent_updates_per_second'] for r in baseline}
+    regressions = []
+    for result in current:
+        key = (result['case'], result['n_people'], result['density'])
+        if key in reference and reference[key]:
+            ratio = result['agent_updates_per_second'] / reference[key]
+            if ratio < 1 - threshold:
+                regressions.append(key + (ratio,))
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point of the benchmark suite."""
+    parser = argparse.ArgumentParser(description='Benchmark the pandemic simulation.')
+    parser.add_argument('--config', default=config.DEFAULT_FILE, help='path of the yaml configuration file')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10000], help='population sizes')
+    parser.add_argument('--densities', type=float, nargs='+', default=[2.5, 10],
+                        help='people per 10,000 square pixels')
+    parser.add_argument('--no-render', action='store_true', help='skip the render cases')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds spent timing each case')
+    parser.add_argument('--output', default=None, help='json file to save the results to')
+    parser.add_argument('--compare', default=None, help='json file of baseline results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.1, help='fractional slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    configs = config.load(args.config)
+    results = run(configs, args.sizes, args.densities, not args.no_render, args.min_time)
+    if args.output:
+        save(results, args.output)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(baseline, results, args.threshold)
+        for case, n_people, density, ratio in regressions:
+            print(f"REGRESSION {case} n={n_people} density={density}: {ratio:.2f}x baseline throughput")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
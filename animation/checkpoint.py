@@ -0,0 +1,138 @@
+import json
+import os
+import numpy as np
+import population
+
+# First bytes of every checkpoint file
+MAGIC = b'PANDCKP1'
+
+# Every array starts at a multiple of this many bytes from the start of the file
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return offset + (-offset % ALIGNMENT)
+
+
+def save(file, people, frame):
+    """
+    Writes a checkpoint of a population, from which the simulation can be resumed exactly.
+
+    The file starts with MAGIC, the length of a json header as a little endian uint64 and the header: the
+    population's settings and counters (see People.state), the frame number and the dtype, shape and offset of each
+    array of the store. The arrays follow as raw bytes, each aligned to ALIGNMENT bytes so that they can be
+    memory-mapped on restore. The file is written next to its destination and then renamed, so an existing checkpoint
+    is never left half written.
+
+    Parameters
+    ----------
+    file : string or pathlib.Path
+        Path of the checkpoint file.
+    people : People object
+        The population.
+    frame : int
+        Number of the last frame simulated. The simulation resumes from the frame after it.
+
+    Returns
+    -------
+    None
+
+    """
+    header, arrays = people.state()
+    header['frame'] = frame
+    header['arrays'] = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    text = json.dumps(header).encode()
+    text += b' ' * (-(len(MAGIC) + 8 + len(text)) % ALIGNMENT)
+
+    temporary = f'{file}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC + len(text).to_bytes(8, 'little') + text)
+        start = f.tell()
+        for name, array in arrays.items():
+            f.seek(start + header['arrays'][name]['offset'])
+            f.write(memoryview(np.ascontiguousarray(array)).cast('B'))
+    os.replace(temporary, file)
+
+
+def read_header(file):
+    """
+    The header of a checkpoint file and the offset of its arrays.
+
+    Returns
+    -------
+    tuple
+        The header (dict) and the offset, in bytes, of the first array from the start of the file.
+
+    """
+    with open(file, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{file}' is not a checkpoint")
+        length = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(length))
+    return header, len(MAGIC) + 8 + length
+
+
+def load_arrays(file, mmap_mode='c'):
+    """
+    The arrays of a checkpoint's population store.
+
+    Parameters
+    ----------
+    file : string or pathlib.Path
+        Path of the checkpoint file.
+    mmap_mode : string
+        Mode the arrays are memory-mapped with, as for numpy.memmap: 'c' (copy-on-write, the default) reads pages of
+        the file only when they are first used and keeps any changes in memory, 'r' maps them read-only and 'r+'
+        writes changes back to the file. If None the arrays are read into memory.
+
+    Returns
+    -------
+    dict
+        The arrays by field name.
+
+    """
+    header, start = read_header(file)
+    arrays = {}
+    for name, layout in header['arrays'].items():
+        dtype = np.dtype(layout['dtype'])
+        shape = tuple(layout['shape'])
+        offset = start + layout['offset']
+        if mmap_mode is None or not np.prod(shape):
+            with open(file, 'rb') as f:
+                f.seek(offset)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        else:
+            arrays[name] = np.memmap(file, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+    return arrays
+
+
+def restore(file, mmap_mode='c'):
+    """
+    Recreates a population from a checkpoint written by save.
+
+    With the default copy-on-write memory mapping nothing but the header is read up front: each page of the arrays is
+    read from the file when it is first used, so resuming a large population is quick, and the file itself is never
+    changed.
+
+    Parameters
+    ----------
+    file : string or pathlib.Path
+        Path of the checkpoint file.
+    mmap_mode : string
+        How the arrays are memory-mapped, see load_arrays.
+
+    Returns
+    -------
+    tuple
+        The population (People object), the number of the last frame simulated and the events last applied to the
+        population (list, or None if it never had any).
+
+    """
+    header, _ = read_header(file)
+    people = population.People.from_state(header, load_arrays(file, mmap_mode))
+    return people, header['frame'], header['events']
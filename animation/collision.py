@@ -0,0 +1,317 @@
+import numpy as np
+import health
+
+# Neighbouring cell offsets (dx, dy) visited from each cell. Only half of the 3x3 stencil is needed because every
+# pair of adjacent cells is then visited exactly once.
+HALF_STENCIL = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def expand_ranges(starts, counts):
+    """
+    Expands a set of index ranges into one flat array.
+
+    Parameters
+    ----------
+    starts : numpy array of ints
+        First index of each range.
+    counts : numpy array of ints
+        Length of each range.
+
+    Returns
+    -------
+    tuple of numpy arrays
+        The range each element belongs to and the index of each element.
+
+    """
+    owner = np.repeat(np.arange(counts.size), counts)
+    offsets = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, starts[owner] + offsets
+
+
+def grid_pairs(pos, radius, dimensions):
+    """
+    Finds every pair of people close enough for transmission using a uniform grid (spatial hash).
+
+    All people share the same radius, so with a cell size of twice the radius any contact lies in the same or an
+    adjacent cell. People are binned in one pass and the candidate pairs of each cell and its neighbours are generated
+    in bulk, so the cost grows linearly with the population for a fixed density.
+
+    Parameters
+    ----------
+    pos : (n, 2) numpy array of floats
+        Positions of the people.
+    radius : int
+        Radius, in number of pixels, of every person.
+    dimensions : 2 element numpy array of ints
+        Width and height bounds of the environment.
+
+    Returns
+    -------
+    tuple of numpy arrays
+        Indices (first, second) of each pair in contact, with first < second.
+
+    """
+    contact = 2 * radius
+    shape = np.maximum(np.ceil(np.asarray(dimensions) / contact).astype(np.int64), 1)
+    cells = np.clip((pos // contact).astype(np.int64), 0, shape - 1)
+    cell_ids = cells[:, 1] * shape[0] + cells[:, 0]
+
+    order = np.argsort(cell_ids, kind='stable')
+    sorted_cells = cells[order]
+    counts = np.bincount(cell_ids, minlength=shape[0] * shape[1])
+    starts = np.cumsum(counts) - counts
+
+    firsts = []
+    seconds = []
+    for dx, dy in HALF_STENCIL:
+        nx = sorted_cells[:, 0] + dx
+        ny = sorted_cells[:, 1] + dy
+        valid = (nx >= 0) & (nx < shape[0]) & (ny < shape[1])
+        rows = np.flatnonzero(valid)
+        neighbour = ny[rows] * shape[0] + nx[rows]
+        range_starts = starts[neighbour]
+        range_counts = counts[neighbour]
+        if dx == 0 and dy == 0:
+            # Within the same cell only pair each person with those after them in sorted order
+            range_counts = range_starts + range_counts - rows - 1
+            range_starts = rows + 1
+        owner, other = expand_ranges(range_starts, range_counts)
+        firsts.append(order[rows[owner]])
+        seconds.append(order[other])
+
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    delta = pos[first] - pos[second]
+    close = np.hypot(delta[:, 0], delta[:, 1]) < contact
+    first, second = first[close], second[close]
+    swap = first > second
+    first[swap], second[swap] = second[swap], first[swap]
+    return first, second
+
+
+def brute_force_pairs(pos, radius, chunk=1024):
+    """
+    Finds every pair of people close enough for transmission by checking everyone against everyone else. The
+    distances are computed in blocks of 'chunk' rows to bound memory.
+
+    Parameters
+    ----------
+    pos : (n, 2) numpy array of floats
+        Positions of the people.
+    radius : int
+        Radius, in number of pixels, of every person.
+    chunk : int
+        Number of people checked against everyone at once.
+
+    Returns
+    -------
+    tuple of numpy arrays
+        Indices (first, second) of each pair in contact, with first < second.
+
+    """
+    firsts, seconds = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for start in range(0, len(pos), chunk):
+        block = pos[start:start + chunk]
+        distance = np.hypot(block[:, np.newaxis, 0] - pos[np.newaxis, :, 0],
+                            block[:, np.newaxis, 1] - pos[np.newaxis, :, 1])
+        first, second = np.nonzero(distance < 2 * radius)
+        first += start
+        keep = first < second
+        firsts.append(first[keep])
+        seconds.append(second[keep])
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def selective_pairs(pos, status, radius, chunk=1024):
+    """
+    Finds every pair of a healthy and an infected person close enough for transmission by checking every healthy
+    person against every infected person.
+
+    Parameters
+    ----------
+    pos : (n, 2) numpy array of floats
+        Positions of the people.
+    status : (n,) numpy array of int8
+        Health status codes of the people.
+    radius : int
+        Radius, in number of pixels, of every person.
+    chunk : int
+        Number of healthy people checked at once.
+
+    Returns
+    -------
+    tuple of numpy arrays
+        Indices (healthy, infected) of each pair in contact.
+
+    """
+    healthy = np.flatnonzero(status == health.HEALTHY)
+    infected = np.flatnonzero(status == health.INFECTED)
+    firsts, seconds = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for start in range(0, healthy.size, chunk):
+        block = healthy[start:start + chunk]
+        distance = np.hypot(pos[block, np.newaxis, 0] - pos[np.newaxis, infected, 0],
+                            pos[block, np.newaxis, 1] - pos[np.newaxis, infected, 1])
+        first, second = np.nonzero(distance < 2 * radius)
+        firsts.append(block[first])
+        seconds.append(infected[second])
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+class InfectedIndex:
+    """
+    A uniform grid over the infected people only, queried for the healthy people in contact with them.
+
+    Members are added and removed as people are infected or stop being infected, and each refresh only re-bins the
+    members that moved to another cell, so keeping the index costs time in proportion to the number of infected people
+    rather than the population. Every cell also counts the members in its 3x3 neighbourhood, which rules out a healthy
+    person far from anyone infected with a single lookup. Cells are twice the radius wide, as in grid_pairs, and the
+    grid has a border of empty cells so neighbourhoods never leave it.
+
+    Attributes
+    ----------
+    contact : int
+        Contact distance, twice the radius of every person.
+    shape : numpy array of ints
+        Number of cells along x and y, excluding the border.
+    members : numpy array of ints
+        Indices of the people in the index, in no particular order.
+    cells : numpy array of ints
+        Cell of each member, as a flat index into the bordered grid.
+    cover : numpy array of ints
+        Number of members in the 3x3 neighbourhood of each cell of the bordered grid, flattened.
+
+    """
+    def __init__(self, radius, dimensions, n_people):
+        self.contact = 2 * radius
+        self.shape = np.maximum(np.ceil(np.asarray(dimensions) / self.contact).astype(np.int64), 1)
+        self._width = int(self.shape[0]) + 2
+        self._offsets = np.array([dy * self._width + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1)])
+        self.cover = np.zeros(self._width * (int(self.shape[1]) + 2), dtype=np.int32)
+        self.members = np.zeros(0, dtype=np.int64)
+        self.cells = np.zeros(0, dtype=np.int64)
+        self._slot = np.full(n_people, -1, dtype=np.int64)
+
+    def __len__(self):
+        """Special method returning the number of people in the index"""
+        return self.members.size
+
+    def _cell_ids(self, pos):
+        cells = np.clip((pos // self.contact).astype(np.int64), 0, self.shape - 1) + 1
+        return cells[:, 1] * self._width + cells[:, 0]
+
+    def _cover(self, cell_ids, change):
+        np.add.at(self.cover, (cell_ids[:, np.newaxis] + self._offsets).ravel(), change)
+
+    def add(self, indices, pos):
+        """Adds some people, given by index, to the index. People already in it are ignored."""
+        indices = np.unique(indices)
+        indices = indices[self._slot[indices] < 0]
+        cell_ids = self._cell_ids(pos[indices])
+        self._slot[indices] = np.arange(self.members.size, self.members.size + indices.size)
+        self.members = np.concatenate((self.members, indices))
+        self.cells = np.concatenate((self.cells, cell_ids))
+        self._cover(cell_ids, 1)
+
+    def remove(self, indices):
+        """Removes some people, given by index, from the index. People not in it are ignored."""
+        indices = np.unique(indices)
+        indices = indices[self._slot[indices] >= 0]
+        if not indices.size:
+            return
+        keep = np.ones(self.members.size, dtype=bool)
+        keep[self._slot[indices]] = False
+        self._cover(self.cells[~keep], -1)
+        self._slot[indices] = -1
+        self.members, self.cells = self.members[keep], self.cells[keep]
+        self._slot[self.members] = np.arange(self.members.size)
+
+    def refresh(self, pos):
+        """Moves the members that have changed cell since the last refresh to their new cell."""
+        cell_ids = self._cell_ids(pos[self.members])
+        moved = np.flatnonzero(cell_ids != self.cells)
+        self._cover(self.cells[moved], -1)
+        self._cover(cell_ids[moved], 1)
+        self.cells[moved] = cell_ids[moved]
+
+    def pairs(self, pos, candidates):
+        """
+        Finds every pair of a candidate and a member close enough for transmission. The members are refreshed first.
+
+        Parameters
+        ----------
+        pos : (n, 2) numpy array of floats
+            Positions of the whole population.
+        candidates : numpy array of ints
+            Indices of the people to check against the members, e.g. everyone healthy. Must not include members.
+
+        Returns
+        -------
+        tuple of numpy arrays
+            Indices (candidate, member) of each pair in contact.
+
+        """
+        self.refresh(pos)
+        cell_ids = self._cell_ids(pos[candidates])
+        near = self.cover[cell_ids] > 0
+        candidates, cell_ids = candidates[near], cell_ids[near]
+
+        order = np.argsort(self.cells, kind='stable')
+        sorted_cells = self.cells[order]
+        neighbours = (cell_ids[:, np.newaxis] + self._offsets).ravel()
+        starts = np.searchsorted(sorted_cells, neighbours, side='left')
+        counts = np.searchsorted(sorted_cells, neighbours, side='right') - starts
+        owner, other = expand_ranges(starts, counts)
+        first = candidates[owner // self._offsets.size]
+        second = self.members[order[other]]
+        delta = pos[first] - pos[second]
+        close = np.hypot(delta[:, 0], delta[:, 1]) < self.contact
+        return first[close], second[close]
+
+
+def resolve_contacts(first, second, status, probability=1.0, rng=None):
+    """
+    Decides in bulk which healthy people are infected by a batch of contacts, and by whom.
+
+    Only contacts between a healthy and an infected person count. Each one transmits the virus with the given
+    probability. A healthy person with several transmitting contacts is infected once and one of those contacts,
+    chosen uniformly at random, is credited. The contacts are put in a canonical order before any random number is
+    drawn, so the outcome does not depend on the order of the pairs.
+
+    Parameters
+    ----------
+    first, second : numpy arrays of ints
+        Indices of the two people in each contact pair, in any order. Each pair should appear once.
+    status : (n,) numpy array of int8
+        Health status codes of the people.
+    probability : float
+        Probability that a contact transmits the virus.
+    rng : numpy Generator
+        Random number generator for transmission and attribution. If None every contact transmits and the lowest
+        indexed infector is credited.
+
+    Returns
+    -------
+    tuple of numpy arrays
+        The people newly infected (unique, sorted) and the person credited with infecting each of them.
+
+    """
+    first_status = status[first]
+    second_status = status[second]
+    forward = (first_status == health.INFECTED) & (second_status == health.HEALTHY)
+    backward = (first_status == health.HEALTHY) & (second_status == health.INFECTED)
+    infectors = np.concatenate((first[forward], second[backward]))
+    infectees = np.concatenate((second[forward], first[backward]))
+
+    canonical = np.lexsort((infectors, infectees))
+    infectors, infectees = infectors[canonical], infectees[canonical]
+    if rng is not None:
+        if probability < 1:
+            transmits = rng.random(infectees.size) < probability
+            infectors, infectees = infectors[transmits], infectees[transmits]
+        # Order each infectee's contacts randomly so the first of each group is a uniform choice
+        shuffled = np.lexsort((rng.random(infectees.size), infectees))
+        infectors, infectees = infectors[shuffled], infectees[shuffled]
+
+    first_contact = np.ones(infectees.size, dtype=bool)
+    first_contact[1:] = infectees[1:] != infectees[:-1]
+    return infectees[first_contact], infectors[first_contact]
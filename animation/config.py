@@ -0,0 +1,229 @@
+import copy
+import pathlib
+import tools
+
+# The configuration file shipped next to this module
+DEFAULT_FILE = pathlib.Path(__file__).parent / 'config.yaml'
+
+COLLISION_MODES = ('basic', 'selective', 'quadtree', 'grid', 'tiled', 'infected_index', 'auto')
+
+# Optional settings, by their nested keys, and the values used when a configuration leaves them out
+DEFAULTS = {
+    ('pandemic', 'auto', 'candidates'): ['basic', 'selective', 'quadtree', 'grid', 'infected_index'],
+    ('pandemic', 'auto', 'window'): 10,
+    ('pandemic', 'auto', 'remeasure_every'): 100,
+    ('pandemic', 'auto', 'hysteresis'): 0.2,
+    ('pandemic', 'auto', 'explore_factor'): 4,
+    ('pandemic', 'transmission_probability'): 1.0,
+    ('timing', 'tick_rate'): 60,
+    ('timing', 'render_rate'): 60,
+    ('timing', 'max_ticks_per_frame'): 5,
+    ('timing', 'fast_forward_render_rate'): 4,
+    ('profiling', 'enabled'): False,
+    ('profiling', 'overlay'): False,
+    ('profiling', 'trace'): None,
+    ('appearance', 'dirty_rects'): True,
+    ('appearance', 'plot_frames_per_column'): 2,
+}
+
+_cache = {}
+
+
+class ConfigError(ValueError):
+    """Raised when a configuration file is missing a setting or has an invalid value."""
+
+
+def load(file=DEFAULT_FILE):
+    """
+    Loads, validates and returns a configuration. Each file is only read and parsed once per process; every call gets
+    its own copy, which can be changed freely.
+
+    Parameters
+    ----------
+    file : string or pathlib.Path
+        Path of the yaml configuration file. Relative paths that do not exist from the working directory are looked up
+        next to this module.
+
+    Returns
+    -------
+    dict
+        Structured contents of the yaml file.
+
+    """
+    path = tools.resolve_path(file)
+    if path not in _cache:
+        configurations = tools.load_yaml(path)
+        validate(configurations)
+        _cache[path] = configurations
+    return copy.deepcopy(_cache[path])
+
+
+def _setting(configurations, keys):
+    """The value at a sequence of nested keys, raising ConfigError if it is missing."""
+    value = configurations
+    for i, key in enumerate(keys):
+        if not isinstance(value, dict) or key not in value:
+            raise ConfigError(f"Missing setting '{'/'.join(keys[:i + 1])}'")
+        value = value[key]
+    return value
+
+
+def _fill_defaults(configurations):
+    """Adds the DEFAULTS of the optional settings a configuration leaves out, in place."""
+    for keys, value in DEFAULTS.items():
+        container = configurations
+        for key in keys[:-1]:
+            container = container.setdefault(key, {})
+        container.setdefault(keys[-1], copy.deepcopy(value))
+
+
+def _check_range(configurations, keys):
+    value = _setting(configurations, keys)
+    if not (isinstance(value, list) and len(value) == 2 and value[0] <= value[1]):
+        raise ConfigError(f"'{'/'.join(keys)}' must be a [lower, upper] range, got {value}")
+
+
+def validate(configurations):
+    """
+    Checks that a configuration has every setting needed to run a simulation, with sensible values. Optional settings
+    it leaves out are added, in place, with their DEFAULTS.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ConfigError
+        If a setting is missing or invalid.
+
+    """
+    mode = _setting(configurations, ('pandemic', 'collision_detection'))
+    if mode not in COLLISION_MODES:
+        raise ConfigError(f"'pandemic/collision_detection' must be one of {COLLISION_MODES}, got '{mode}'")
+    _fill_defaults(configurations)
+    if mode == 'auto':
+        candidates = configurations['pandemic']['auto']['candidates']
+        if not (isinstance(candidates, list) and candidates and
+                all(candidate in COLLISION_MODES and candidate != 'auto' for candidate in candidates)):
+            raise ConfigError(f"'pandemic/auto/candidates' must be a list of collision modes other than 'auto', "
+                              f"got {candidates}")
+    _setting(configurations, ('pandemic', 'at_risk_age'))
+    probability = configurations['pandemic']['transmission_probability']
+    if not (isinstance(probability, (int, float)) and 0 <= probability <= 1):
+        raise ConfigError(f"'pandemic/transmission_probability' must be between 0 and 1, got {probability}")
+
+    dimensions = _setting(configurations, ('environment', 'dimensions'))
+    if not (isinstance(dimensions, list) and len(dimensions) == 2 and min(dimensions) > 0):
+        raise ConfigError(f"'environment/dimensions' must be a positive [width, height], got {dimensions}")
+
+    number = _setting(configurations, ('people', 'number'))
+    initially_infected = _setting(configurations, ('people', 'initially_infected'))
+    if not 0 <= initially_infected <= number:
+        raise ConfigError(f"'people/initially_infected' must be between 0 and 'people/number' ({number}), "
+                          f"got {initially_infected}")
+    radius = _setting(configurations, ('people', 'radius'))
+    if not (isinstance(radius, int) and radius > 0):
+        raise ConfigError(f"'people/radius' must be a positive integer, got {radius}")
+    _check_range(configurations, ('people', 'age_range'))
+    for status in ('healthy', 'infected', 'recovered', 'dead'):
+        _check_range(configurations, ('people', status, 'speed'))
+        _check_range(configurations, ('people', status, 'frame_limit'))
+        duration = configurations['people'][status].get('duration')
+        if not (duration is None or isinstance(duration, dict)):
+            raise ConfigError(f"'people/{status}/duration' must be a distribution, e.g. "
+                              f"{{distribution: gamma, mean: 250, sd: 50}}, or null, got {duration}")
+
+    events = _setting(configurations, ('events',))
+    if not isinstance(events, list):
+        raise ConfigError(f"'events' must be a list, got {events}")
+
+    for key in ('tick_rate', 'render_rate', 'max_ticks_per_frame', 'fast_forward_render_rate'):
+        value = configurations['timing'][key]
+        if not (isinstance(value, (int, float)) and value > 0):
+            raise ConfigError(f"'timing/{key}' must be a positive number, got {value}")
+    for keys in (('profiling', 'enabled'), ('profiling', 'overlay'), ('appearance', 'dirty_rects')):
+        value = configurations[keys[0]][keys[1]]
+        if not isinstance(value, bool):
+            raise ConfigError(f"'{'/'.join(keys)}' must be yes or no, got {value}")
+    trace = configurations['profiling']['trace']
+    if not (trace is None or isinstance(trace, str)):
+        raise ConfigError(f"'profiling/trace' must be a file path or null, got {trace}")
+    frames_per_column = configurations['appearance']['plot_frames_per_column']
+    if not (isinstance(frames_per_column, int) and frames_per_column > 0):
+        raise ConfigError(f"'appearance/plot_frames_per_column' must be a positive integer, got {frames_per_column}")
+
+
+def validate_metapopulation(configurations):
+    """
+    Checks the 'metapopulation' section of a configuration, needed to run a simulation of several regions.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ConfigError
+        If a setting is missing or invalid.
+
+    """
+    regions = _setting(configurations, ('metapopulation', 'regions'))
+    if not (isinstance(regions, list) and regions):
+        raise ConfigError(f"'metapopulation/regions' must be a non-empty list, got {regions}")
+    for i, region in enumerate(regions):
+        dimensions = _setting(region, ('dimensions',))
+        if not (isinstance(dimensions, list) and len(dimensions) == 2 and min(dimensions) > 0):
+            raise ConfigError(f"'metapopulation/regions/{i}/dimensions' must be a positive [width, height], "
+                              f"got {dimensions}")
+        number = _setting(region, ('people',))
+        initially_infected = _setting(region, ('initially_infected',))
+        if not 0 <= initially_infected <= number:
+            raise ConfigError(f"'metapopulation/regions/{i}/initially_infected' must be between 0 and the region's "
+                              f"'people' ({number}), got {initially_infected}")
+    rate = _setting(configurations, ('metapopulation', 'migration_rate'))
+    if not 0 <= rate <= 1:
+        raise ConfigError(f"'metapopulation/migration_rate' must be between 0 and 1, got {rate}")
+    workers = _setting(configurations, ('metapopulation', 'workers'))
+    if not (workers is None or (isinstance(workers, int) and workers >= 0)):
+        raise ConfigError(f"'metapopulation/workers' must be a non-negative integer or null, got {workers}")
+
+
+def validate_forking(configurations):
+    """
+    Checks the 'forking' section of a configuration, needed to compare scenarios forked from a shared state.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ConfigError
+        If a setting is missing or invalid.
+
+    """
+    frame = _setting(configurations, ('forking', 'frame'))
+    if not (isinstance(frame, int) and frame >= 0):
+        raise ConfigError(f"'forking/frame' must be a non-negative integer, got {frame}")
+    branches = _setting(configurations, ('forking', 'branches'))
+    if not (isinstance(branches, dict) and branches):
+        raise ConfigError(f"'forking/branches' must map each branch name to its list of events, got {branches}")
+    for name, events in branches.items():
+        if not isinstance(events, list):
+            raise ConfigError(f"'forking/branches/{name}' must be a list of events, got {events}")
@@ -0,0 +1,167 @@
+import copy
+import itertools
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import headless
+
+
+def set_parameter(configurations, path, value):
+    """
+    Sets one value of a nested configuration dictionary in place.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    path : string
+        Dot separated keys of the value, with integers indexing lists, e.g. 'people.number' or
+        'events.1.frame_trigger.frame'.
+    value : object
+        The new value.
+
+    Returns
+    -------
+    None
+
+    """
+    keys = [int(key) if key.isdigit() else key for key in path.split('.')]
+    container = configurations
+    for key in keys[:-1]:
+        container = container[key]
+    container[keys[-1]] = value
+
+
+def parameter_grid(parameters):
+    """
+    Every combination of a set of parameter values.
+
+    Parameters
+    ----------
+    parameters : dict
+        Maps each parameter path (see set_parameter) to the list of values it takes.
+
+    Returns
+    -------
+    list of dicts
+        One dictionary of parameter path to value per combination.
+
+    """
+    if not parameters:
+        return [{}]
+    paths = list(parameters)
+    return [dict(zip(paths, values)) for values in itertools.product(*(parameters[path] for path in paths))]
+
+
+def _run(configurations, frames, seed):
+    """Worker task: one independent simulation. Everything it needs is passed in, nothing is shared."""
+    return headless.run(configurations, frames, seed)
+
+
+def iter_runs(configurations, runs=1, parameters=None, frames=None, seed=None, workers=None):
+    """
+    Runs an ensemble of simulations over a process pool and yields each one as soon as it finishes.
+
+    Every run gets its own random number generator spawned from 'seed', so a run's result depends only on its
+    configuration, its position in the ensemble and 'seed', whichever worker it lands on. Each run builds its own
+    population and health statuses, so no state is shared through module level globals.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    runs : int
+        Number of runs of each combination of parameters.
+    parameters : dict
+        Maps each parameter path (see set_parameter) to the list of values to sweep over.
+    frames : int
+        Maximum number of frames of each run. If None each run continues until the population is infection free.
+    seed : int
+        Root seed of the ensemble.
+    workers : int
+        Number of worker processes. If None one per CPU core.
+
+    Yields
+    ------
+    tuple
+        The index of the parameter combination in parameter_grid, the combination (dict), the run number within that
+        combination and the run's time series (dict, as returned by headless.run).
+
+    """
+    points = parameter_grid(parameters)
+    seeds = np.random.SeedSequence(seed).spawn(len(points) * runs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i, point in enumerate(points):
+            point_configurations = copy.deepcopy(configurations)
+            for path, value in point.items():
+                set_parameter(point_configurations, path, value)
+            for run in range(runs):
+                future = pool.submit(_run, point_configurations, frames, seeds[i * runs + run])
+                futures[future] = (i, point, run)
+        for future in as_completed(futures):
+            i, point, run = futures[future]
+            yield i, point, run, future.result()
+
+
+def aggregate(all_series, quantiles=(0.05, 0.5, 0.95)):
+    """
+    Combines the time series of many runs into mean and quantile curves.
+
+    Runs that ended early (infection free) are held at their final values up to the length of the longest run, except
+    for the series of headless.COHORT_SERIES, which have no value after a run ends. Their curves leave out the runs
+    without a value on a frame, and are NaN on frames where no run has one.
+
+    Parameters
+    ----------
+    all_series : list of dicts
+        Time series as returned by headless.run.
+    quantiles : tuple of floats
+        Quantiles to compute, between 0 and 1.
+
+    Returns
+    -------
+    dict
+        'frame' holds the frame numbers. Every other key of the time series maps to a dictionary with the 'mean'
+        curve and a 'quantiles' dictionary of quantile to curve.
+
+    """
+    length = max(series['frame'].size for series in all_series)
+    curves = {'frame': np.arange(1, length + 1)}
+    for key in all_series[0]:
+        if key == 'frame':
+            continue
+        if key in headless.COHORT_SERIES:
+            stacked = np.stack([np.pad(series[key].astype(float), (0, length - series[key].size),
+                                       constant_values=np.nan) for series in all_series])
+            with warnings.catch_warnings():
+                # All-NaN frames give NaN, which is the intended result
+                warnings.simplefilter('ignore', RuntimeWarning)
+                curves[key] = {'mean': np.nanmean(stacked, axis=0),
+                               'quantiles': dict(zip(quantiles, np.nanquantile(stacked, quantiles, axis=0)))}
+            continue
+        stacked = np.stack([np.pad(series[key].astype(float), (0, length - series[key].size), mode='edge')
+                            for series in all_series])
+        curves[key] = {'mean': stacked.mean(axis=0),
+                       'quantiles': dict(zip(quantiles, np.quantile(stacked, quantiles, axis=0)))}
+    return curves
+
+
+def run_ensemble(configurations, runs=1, parameters=None, frames=None, seed=None, workers=None,
+                 quantiles=(0.05, 0.5, 0.95)):
+    """
+    Runs an ensemble of simulations (see iter_runs) and aggregates the runs of each parameter combination.
+
+    Returns
+    -------
+    list of tuples
+        The parameter combination (dict) and its aggregated curves (dict, as returned by aggregate), in the order of
+        parameter_grid.
+
+    """
+    points = parameter_grid(parameters)
+    # Keyed by index, as parameter values such as lists are not hashable
+    results = [[None] * runs for _ in points]
+    for i, _, run, series in iter_runs(configurations, runs, parameters, frames, seed, workers):
+        results[i][run] = series
+    return [(point, aggregate(results[i], quantiles)) for i, point in enumerate(points)]
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Speed multiplier applied by each type of event
+BEHAVIOURS = {'social distancing': 0.5,
+              'lockdown': 0.1,
+              'normal': 1.0,
+              }
+
+
+class Action:
+    """
+    A behaviour change applied to (part of) a population when an event fires.
+
+    Attributes
+    ----------
+    speed : float
+        The new speed multiplier.
+    age : list of floats
+        [lower, upper] bounds of the ages targeted, or None for every age.
+    region : list of floats
+        [left, top, right, bottom] bounds of the area targeted, or None for everywhere. People are targeted by their
+        position when the event fires.
+
+    """
+    def __init__(self, speed, age=None, region=None):
+        self.speed = speed
+        self.age = age
+        self.region = region
+
+    def targets(self, age, pos):
+        """
+        Which people the action targets.
+
+        Parameters
+        ----------
+        age : float or numpy array of floats
+            Age of each person.
+        pos : numpy array of floats
+            Position of each person, shape (2,) for one person or (n, 2).
+
+        Returns
+        -------
+        bool or numpy array of bools
+
+        """
+        targeted = np.ones(np.shape(age), dtype=bool)
+        if self.age is not None:
+            targeted &= (age >= self.age[0]) & (age <= self.age[1])
+        if self.region is not None:
+            x, y = pos[..., 0], pos[..., 1]
+            targeted &= ((x >= self.region[0]) & (x <= self.region[2]) &
+                         (y >= self.region[1]) & (y <= self.region[3]))
+        return targeted
+
+    def apply(self, people):
+        """Changes the speed multiplier of every targeted person in the population in one batch."""
+        store = people.store
+        if self.age is None and self.region is None:
+            store.var_speed[:] = self.speed
+            return
+        store.var_speed[self.targets(store.age, store.pos)] = self.speed
+
+
+class Timeline:
+    """
+    The events from the config file compiled once into a schedule indexed by frame number.
+
+    Each enabled event must have a 'type' from BEHAVIOURS, or give its own 'speed' multiplier, and a 'frame_trigger'.
+    An optional 'target' restricts it to an 'age' band and/or a 'region' of the environment, e.g.
+
+        - enable: yes
+          type: 'lockdown'
+          target:
+            age: [70, 100]
+          frame_trigger:
+            frame: 200
+
+    Attributes
+    ----------
+    schedule : dict
+        Maps frame numbers to the list of Actions that fire on that frame, in the order they appear in the config.
+
+    """
+    def __init__(self, events):
+        self.schedule = {}
+        for event in events:
+            if not event['enable'] or not event['frame_trigger']:
+                continue
+            if 'speed' in event:
+                speed = event['speed']
+            elif event['type'] in BEHAVIOURS:
+                speed = BEHAVIOURS[event['type']]
+            else:
+                raise ValueError(f"Unknown event type '{event['type']}'. Expected one of {list(BEHAVIOURS)} or an "
+                                 f"event with its own 'speed'.")
+            target = event.get('target') or {}
+            action = Action(speed, target.get('age'), target.get('region'))
+            self.schedule.setdefault(event['frame_trigger']['frame'], []).append(action)
+
+    def actions(self, frame):
+        """The actions due on the given frame, in order."""
+        return self.schedule.get(frame, [])
+
+    def apply(self, people, frame):
+        """Applies the actions due on the given frame to the population. Frames without events cost a dict lookup."""
+        actions = self.schedule.get(frame)
+        if actions is None:
+            return
+        for action in actions:
+            action.apply(people)
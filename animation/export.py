@@ -0,0 +1,294 @@
+import abc
+import argparse
+import os
+import struct
+import subprocess
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pygame
+import config
+import headless
+import population
+import overlay
+import rendering
+
+# Output file extensions encoded by ffmpeg rather than written as a png sequence
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.avi', '.mov', '.gif')
+
+
+def png_bytes(pixels, size, compression=6):
+    """
+    Encodes an RGB image as png, using only the standard library.
+
+    The compression is done by zlib, which releases the GIL, so several threads encode frames in parallel.
+
+    Parameters
+    ----------
+    pixels : bytes
+        The image's rows of RGB pixels, top row first, as returned by pygame.image.tostring(surface, 'RGB').
+    size : tuple of ints
+        Width and height of the image.
+    compression : int
+        zlib compression level, 0 (none) to 9 (smallest).
+
+    Returns
+    -------
+    bytes
+
+    """
+    width, height = size
+    # Every row starts with its filter type, 0 for none
+    rows = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    rows[:, 1:] = np.frombuffer(pixels, dtype=np.uint8).reshape(height, 3 * width)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows.tobytes(), compression)) +
+            chunk(b'IEND', b''))
+
+
+class FrameSink(abc.ABC):
+    """
+    Encodes frames in a pool of background threads, so that encoding overlaps with simulating and rendering the next
+    frames.
+
+    At most 'queue_size' frames are waiting for or being encoded at any time. Submitting a frame when the queue is
+    full blocks until a frame has been encoded, so memory stays bounded when encoding is slower than the simulation.
+    An error raised while encoding a frame is raised again by the next call of submit or close.
+
+    Attributes
+    ----------
+    size : tuple of ints
+        Width and height of the frames.
+    frames : int
+        Number of frames submitted so far.
+
+    """
+    def __init__(self, size, workers=1, queue_size=8):
+        self.size = tuple(size)
+        self.frames = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._pending = deque()
+
+    @abc.abstractmethod
+    def encode(self, frame, pixels):
+        """Encodes one frame, numbered from 0. Called from the worker threads."""
+
+    def submit(self, pixels):
+        """
+        Queues the next frame for encoding, waiting for room in the queue if it is full.
+
+        Parameters
+        ----------
+        pixels : bytes
+            The frame's rows of RGB pixels, see png_bytes. Must not be changed afterwards.
+
+        Returns
+        -------
+        None
+
+        """
+        self._slots.acquire()
+        future = self._pool.submit(self.encode, self.frames, pixels)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._pending.append(future)
+        self.frames += 1
+        while self._pending and self._pending[0].done():
+            self._pending.popleft().result()
+
+    def close(self):
+        """Waits for every queued frame to be encoded."""
+        self._pool.shutdown(wait=True)
+        while self._pending:
+            self._pending.popleft().result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PngSequence(FrameSink):
+    """
+    Writes frames as numbered png files, frame_000000.png onwards, encoded by several threads at once.
+
+    Attributes
+    ----------
+    directory : string
+        Directory the files are written to. Created if missing.
+    compression : int
+        zlib compression level, see png_bytes.
+
+    """
+    def __init__(self, directory, size, workers=None, queue_size=8, compression=6):
+        super().__init__(size, workers if workers is not None else os.cpu_count(), queue_size)
+        self.directory = directory
+        self.compression = compression
+        os.makedirs(directory, exist_ok=True)
+
+    def encode(self, frame, pixels):
+        with open(os.path.join(self.directory, f'frame_{frame:06d}.png'), 'wb') as f:
+            f.write(png_bytes(pixels, self.size, self.compression))
+
+
+class FfmpegPipe(FrameSink):
+    """
+    Pipes raw frames to an ffmpeg process, which encodes them to a video or animated gif chosen by the file's
+    extension. A single thread writes to the pipe, keeping the frames in order, while ffmpeg encodes in its own
+    process.
+
+    Attributes
+    ----------
+    file : string
+        Path of the video file.
+    fps : float
+        Frames per second of the video.
+
+    """
+    def __init__(self, file, size, fps, queue_size=8, ffmpeg='ffmpeg'):
+        super().__init__(size, 1, queue_size)
+        self.file = file
+        self.fps = fps
+        command = [ffmpeg, '-loglevel', 'error', '-y',
+                   '-f', 'rawvideo', '-pixel_format', 'rgb24', '-video_size', f'{size[0]}x{size[1]}',
+                   '-framerate', str(fps), '-i', '-']
+        if not file.lower().endswith('.gif'):
+            # Most players only decode yuv420p, which needs even dimensions
+            command += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p']
+        self._process = subprocess.Popen(command + [file], stdin=subprocess.PIPE)
+
+    def encode(self, frame, pixels):
+        self._process.stdin.write(pixels)
+
+    def close(self):
+        """Waits for every queued frame to be written and for ffmpeg to finish the file."""
+        try:
+            super().close()
+        finally:
+            self._process.stdin.close()
+            if self._process.wait():
+                raise RuntimeError(f"ffmpeg failed with exit status {self._process.returncode} writing '{self.file}'")
+
+
+class Exporter:
+    """
+    Renders a population offscreen, as animation.py draws it, and hands each frame to a FrameSink.
+
+    It can be passed as the recorder of headless.simulate, which calls add once per frame.
+
+    Attributes
+    ----------
+    surface : pygame Surface
+        The offscreen surface frames are drawn on.
+    sink : FrameSink object
+        Encodes the frames.
+    every : int
+        Only every this many frames are exported.
+
+    """
+    def __init__(self, configurations, sink_factory, every=1):
+        self.every = every
+        self._show = configurations['appearance']['show']
+        dimensions = configurations['environment']['dimensions']
+        below = 130 if self._show['plot'] or self._show['text'] else 0
+        bg_colour = configurations['appearance']['background']['bg_colour']
+        self.surface = pygame.Surface((dimensions[0], dimensions[1] + below))
+        self.surface.fill(bg_colour)
+        # Line between the simulation and the plot, redrawn every frame as the population renderer clears over it
+        self._separator = (0, dimensions[1], dimensions[0], 1) if below else None
+
+        pygame.font.init()
+        font = pygame.font.SysFont(configurations['appearance']['text']['font'],
+                                   configurations['appearance']['text']['size'])
+        self.population_renderer = rendering.PopulationRenderer(configurations)
+        self.plot_overlay = overlay.ScrollingPlot(configurations['appearance']['origins']['plot'],
+                                                  overlay.plot_width(configurations),
+                                                  overlay.status_colours(configurations),
+                                                  bg_colour,
+                                                  configurations['appearance']['plot_frames_per_column'])
+        self.stats_overlay = overlay.StatsText(overlay.LabelCache(font),
+                                               configurations['appearance']['origins']['text'],
+                                               overlay.status_colours(configurations),
+                                               bg_colour)
+        self.sink = sink_factory(self.surface.get_size())
+        self._frames = 0
+
+    def add(self, people):
+        """Draws the population's current frame and queues it for encoding."""
+        if not people.infection_free and self._show['plot']:
+            self.plot_overlay.add(people.status_numbers)
+        self._frames += 1
+        if (self._frames - 1) % self.every:
+            return
+        self.population_renderer.draw(self.surface, people)
+        if self._separator:
+            pygame.draw.rect(self.surface, (220, 220, 220), self._separator, 0)
+        if self._show['plot']:
+            self.plot_overlay.draw(self.surface)
+        if self._show['text']:
+            self.stats_overlay.draw(self.surface, people.status_numbers)
+        self.sink.submit(pygame.image.tostring(self.surface, 'RGB'))
+
+    def close(self):
+        """Waits for every frame to be encoded."""
+        self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def sink_factory(output, fps, workers=None, queue_size=8):
+    """
+    The FrameSink for an output path: an ffmpeg encoded video if it ends with one of VIDEO_EXTENSIONS, otherwise a
+    directory of png files.
+
+    Returns
+    -------
+    function
+        Creates the sink for frames of a given size.
+
+    """
+    if output.lower().endswith(VIDEO_EXTENSIONS):
+        return lambda size: FfmpegPipe(output, size, fps, queue_size)
+    return lambda size: PngSequence(output, size, workers, queue_size)
+
+
+def main(argv=None):
+    """Command line entry point of the frame exporter."""
+    parser = argparse.ArgumentParser(description='Run a pandemic simulation offscreen and export its frames as a '
+                                                 'png sequence, or a video or gif encoded by ffmpeg.')
+    parser.add_argument('output', help=f"directory for png frames, or a video file ({', '.join(VIDEO_EXTENSIONS)})")
+    parser.add_argument('--config', default=config.DEFAULT_FILE, help='path of the yaml configuration file')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='maximum number of frames to simulate (default: until infection free)')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the random number generator')
+    parser.add_argument('--every', type=int, default=1, help='export every this many frames')
+    parser.add_argument('--fps', type=float, default=None, help='frames per second of a video (default: tick rate)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='threads encoding png frames (default: one per core)')
+    parser.add_argument('--queue-size', type=int, default=8,
+                        help='maximum number of frames waiting to be encoded')
+    args = parser.parse_args(argv)
+    # Never open a window, even where a display is available
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+    configs = config.load(args.config)
+    fps = args.fps or configs['timing']['tick_rate'] / args.every
+    our_population = population.People.from_config(configs, np.random.default_rng(args.seed))
+    with Exporter(configs, sink_factory(args.output, fps, args.workers, args.queue_size), args.every) as exporter:
+        headless.simulate(our_population, configs, frames=args.frames, recorder=exporter)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import csv
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import checkpoint
+import config
+import headless
+import population
+
+
+def _branch(snapshot, configurations, events, frames):
+    """Worker task: one branch, restored copy-on-write from the shared snapshot."""
+    people, frame, _ = checkpoint.restore(snapshot, mmap_mode='c')
+    return headless.simulate(people, configurations, frame + 1, frames, events)
+
+
+def fork(people, frame, configurations, branches, frames=None, workers=None, snapshot=None):
+    """
+    Runs several scenarios on from the same state of a population, each with its own events.
+
+    The population is checkpointed once. Each branch restores the checkpoint memory-mapped copy-on-write, so the
+    branches share the pages of the snapshot they only read and each keeps a private copy of just the pages it
+    changes, rather than every branch copying the whole population up front. The branches run concurrently in a
+    process pool and continue the population's random number stream, so until their events make them diverge they are
+    identical, which keeps comparisons between them fair.
+
+    Parameters
+    ----------
+    people : People object
+        The population to fork. It is not changed.
+    frame : int
+        Number of the last frame simulated. The branches start from the frame after it.
+    configurations : dict
+        Configuration dictionary from yaml file.
+    branches : dict
+        Maps the name of each branch to its list of events, in the format of the config file. Frame triggers are
+        frame numbers of the whole run, not counted from the fork.
+    frames : int
+        Number of the last frame to simulate. If None each branch runs until its population is infection free.
+    workers : int
+        Number of worker processes. If None one per CPU core, if 0 the branches run one after the other in this
+        process.
+    snapshot : string
+        Path to keep the snapshot at. If None it is written to a temporary directory and deleted afterwards.
+
+    Returns
+    -------
+    dict
+        Maps the name of each branch to its time series (dict, as returned by headless.simulate), in the order of
+        branches.
+
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = snapshot or os.path.join(directory, 'snapshot.ckpt')
+        checkpoint.save(path, people, frame)
+        if workers == 0:
+            return {name: _branch(path, configurations, events, frames) for name, events in branches.items()}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(_branch, path, configurations, events, frames)
+                       for name, events in branches.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+
+def run(configurations, frames=None, seed=None, workers=None):
+    """
+    Runs the shared part of a simulation up to the frame given by 'forking/frame' in the configuration, with the
+    configuration's events, then forks it into the branches of 'forking/branches'.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file, with a 'forking' section.
+    frames : int
+        Number of the last frame to simulate. If None each branch runs until its population is infection free.
+    seed : int or numpy SeedSequence
+        Seed of the run's random number generator.
+    workers : int
+        Number of worker processes, see fork.
+
+    Returns
+    -------
+    dict
+        Maps the name of each branch to its whole time series, from the first frame: the shared part followed by the
+        branch. The 'r_t' of the shared part is computed from the transmissions up to the fork.
+
+    """
+    config.validate_forking(configurations)
+    fork_frame = configurations['forking']['frame']
+    our_population = population.People.from_config(configurations, np.random.default_rng(seed))
+    shared = headless.simulate(our_population, configurations, 1, fork_frame)
+    branches = fork(our_population, fork_frame, configurations, configurations['forking']['branches'], frames,
+                    workers)
+    return {name: {key: np.concatenate((values, series[key])) for key, values in shared.items()}
+            for name, series in branches.items()}
+
+
+def write_csv(results, f):
+    """
+    Writes the time series of every branch as csv, with one row per branch and frame.
+
+    Parameters
+    ----------
+    results : dict
+        Maps the name of each branch to its time series, as returned by run.
+    f : file object
+        Open text file to write to.
+
+    Returns
+    -------
+    None
+
+    """
+    writer = csv.writer(f)
+    for i, (name, series) in enumerate(results.items()):
+        if i == 0:
+            writer.writerow(['branch', *series.keys()])
+        writer.writerows([name, *row] for row in zip(*series.values()))
+
+
+def main(argv=None):
+    """Command line entry point of the scenario comparison."""
+    parser = argparse.ArgumentParser(description="Run a simulation to 'forking/frame' once, then compare the "
+                                                 "scenarios of 'forking/branches' from that shared state.")
+    parser.add_argument('--config', default=config.DEFAULT_FILE, help='path of the yaml configuration file')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='number of the last frame to simulate (default: until infection free)')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the random number generator')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes running the branches (default: one per core, 0 runs them in this process)')
+    parser.add_argument('--output', default=None, help='csv file to write the time series to (default: stdout)')
+    args = parser.parse_args(argv)
+
+    results = run(config.load(args.config), args.frames, args.seed, args.workers)
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_csv(results, f)
+    else:
+        write_csv(results, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
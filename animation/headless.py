@@ -0,0 +1,230 @@
+import argparse
+import checkpoint
+import csv
+import logging
+import sys
+import numpy as np
+import config
+import metapopulation
+import population
+import profiling
+import recording
+
+# Series of values for the people infected on each frame rather than for the state on each frame. NaN on frames when
+# no one was infected
+COHORT_SERIES = ('r_t',)
+
+
+def reproduction_series(our_population, frames):
+    """
+    Effective reproduction number R(t) of the people infected on each frame, from the population's transmission log,
+    see TransmissionLog.reproduction_numbers.
+
+    Parameters
+    ----------
+    our_population : People object
+        The population.
+    frames : numpy array of ints
+        Consecutive frame numbers.
+
+    Returns
+    -------
+    numpy array of floats
+        R(t) for each frame, NaN when no one was infected on it or the population has no transmission log.
+
+    """
+    r_t = np.full(frames.size, np.nan)
+    if our_population.transmissions is not None and frames.size:
+        cohorts, numbers, _ = our_population.transmissions.reproduction_numbers(n_people=len(our_population))
+        positions = cohorts - frames[0]
+        inside = (positions >= 0) & (positions < frames.size)
+        r_t[positions[inside]] = numbers[inside]
+    return r_t
+
+
+def simulate(our_population, configurations, start=1, frames=None, events=None, recorder=None,
+             checkpoint_file=None, checkpoint_every=None):
+    """
+    Drives People.update and People.test_population of a population once per frame.
+
+    Parameters
+    ----------
+    our_population : People object
+        The population, which is changed in place.
+    configurations : dict
+        Configuration dictionary from yaml file.
+    start : int
+        Number of the first frame to simulate.
+    frames : int
+        Number of the last frame to simulate. If None the simulation runs until the population is infection free.
+    events : list
+        Government advice events. If None those of the configuration.
+    recorder : Recorder object
+        Records every frame if given.
+    checkpoint_file : string
+        Path of a checkpoint written when the simulation stops, see checkpoint.save. Nothing is written if None.
+    checkpoint_every : int
+        Number of frames between checkpoints written while the simulation runs, each replacing the last. Only used
+        with checkpoint_file.
+
+    Returns
+    -------
+    dict
+        Per-frame time series: 'frame', one entry per key of People.status_numbers, one per key of
+        People.epi_stats and 'r_t', see reproduction_series, each a numpy array. R(t) is computed from the
+        transmission log once the simulation stops, so the values of the people still infected then are underestimates.
+
+    """
+    events = events if events is not None else configurations['events']
+    series = {'frame': []}
+    series.update({key: [] for key in our_population.status_numbers})
+    series.update({key: [] for key in our_population.epi_stats})
+
+    frame_number = start
+    while not our_population.infection_free and (frames is None or frame_number <= frames):
+        our_population.update(frame_number,
+                              configurations['pandemic']['at_risk_age'],
+                              configurations['pandemic']['collision_detection'],
+                              events)
+        our_population.test_population()
+        if recorder is not None:
+            recorder.add(our_population)
+        if checkpoint_file and checkpoint_every and frame_number % checkpoint_every == 0:
+            checkpoint.save(checkpoint_file, our_population, frame_number)
+
+        series['frame'].append(frame_number)
+        for key, value in our_population.status_numbers.items():
+            series[key].append(value)
+        for key, value in our_population.epi_stats.items():
+            series[key].append(value)
+        frame_number += 1
+
+    if checkpoint_file:
+        checkpoint.save(checkpoint_file, our_population, frame_number - 1)
+    series = {key: np.array(values) for key, values in series.items()}
+    series['r_t'] = reproduction_series(our_population, series['frame'])
+    return series
+
+
+def run(configurations, frames=None, seed=None, profiler=profiling.NULL, record=None, resume=None,
+        checkpoint_file=None, checkpoint_every=None):
+    """
+    Runs a simulation without a display, see simulate.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    frames : int
+        Number of the last frame to simulate. If None the simulation runs until the population is infection free.
+    seed : int or numpy SeedSequence
+        Seed of the run's random number generator. Runs with the same configuration and seed are identical.
+    profiler : Profiler object
+        Times the phases of each frame. Disabled by default.
+    record : string
+        Path of a file to record every frame to, for replay.py. Nothing is recorded if None.
+    resume : string
+        Path of a checkpoint to resume from instead of starting a new population. The population, its random number
+        generator and its events are restored from it and the simulation continues from the following frame.
+    checkpoint_file : string
+        Path of a checkpoint to write when the simulation stops, and every checkpoint_every frames if given.
+    checkpoint_every : int
+        Number of frames between checkpoints.
+
+    Returns
+    -------
+    dict
+        Per-frame time series, see simulate.
+
+    """
+    start, events = 1, None
+    if resume:
+        our_population, last_frame, events = checkpoint.restore(resume)
+        start = last_frame + 1
+    else:
+        our_population = population.People.from_config(configurations, np.random.default_rng(seed))
+    our_population.profiler = profiler
+
+    recorder = None
+    if record:
+        metadata = {'seed': seed if isinstance(seed, int) else None,
+                    'collision_detection': configurations['pandemic']['collision_detection']}
+        recorder = recording.Recorder(record, our_population, metadata=metadata)
+    try:
+        return simulate(our_population, configurations, start, frames, events, recorder, checkpoint_file,
+                        checkpoint_every)
+    finally:
+        if recorder is not None:
+            recorder.close()
+
+
+def write_csv(series, f):
+    """
+    Writes the time series returned by run as csv with one row per frame.
+
+    Parameters
+    ----------
+    series : dict
+        Time series as returned by run.
+    f : file object
+        Open text file to write to.
+
+    Returns
+    -------
+    None
+
+    """
+    writer = csv.writer(f)
+    writer.writerow(series.keys())
+    writer.writerows(zip(*series.values()))
+
+
+def main(argv=None):
+    """Command line entry point of the headless runner."""
+    parser = argparse.ArgumentParser(description='Run a pandemic simulation without a display.')
+    parser.add_argument('--config', default=config.DEFAULT_FILE, help='path of the yaml configuration file')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='maximum number of frames to simulate (default: until infection free)')
+    parser.add_argument('--collision', default=None, help='override pandemic/collision_detection')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the random number generator')
+    parser.add_argument('--output', default=None, help='csv file to write the time series to (default: stdout)')
+    parser.add_argument('--trace', default=None, help='Chrome trace file to write the phase timings to')
+    parser.add_argument('--record', default=None, help='file to record every frame to, for replay.py')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint file to write when the simulation stops')
+    parser.add_argument('--checkpoint-every', type=int, default=None,
+                        help='also write the checkpoint every this many frames')
+    parser.add_argument('--resume', default=None,
+                        help='checkpoint file to resume from; --frames is then the number of the last frame')
+    parser.add_argument('--metapopulation', action='store_true',
+                        help="simulate the regions of the 'metapopulation' section, linked by migration")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='override metapopulation/workers, the number of processes advancing the regions')
+    parser.add_argument('--log-level', default='WARNING',
+                        help="logging level, e.g. INFO to log each switch of the 'auto' collision mode")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(name)s: %(message)s')
+    if (args.trace or args.record or args.checkpoint or args.resume) and args.metapopulation:
+        parser.error('--trace, --record, --checkpoint and --resume are not supported with --metapopulation')
+
+    configs = config.load(args.config)
+    if args.collision:
+        configs['pandemic']['collision_detection'] = args.collision
+        config.validate(configs)
+
+    if args.metapopulation:
+        series = metapopulation.run(configs, args.frames, args.seed, args.workers)
+    else:
+        profiler = profiling.Profiler(trace=True) if args.trace else profiling.NULL
+        series = run(configs, args.frames, args.seed, profiler, args.record, args.resume, args.checkpoint,
+                     args.checkpoint_every)
+    if args.trace:
+        profiler.write_trace(args.trace)
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_csv(series, f)
+    else:
+        write_csv(series, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,134 @@
-import tools
 import numpy as np
+import tools
+import config
+
+# Integer codes used by the array-backed population store. The order matches the keys of People.status_numbers and
+# the colours listed under appearance/people in the config file.
+HEALTHY = 0
+RECOVERED = 1
+DEAD = 2
+INFECTED = 3
+
+
+class Duration:
+    """
+    The number of frames people spend in a status, drawn for each person from a distribution.
+
+    Attributes
+    ----------
+    distribution : string
+        'fixed' (parameter 'frames'), 'uniform' (integers between 'low' and 'high' inclusive), 'normal' or 'gamma'
+        (both with a 'mean' and a standard deviation 'sd'). Draws are rounded to whole frames and never negative.
+    parameters : dict
+        The parameters of the distribution.
+
+    """
+    PARAMETERS = {'fixed': ('frames',),
+                  'uniform': ('low', 'high'),
+                  'normal': ('mean', 'sd'),
+                  'gamma': ('mean', 'sd'),
+                  }
+
+    def __init__(self, distribution='fixed', **parameters):
+        if distribution not in self.PARAMETERS:
+            raise config.ConfigError(f"Unknown duration distribution '{distribution}'. Expected one of "
+                                     f"{list(self.PARAMETERS)}.")
+        if set(parameters) != set(self.PARAMETERS[distribution]):
+            raise config.ConfigError(f"A '{distribution}' duration needs exactly the parameters "
+                                     f"{list(self.PARAMETERS[distribution])}, got {list(parameters)}")
+        self.distribution = distribution
+        self.parameters = parameters
+
+    def spec(self):
+        """The distribution and its parameters as one dictionary, as given in the config file."""
+        return {'distribution': self.distribution, **self.parameters}
 
-configs = tools.load_yaml('config.yaml')
+    def draw(self, n, rng):
+        """Durations, in frames, of n people as an array of ints."""
+        p = self.parameters
+        if self.distribution == 'fixed':
+            return np.full(n, p['frames'], dtype=np.int64)
+        if self.distribution == 'uniform':
+            return rng.integers(p['low'], p['high'] + 1, size=n)
+        if self.distribution == 'normal':
+            frames = rng.normal(p['mean'], p['sd'], size=n)
+        else:
+            frames = rng.gamma((p['mean'] / p['sd']) ** 2, p['sd'] ** 2 / p['mean'], size=n)
+        return np.maximum(np.rint(frames), 0).astype(np.int64)
 
 
 class Status:
-    def __init__(self, status, speed, frame_limit):
+    """
+    A health status and the behaviour of the people in it.
+
+    Attributes
+    ----------
+    status : string
+        Name of the status.
+    speed : float
+        Speed of the people in this status.
+    frame_limit : float
+        Number of frames people stay infected, for the infected status, or stay drawn after death, for the dead
+        status. Used for everyone unless a duration is given.
+    code : int
+        Integer code of the status.
+    duration : Duration object
+        Distribution of the time each person spends in this status, replacing frame_limit. None if not given.
+
+    """
+    def __init__(self, status, speed, frame_limit, code, duration=None):
         self.status = status
         self.speed = speed
         self.frame_limit = frame_limit
+        self.code = code
+        self.duration = duration
+
+    def __eq__(self, other):
+        """Statuses are equal when they describe the same health state, whichever population they were built for"""
+        return isinstance(other, Status) and self.code == other.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+
+def build_statuses(configurations, rng=None):
+    """
+    Creates the four Status objects, drawing each speed and frame limit from the ranges given in the configuration.
+    A status given a 'duration' distribution gets a Duration object.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    rng : numpy Generator
+        Random number generator to draw from. If None the standard library's global random state is used.
+
+    Returns
+    -------
+    tuple of Status objects
+        The healthy, recovered, dead and infected statuses, indexed by their integer code.
+
+    """
+    people = configurations['people']
+    built = {}
+    for name, code in (('healthy', HEALTHY), ('infected', INFECTED), ('recovered', RECOVERED), ('dead', DEAD)):
+        duration = people[name].get('duration')
+        built[code] = Status(name,
+                             tools.random_between(people[name]['speed'], rng),
+                             tools.random_between(people[name]['frame_limit'], rng),
+                             code,
+                             Duration(**duration) if duration else None)
+    return tuple(built[code] for code in range(len(built)))
 
 
-healthy = Status('healthy',
-                 tools.random_between(configs['people']['healthy']['speed']),
-                 tools.random_between(configs['people']['healthy']['frame_limit']))
-infected = Status('infected',
-                  tools.random_between(configs['people']['infected']['speed']),
-                  tools.random_between(configs['people']['infected']['frame_limit']))
-recovered = Status('recovered',
-                   tools.random_between(configs['people']['recovered']['speed']),
-                   tools.random_between(configs['people']['recovered']['frame_limit']))
-dead = Status('dead',
-              tools.random_between(configs['people']['dead']['speed']),
-              tools.random_between(configs['people']['dead']['frame_limit']))
+def __getattr__(name):
+    """
+    Statuses shared by populations not given their own: 'statuses' (indexed by integer code) and 'healthy',
+    'recovered', 'dead' and 'infected'. Built from the default configuration file on first use rather than on import.
+    """
+    if name not in ('statuses', 'healthy', 'recovered', 'dead', 'infected'):
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    shared = build_statuses(config.load())
+    globals().update(statuses=shared, healthy=shared[HEALTHY], recovered=shared[RECOVERED], dead=shared[DEAD],
+                     infected=shared[INFECTED])
+    return globals()[name]
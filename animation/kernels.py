@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def move_and_bounce(pos, vector, speed, var_speed, size, dimensions):
+    """
+    Moves every person in a population one step and reflects those who hit the environment's boundary.
+
+    The whole-population equivalent of calling Person.move followed by Person.boundary on every person, giving the
+    same trajectories. Both the pos and vector arrays are updated in place.
+
+    Parameters
+    ----------
+    pos : (n, 2) numpy array of floats
+        Positions of the people.
+    vector : (n, 2) numpy array of floats
+        Directions of motion of the people.
+    speed : (n,) numpy array of floats
+        Health status dependant speed of each person.
+    var_speed : (n,) numpy array of floats
+        Speed multiplier of each person, altered by events.
+    size : int or (n,) numpy array of ints
+        Radius, in number of pixels, of the people.
+    dimensions : 2 element numpy array of ints
+        Width and height bounds of the environment.
+
+    Returns
+    -------
+    None
+
+    """
+    pos += vector * speed[:, np.newaxis] * var_speed[:, np.newaxis]
+
+    size = np.reshape(size, (-1, 1))
+    magnitude = np.abs(vector)
+    np.copyto(vector, magnitude, where=pos - size <= 0)
+    np.copyto(vector, -magnitude, where=pos + size >= dimensions)
@@ -0,0 +1,291 @@
+import copy
+import multiprocessing
+import os
+import numpy as np
+import config
+import health
+import population
+
+
+def region_configurations(configurations):
+    """
+    The configuration of each region of a metapopulation: the shared configuration with the region's environment
+    dimensions and numbers of people.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file, with a 'metapopulation' section.
+
+    Returns
+    -------
+    list of dicts
+        One configuration dictionary per region, as accepted by People.from_config.
+
+    """
+    regions = []
+    for region in configurations['metapopulation']['regions']:
+        region_configs = copy.deepcopy(configurations)
+        region_configs['environment']['dimensions'] = list(region['dimensions'])
+        region_configs['people']['number'] = region['people']
+        region_configs['people']['initially_infected'] = region['initially_infected']
+        regions.append(region_configs)
+    return regions
+
+
+def emigrate(people, rate, region, n_regions):
+    """
+    Chooses the people leaving a region this frame and where they go. Every living person leaves with probability
+    'rate', for one of the other regions chosen uniformly at random.
+
+    Parameters
+    ----------
+    people : People object
+        The region's population. The emigrants are removed from it.
+    rate : float
+        Chance that a living person leaves.
+    region : int
+        Index of the region.
+    n_regions : int
+        Number of regions in the metapopulation.
+
+    Returns
+    -------
+    dict
+        Maps the index of each destination region to the rows of the people going there (see People.extract).
+
+    """
+    if n_regions < 2 or rate == 0:
+        return {}
+    store = people.store
+    leaving = np.flatnonzero((people.rng.random(len(store)) < rate) & (store.status != health.DEAD))
+    destinations = people.rng.integers(n_regions - 1, size=leaving.size)
+    destinations += destinations >= region
+    rows = people.extract(leaving)
+    return {int(destination): {field: values[destinations == destination] for field, values in rows.items()}
+            for destination in np.unique(destinations)}
+
+
+class Regions:
+    """
+    Some of the regions of a metapopulation, advanced together by one worker.
+
+    Attributes
+    ----------
+    people : dict
+        Maps the index of each region to its population.
+    n_regions : int
+        Number of regions in the whole metapopulation.
+    migration_rate : float
+        Chance per frame that a living person moves to another region.
+
+    """
+    def __init__(self, configurations, indices, seeds):
+        regions = region_configurations(configurations)
+        self._configurations = configurations
+        self.n_regions = len(regions)
+        self.migration_rate = configurations['metapopulation']['migration_rate']
+        self.people = {}
+        for i in indices:
+            rng = np.random.default_rng(seeds[i])
+            self.people[i] = population.People.from_config(regions[i], rng)
+
+    def step(self, frame, arrivals):
+        """
+        Admits the people arriving in each region, advances every region one frame and chooses who leaves.
+
+        Parameters
+        ----------
+        frame : int
+            Frame number of the simulation.
+        arrivals : dict
+            Maps the index of a region to the list of rows of the people arriving there, in order of origin.
+
+        Returns
+        -------
+        dict
+            Maps the index of each region to its status numbers (dict), its finished totals (tuple, as returned by
+            People.finished_totals) and its departures (dict, as returned by emigrate).
+
+        """
+        configurations = self._configurations
+        reports = {}
+        for i, people in self.people.items():
+            for rows in arrivals.get(i, ()):
+                people.admit(rows)
+            people.update(frame,
+                          configurations['pandemic']['at_risk_age'],
+                          configurations['pandemic']['collision_detection'],
+                          configurations['events'])
+            people.test_population()
+            departures = emigrate(people, self.migration_rate, i, self.n_regions)
+            reports[i] = (people.status_numbers, people.finished_totals(), departures)
+        return reports
+
+
+def _serve(connection, configurations, indices, seeds):
+    """Worker process: owns some regions and advances them one frame per message until it receives None."""
+    regions = Regions(configurations, indices, seeds)
+    message = connection.recv()
+    while message is not None:
+        connection.send(regions.step(*message))
+        message = connection.recv()
+    connection.close()
+
+
+class Metapopulation:
+    """
+    Several regions, each with its own environment and population, linked by migration.
+
+    Each region only ever checks its own people for contacts, so the cost of a frame grows with the size of the
+    regions rather than of the whole metapopulation. The regions are shared between worker processes, which keep
+    their populations for the whole run and advance them independently; only the migrants are exchanged, once per
+    frame. Each region has its own random number generator spawned from 'seed' and migrants are admitted in order of
+    origin, so a run's result does not depend on the number of workers.
+
+    Attributes
+    ----------
+    n_regions : int
+        Number of regions.
+    status_numbers : list of dicts
+        Status numbers of each region after the last frame.
+    finished_totals : list of tuples
+        People who have recovered or died in each region after the last frame, and the people they infected.
+
+    """
+    def __init__(self, configurations, seed=None, workers=None):
+        config.validate_metapopulation(configurations)
+        self.n_regions = len(configurations['metapopulation']['regions'])
+        seeds = np.random.SeedSequence(seed).spawn(self.n_regions)
+        if workers is None:
+            workers = configurations['metapopulation']['workers']
+        if workers is None:
+            workers = os.cpu_count()
+        workers = min(workers, self.n_regions)
+
+        self._local = None
+        self._workers = []
+        if workers == 0:
+            self._local = Regions(configurations, range(self.n_regions), seeds)
+        else:
+            context = multiprocessing.get_context()
+            for indices in np.array_split(np.arange(self.n_regions), workers):
+                connection, worker_connection = context.Pipe()
+                process = context.Process(target=_serve, daemon=True,
+                                          args=(worker_connection, configurations, indices.tolist(), seeds))
+                process.start()
+                worker_connection.close()
+                self._workers.append((indices.tolist(), connection, process))
+
+        self._arrivals = {}
+        self.status_numbers = [None] * self.n_regions
+        self.finished_totals = [None] * self.n_regions
+
+    def step(self, frame):
+        """
+        Advances every region one frame, then sends the people leaving each region to their destinations, where they
+        are admitted at the start of the next frame.
+
+        Parameters
+        ----------
+        frame : int
+            Frame number of the simulation.
+
+        Returns
+        -------
+        None
+
+        """
+        arrivals, self._arrivals = self._arrivals, {}
+        if self._local is not None:
+            reports = self._local.step(frame, arrivals)
+        else:
+            for indices, connection, _ in self._workers:
+                connection.send((frame, {i: arrivals[i] for i in indices if i in arrivals}))
+            reports = {}
+            for _, connection, _ in self._workers:
+                reports.update(connection.recv())
+
+        for i in range(self.n_regions):
+            self.status_numbers[i], self.finished_totals[i], departures = reports[i]
+            for destination, rows in departures.items():
+                self._arrivals.setdefault(destination, []).append(rows)
+
+    @property
+    def totals(self):
+        """Status numbers summed over every region. Migrants are counted in the region they left until they arrive."""
+        totals = dict.fromkeys(self.status_numbers[0], 0)
+        for status_numbers in self.status_numbers:
+            for key, value in status_numbers.items():
+                totals[key] += value
+        return totals
+
+    @property
+    def r_zero(self):
+        """
+        Mean number of people infected by those who have recovered or died, over every region. The people who migrate
+        are not in the transmission log of the region they arrive in, so the regions' basic reproduction numbers cannot
+        be combined.
+        """
+        finished = sum(n for n, _ in self.finished_totals)
+        infections = sum(infections for _, infections in self.finished_totals)
+        return infections / finished if finished else 0
+
+    @property
+    def infection_free(self):
+        """Whether no one in any region, or in transit between regions, is infected."""
+        return all(numbers['infected'] == 0 for numbers in self.status_numbers)
+
+    def close(self):
+        """Stops the worker processes."""
+        for _, connection, process in self._workers:
+            connection.send(None)
+            connection.close()
+            process.join()
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run(configurations, frames=None, seed=None, workers=None):
+    """
+    Runs a metapopulation without a display, see headless.run.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file, with a 'metapopulation' section.
+    frames : int
+        Maximum number of frames to simulate. If None the simulation runs until every region is infection free.
+    seed : int or numpy SeedSequence
+        Root seed of the regions' random number generators. Runs with the same configuration and seed are identical.
+    workers : int
+        Number of worker processes. If None 'metapopulation/workers' from the configuration.
+
+    Returns
+    -------
+    dict
+        Per-frame time series: 'frame', one entry per key of People.status_numbers summed over the regions, 'r_zero'
+        and the number infected in each region, 'infected_0', 'infected_1', etc., each a numpy array.
+
+    """
+    series = {}
+    with Metapopulation(configurations, seed, workers) as metapopulation:
+        frame_number = 1
+        while frames is None or frame_number <= frames:
+            metapopulation.step(frame_number)
+            values = {'frame': frame_number}
+            values.update(metapopulation.totals)
+            values['r_zero'] = metapopulation.r_zero
+            values.update({f'infected_{i}': numbers['infected']
+                           for i, numbers in enumerate(metapopulation.status_numbers)})
+            for key, value in values.items():
+                series.setdefault(key, []).append(value)
+            if metapopulation.infection_free:
+                break
+            frame_number += 1
+    return {key: np.array(values) for key, values in series.items()}
@@ -0,0 +1,237 @@
+from collections import OrderedDict
+import pygame
+import tools
+import rendering
+
+
+class LabelCache:
+    """
+    Cache of rendered text surfaces keyed by text and colour, so each distinct label is only rendered once.
+
+    Attributes
+    ----------
+    font : pygame Font
+        The font labels are rendered with.
+    max_size : int
+        Number of labels kept; the least recently used label is dropped beyond this.
+
+    """
+    def __init__(self, font, max_size=256):
+        self.font = font
+        self.max_size = max_size
+        self._labels = OrderedDict()
+
+    def render(self, text, colour):
+        """The rendered surface of a label, rendering it only on the first request."""
+        key = (text, tuple(colour))
+        label = self._labels.get(key)
+        if label is None:
+            label = self.font.render(text, True, colour)
+            self._labels[key] = label
+            if len(self._labels) > self.max_size:
+                self._labels.popitem(last=False)
+        else:
+            self._labels.move_to_end(key)
+        return label
+
+
+class ScrollingPlot:
+    """
+    Live stacked plot of the population statistics, kept on its own surface used as a fixed width ring buffer.
+
+    Each new column is written once at the ring buffer's write position. Drawing blits the two halves of the ring
+    either side of the write position to the screen, so the plot scrolls without redrawing any of its history. The
+    stacked heights are only recomputed when the counts change.
+
+    Attributes
+    ----------
+    origin : list of ints
+        Top left of the plot on the screen.
+    surface : pygame Surface
+        The ring buffer, one pixel column per sample.
+    colours : list of colours
+        Colour of each status, in the order of People.status_numbers.
+    frames_per_column : int
+        Number of added frames per plot column.
+
+    """
+    HEIGHT = 100
+
+    def __init__(self, origin, width, colours, bg_colour, frames_per_column=1):
+        self.origin = origin
+        self.surface = pygame.Surface((width, self.HEIGHT))
+        self.surface.fill(bg_colour)
+        self.colours = colours
+        self.bg_colour = bg_colour
+        self.frames_per_column = frames_per_column
+        self._column = 0
+        self._wrapped = False
+        self._frames = 0
+        self._counts = None
+        self._heights = []
+        self._changed = False
+
+    def add(self, status_numbers):
+        """Adds one frame of statistics to the plot, writing a new column every frames_per_column frames."""
+        self._frames += 1
+        if self._frames % self.frames_per_column:
+            return
+        counts = tuple(status_numbers.values())
+        if counts != self._counts:
+            self._counts = counts
+            self._heights = tools.round_to_total(list(counts), total=self.HEIGHT)
+
+        self.surface.fill(self.bg_colour, (self._column, 0, 1, self.HEIGHT))
+        delta_y = 0
+        for height, colour in zip(self._heights, self.colours):
+            if height:
+                self.surface.fill(colour, (self._column, delta_y, 1, height))
+            delta_y += height
+
+        self._column += 1
+        if self._column == self.surface.get_width():
+            self._column = 0
+            self._wrapped = True
+        self._changed = True
+
+    def draw(self, surface):
+        """
+        Draws the plot if columns were added since it was last drawn.
+
+        Returns
+        -------
+        list of pygame Rects
+            Regions of the surface changed, empty if nothing was drawn.
+
+        """
+        if not self._changed:
+            return []
+        self._changed = False
+        width = self.surface.get_width()
+        if not self._wrapped:
+            return [surface.blit(self.surface, self.origin, (0, 0, self._column, self.HEIGHT))]
+        oldest = width - self._column
+        surface.blit(self.surface, self.origin, (self._column, 0, oldest, self.HEIGHT))
+        surface.blit(self.surface, (self.origin[0] + oldest, self.origin[1]), (0, 0, self._column, self.HEIGHT))
+        return [pygame.Rect(self.origin, (width, self.HEIGHT))]
+
+
+class StatsText:
+    """
+    Live text labels of the population statistics, arranged two per row. A label is only re-rendered and repainted
+    when its count changes.
+
+    Attributes
+    ----------
+    labels : LabelCache
+        Cache the labels are rendered through.
+    origin : list of ints
+        Top left of the first label on the screen.
+    colours : list of colours
+        Colour of each status, in the order of People.status_numbers.
+
+    """
+    SPACING = (140, 50)
+
+    def __init__(self, labels, origin, colours, bg_colour):
+        self.labels = labels
+        self.origin = origin
+        self.colours = colours
+        self.bg_colour = bg_colour
+        self._shown = {}
+
+    def draw(self, surface, status_numbers):
+        """
+        Draws the labels whose counts changed since they were last drawn.
+
+        Returns
+        -------
+        list of pygame Rects
+            Regions of the surface changed.
+
+        """
+        dirty = []
+        for i, (stat, colour) in enumerate(zip(status_numbers.items(), self.colours)):
+            if self._shown.get(stat[0]) == stat[1]:
+                continue
+            self._shown[stat[0]] = stat[1]
+            slot = pygame.Rect(self.origin[0] + (i % 2) * self.SPACING[0],
+                               self.origin[1] + (i // 2) * self.SPACING[1],
+                               *self.SPACING)
+            surface.fill(self.bg_colour, slot)
+            surface.blit(self.labels.render(f"{stat[0]}: {stat[1]}".capitalize(), colour), slot)
+            dirty.append(slot)
+        return dirty
+
+
+class TimingText:
+    """
+    Live panel of the average time of each profiled phase. The text is refreshed every 'interval' frames so that the
+    labels stay readable and few distinct labels are rendered.
+
+    Attributes
+    ----------
+    labels : LabelCache
+        Cache the labels are rendered through.
+    origin : list of ints
+        Top left of the panel on the screen.
+    colour : colour
+        Colour of the text.
+    interval : int
+        Number of frames between refreshes of the text.
+
+    """
+    LINE_HEIGHT = 16
+    WIDTH = 220
+
+    def __init__(self, labels, origin, colour, bg_colour, interval=15):
+        self.labels = labels
+        self.origin = origin
+        self.colour = colour
+        self.bg_colour = bg_colour
+        self.interval = interval
+        self._frames = 0
+        self._lines = []
+
+    def draw(self, surface, timings):
+        """
+        Draws the panel.
+
+        Parameters
+        ----------
+        surface : pygame Surface
+            The surface to draw on.
+        timings : dict
+            Phase timings as returned by Profiler.timings.
+
+        Returns
+        -------
+        list of pygame Rects
+            Region of the surface drawn on.
+
+        """
+        if self._frames % self.interval == 0:
+            self._lines = [f"{name}: {timing['average'] * 1000:.2f} ms" for name, timing in timings.items()]
+        self._frames += 1
+        panel = pygame.Rect(self.origin, (self.WIDTH, self.LINE_HEIGHT * len(self._lines)))
+        surface.fill(self.bg_colour, panel)
+        for i, line in enumerate(self._lines):
+            surface.blit(self.labels.render(line, self.colour), (panel.x, panel.y + i * self.LINE_HEIGHT))
+        return [panel]
+
+
+def plot_width(configurations):
+    """
+    Width of the scrolling plot: the width of the environment less a margin either side, the margin being the plot's
+    x origin. When the statistics text is shown the plot ends a margin before it, so that the two never overlap.
+    """
+    origin = configurations['appearance']['origins']['plot']
+    right = configurations['environment']['dimensions'][0]
+    if configurations['appearance']['show']['text']:
+        right = min(right, configurations['appearance']['origins']['text'][0])
+    return right - 2 * origin[0]
+
+
+def status_colours(configurations):
+    """Colour of each status from the config file, in the order of People.status_numbers."""
+    return [configurations['appearance']['people'][key] for key in rendering.COLOUR_KEYS]
@@ -1,16 +1,53 @@
-import numpy as np
 import math
+import numpy as np
 import health
-import tools
+import environment
 import quadtree
+import kernels
+import collision
+import events as timeline
+import profiling
+import tiling
+import strategy
+import progression
+import transmission
+from store import PopulationStore
+
+
+def _tally(status, num_infected_by_me, n_codes):
+    """Count of each status code, the number of people who have recovered or died and the total they infected."""
+    finished = (status == health.RECOVERED) | (status == health.DEAD)
+    return (np.bincount(status, minlength=n_codes),
+            int(np.count_nonzero(finished)),
+            int(num_infected_by_me[finished].sum()))
+
+
+class _Field:
+    """Descriptor exposing one row of a PopulationStore array as an attribute of a Person view."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, person, owner):
+        if person is None:
+            return self
+        return getattr(person.people.store, self.name)[person.index]
+
+    def __set__(self, person, value):
+        getattr(person.people.store, self.name)[person.index] = value
 
 
 class Person:
     """
-    This is a class for each person in the population.
+    This is a class for each person in the population. A Person is a lightweight view onto row 'index' of the
+    population's PopulationStore; reading or writing an attribute reads or writes the underlying arrays.
 
     Attributes
     ----------
+    people : object of type People
+        The population this person belongs to.
+    index : int
+        Row of this person in the population's store.
     box : object of type Area
         The environment which bounds the person.
     age : float
@@ -19,10 +56,10 @@ class Person:
         Radius, in number of pixels, of the person displayed in the simulation.
     status : attribute of the Status objects
         Health status of the person.
-    days_infected : int
-        Number of frames since the person was infected.
-    days_dead : int
-        Number of frames since the person died.
+    infection_end : int
+        Frame on which the person, if infected, recovers or dies.
+    hidden_from : int
+        Frame from which the person, if dead, is no longer drawn.
     num_infected_by_me : int
         Count of the number of people this individual is responsible for infecting.
     _var_speed : float
@@ -33,18 +70,35 @@ class Person:
         Vx and Vy values defining the vector of motion for the person, scaled by the health status dependant speed
 
     """
+    __slots__ = ('people', 'index')
 
-    def __init__(self, box, age, size, status=health.healthy, days_infected=0, days_dead=0):
-        self.box = box
-        self.age = age
-        self.size = size
-        self.status = status
-        self.days_infected = days_infected
-        self.days_dead = days_dead
-        self.num_infected_by_me = 0
-        self._var_speed = 1.0
-        self.pos = np.random.rand(2) * self.box.dimensions
-        self.vector = np.array([tools.random_between([-1, 1]), tools.random_between([-1, 1])]) * self.status.speed
+    age = _Field('age')
+    infection_end = _Field('infection_end')
+    hidden_from = _Field('hidden_from')
+    num_infected_by_me = _Field('num_infected_by_me')
+    _var_speed = _Field('var_speed')
+    pos = _Field('pos')
+    vector = _Field('vector')
+
+    def __init__(self, people, index):
+        self.people = people
+        self.index = index
+
+    @property
+    def box(self):
+        return self.people.box
+
+    @property
+    def size(self):
+        return self.people.size
+
+    @property
+    def status(self):
+        return self.people.statuses[self.people.store.status[self.index]]
+
+    @status.setter
+    def status(self, status):
+        self.people.set_status(self.index, status.code)
 
     def __repr__(self):
         return f"Person: ({self.pos[0]}, {self.pos[1]})"
@@ -58,24 +112,23 @@ class Person:
 
     def infection(self):
         """Transmits the virus to the person. Changes the status attribute of the person object to health.infected."""
-        self.status = health.infected
+        self.people.set_status(self.index, health.INFECTED)
 
     def recovery(self):
         """The person recovers from infection. Changes the status attribute of the person object to health.recovered."""
-        self.status = health.recovered
+        self.people.set_status(self.index, health.RECOVERED)
 
     def death(self):
         """The person dies from infection. Changes the status attribute of the person object to health.dead."""
-        self.status = health.dead
+        self.people.set_status(self.index, health.DEAD)
 
     def checkup(self, age_lim):
         """
         Checks the health of the person and performs an action.
 
-        If the person's status is infected and...
-            a. if they are over a certain age and been infected for a certain number of days they die
-            b. if they are under a certain age and been infected for a certain number of days they recover
-            c. else the number of days infected attribute increases by one.
+        If the person's status is infected and their infection has reached its end frame...
+            a. if they are over a certain age they die
+            b. if they are under a certain age they recover.
 
         Parameters
         ----------
@@ -87,44 +140,40 @@ class Person:
         None
 
         """
-        if self.status == health.infected:
-            if self.age > age_lim and (self.days_infected > health.infected.frame_limit):
+        if self.status.code == health.INFECTED and self.infection_end <= self.people.frame:
+            if self.age > age_lim:
                 self.death()
-            elif self.age <= age_lim and (self.days_infected > health.infected.frame_limit):
-                self.recovery()
             else:
-                self.days_infected += 1
-        if self.status == health.dead:
-            self.days_dead += 1
+                self.recovery()
 
     def government_advice(self, frame, events):
         """
-        Handles an individual's response to government advice. Loops through event types from the config file and
-        alters an individual's behaviour (e.g. speed) file the frame trigger has been passed.
+        Handles an individual's response to government advice. Alters the individual's behaviour (e.g. speed) as each
+        event of the Timeline that fires on the frame and targets them says, as People.government_advice does for
+        everyone at once.
 
         Parameters
         ----------
         frame : int
             Animation frame number.
-        events : list
+        events : list or object of type Timeline
             List of events in the config file. Individual events are dictionaries.
 
         Returns
         -------
         None
 
+        Raises
+        ------
+        ValueError
+            If an enabled event has an unknown type and no speed of its own.
+
         """
-        for event in events:
-            if event['enable']:
-                if event['type'] == 'social distancing':
-                    if event['frame_trigger'] and event['frame_trigger']['frame'] == frame:
-                        self.behaviour_change(0.5)
-                if event['type'] == 'lockdown':
-                    if event['frame_trigger'] and event['frame_trigger']['frame'] == frame:
-                        self.behaviour_change(0.1)
-                if event['type'] == 'normal':
-                    if event['frame_trigger'] and event['frame_trigger']['frame'] == frame:
-                        self.behaviour_change(1.0)
+        if not isinstance(events, timeline.Timeline):
+            events = timeline.Timeline(events)
+        for action in events.actions(frame):
+            if action.targets(self.age, self.pos):
+                self.behaviour_change(action.speed)
 
     def move(self):
         """
@@ -176,55 +225,32 @@ class Person:
             'basic' = every person is checked against all other people to see if they are close enough for transmission
             'selective' = only healthy people are checked against infected people to see if they are close enough for
                           transmission.
+            'quadtree' = only the people found near this person by a search of qtree are checked.
+        qtree : object of type Quadtree
+            Quadtree holding a Point for every person in the population, required by the 'quadtree' mode.
 
         Returns
         -------
         None
 
         """
+        people = self.people
+        others = np.array([other.index for other in population], dtype=np.int64)
         if mode == 'basic':
-            for other in population:
-                # Only perform collision check for people that are not themselves
-                if self is not other:
-                    delta = self.pos - other.pos
-                    distance = math.hypot(delta[0], delta[1])
-                    if distance < self.size + other.size:
-                        if self.status == health.infected and other.status == health.healthy:
-                            other.infection()
-                            self.num_infected_by_me += 1
-                        if self.status == health.healthy and other.status == health.infected:
-                            self.infection()
-                            other.num_infected_by_me += 1
-
+            candidates = others
         elif mode == 'selective':
-            if self.status == health.healthy:
-                for other in population:
-                    if other.status == health.infected:
-                        delta = self.pos - other.pos
-                        distance = math.hypot(delta[0], delta[1])
-                        if distance < self.size + other.size:
-                            self.infection()
-                            other.num_infected_by_me += 1
-
+            infected = others[people.store.status[others] == health.INFECTED]
+            candidates = infected if self.status.code == health.HEALTHY else others[:0]
         elif mode == 'quadtree':
-            region = quadtree.Rectangle(self.pos[0], self.pos[1], self.size, self.size)
-            neighbours = qtree.query(region)
-            for neighbour in neighbours:
-                other = neighbour.data
-                if self is not other:
-                    delta = self.pos - other.pos
-                    distance = math.hypot(delta[0], delta[1])
-                    if distance < self.size + other.size:
-                        if self.status == health.infected and other.status == health.healthy:
-                            other.infection()
-                            self.num_infected_by_me += 1
-                        if self.status == health.healthy and other.status == health.infected:
-                            self.infection()
-                            other.num_infected_by_me += 1
-
+            region = quadtree.Rectangle(self.pos[0], self.pos[1], 2 * self.size, 2 * self.size)
+            candidates = np.array([neighbour.data.index for neighbour in qtree.query(region)], dtype=np.int64)
         else:
-            pass
-            # TODO raise error here is mode is not recognised
+            raise ValueError(f"Unknown collision detection mode '{mode}'")
+
+        candidates = candidates[candidates != self.index]
+        delta = people.store.pos[candidates] - self.pos
+        candidates = candidates[np.hypot(delta[:, 0], delta[:, 1]) < 2 * self.size]
+        people.infect_contacts(np.full(candidates.size, self.index), candidates)
 
 
 class People:
@@ -239,22 +265,63 @@ class People:
         Number of people initially infected in the population.
     box : object of type Area
         The environment which bounds the population.
-    persons : list of objects of type Person
-        Container for very person in the population.
+    size : int
+        Radius, in number of pixels, of every person in the population.
+    store : object of type PopulationStore
+        Array-backed state of every person in the population.
     infection_free : bool
         Indicator of where the population is free from infection or not.
     status_numbers : dict
         Container for the counts of the health status of very person in the population.
     epi_stats : dict
-        Container for some epidemic statistics.
+        Container for some epidemic statistics, see test_population.
+    statuses : tuple of Status objects
+        The health statuses used by this population, indexed by their integer code.
+    rng : numpy Generator
+        Source of every random number drawn by this population.
+    transmission_probability : float
+        Probability that a contact between a healthy and an infected person transmits the virus.
+    counts : numpy array of ints
+        Number of people with each status code, kept up to date by set_status.
+    debug : bool
+        If True every call of test_population checks the incremental counts against a full recount.
+    profiler : Profiler object
+        Times the phases of update and test_population. Defaults to the disabled profiler, profiling.NULL.
+    tiled_collider : TiledCollider object
+        Worker pool used by the 'tiled' collision mode, created on first use.
+    auto_collision : AutoCollision object
+        Chooses the collision mode of each frame of the 'auto' collision mode, created on first use if not given.
+    infected_index : InfectedIndex object
+        Index of the infected people used by the 'infected_index' collision mode, created on first use and then kept
+        up to date by set_status.
+    frame : int
+        Number of the frame being simulated, set by update. 0 before the first frame.
+    transitions : TransitionQueue object
+        The infected people, bucketed by the frame their infection ends on, see checkup.
+    transmissions : TransmissionLog object
+        Every infection of the population, including the initial ones. None once people have migrated in or out, see
+        extract and admit.
 
     """
 
-    def __init__(self, box, n_people, n_infected, size, ages):
+    def __init__(self, box, n_people, n_infected, size, ages, statuses=None, rng=None, debug=False,
+                 transmission_probability=1.0):
         self.n_people = n_people
         self.n_infected = n_infected
         self.box = box
-        self.persons = []
+        self.size = size
+        self.statuses = statuses if statuses is not None else health.statuses
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.debug = debug
+        self.transmission_probability = transmission_probability
+        self.profiler = profiling.NULL
+        self.tiled_collider = None
+        self.infected_index = None
+        self.auto_collision = None
+        self.frame = 0
+        self.transitions = progression.TransitionQueue()
+        self.transmissions = transmission.TransmissionLog()
+        self.store = PopulationStore(n_people)
         self.infection_free = False
         self.status_numbers = {'healthy': self.n_people - self.n_infected,
                                'recovered': 0,
@@ -262,13 +329,150 @@ class People:
                                'infected': self.n_infected,
                                }
         self.epi_stats = {'r_zero': 0}
+        self.counts = np.zeros(len(self.statuses), dtype=np.int64)
+        self._finished = 0
+        self._finished_infections = 0
+        self._events = None
+        self._timeline = None
+        self._index_cases = None
 
         # Populate with people...
         self.populate(size, ages)
 
+    @classmethod
+    def from_config(cls, configurations, rng=None):
+        """
+        Creates a population, its environment and its health statuses from a configuration.
+
+        Parameters
+        ----------
+        configurations : dict
+            Configuration dictionary, as returned by config.load.
+        rng : numpy Generator
+            Source of every random number drawn by the population, including its statuses' speeds and frame limits.
+
+        Returns
+        -------
+        People object
+
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        people = cls(environment.Area(np.array(configurations['environment']['dimensions'])),
+                     configurations['people']['number'],
+                     configurations['people']['initially_infected'],
+                     configurations['people']['radius'],
+                     configurations['people']['age_range'],
+                     statuses=health.build_statuses(configurations, rng),
+                     rng=rng,
+                     transmission_probability=configurations['pandemic']['transmission_probability'])
+        people.auto_collision = strategy.AutoCollision(**configurations['pandemic']['auto'])
+        return people
+
+    def state(self):
+        """
+        Everything needed to recreate the population exactly, including its random number generator's state and the
+        events last applied to it. See from_state and the checkpoint module.
+
+        Returns
+        -------
+        tuple
+            A dictionary of the population's settings and counters, which can be written as json, and a dictionary
+            of the store's arrays by field name.
+
+        """
+        auto_collision = None
+        if self.auto_collision is not None:
+            auto_collision = {key: getattr(self.auto_collision, key)
+                              for key in ('window', 'remeasure_every', 'hysteresis', 'explore_factor')}
+            auto_collision['candidates'] = list(self.auto_collision.candidates)
+        header = {'n_people': self.n_people,
+                  'n_infected': self.n_infected,
+                  'size': self.size,
+                  'dimensions': np.asarray(self.box.dimensions).tolist(),
+                  'statuses': [{'status': status.status, 'speed': status.speed, 'frame_limit': status.frame_limit,
+                                'code': status.code,
+                                'duration': status.duration.spec() if status.duration is not None else None}
+                               for status in self.statuses],
+                  'rng': self.rng.bit_generator.state,
+                  'debug': self.debug,
+                  'transmission_probability': self.transmission_probability,
+                  'auto_collision': auto_collision,
+                  'frame': self.frame,
+                  'transmissions': self.transmissions is not None,
+                  'counts': self.counts.tolist(),
+                  'finished': int(self._finished),
+                  'finished_infections': int(self._finished_infections),
+                  'infection_free': self.infection_free,
+                  'status_numbers': self.status_numbers,
+                  'epi_stats': {key: float(value) for key, value in self.epi_stats.items()},
+                  'events': self._events,
+                  }
+        arrays = {field: getattr(self.store, field) for field in PopulationStore.fields}
+        if self.transmissions is not None:
+            arrays.update({f'transmission_{field}': getattr(self.transmissions, f'{field}s')
+                           for field in transmission.TransmissionLog.FIELDS})
+        return header, arrays
+
+    @classmethod
+    def from_state(cls, header, arrays):
+        """
+        Recreates a population from its state, as returned by the state method, without drawing any random numbers.
+
+        Parameters
+        ----------
+        header : dict
+            The population's settings and counters.
+        arrays : dict
+            The store's arrays by field name. They are used as they are, not copied.
+
+        Returns
+        -------
+        People object
+
+        """
+        people = cls.__new__(cls)
+        people.n_people = header['n_people']
+        people.n_infected = header['n_infected']
+        people.box = environment.Area(np.array(header['dimensions']))
+        people.size = header['size']
+        people.statuses = tuple(health.Status(**dict(status, duration=health.Duration(**status['duration'])
+                                                     if status.get('duration') else None))
+                                for status in header['statuses'])
+        bit_generator = getattr(np.random, header['rng']['bit_generator'])()
+        bit_generator.state = header['rng']
+        people.rng = np.random.Generator(bit_generator)
+        people.debug = header['debug']
+        people.transmission_probability = header['transmission_probability']
+        people.profiler = profiling.NULL
+        people.tiled_collider = None
+        people.infected_index = None
+        people.auto_collision = None
+        if header['auto_collision'] is not None:
+            people.auto_collision = strategy.AutoCollision(**header['auto_collision'])
+        people.frame = header['frame']
+        people.store = PopulationStore.from_arrays(arrays)
+        infected = np.flatnonzero(people.store.status == health.INFECTED)
+        people.transitions = progression.TransitionQueue()
+        people.transitions.push(infected, people.store.infection_end[infected])
+        people.transmissions = None
+        people._index_cases = None
+        if header['transmissions']:
+            people.transmissions = transmission.TransmissionLog.from_arrays(
+                *(arrays[f'transmission_{field}'] for field in transmission.TransmissionLog.FIELDS))
+            people._index_cases = people.transmissions.index_cases()
+        people.infection_free = header['infection_free']
+        people.status_numbers = header['status_numbers']
+        people.epi_stats = header['epi_stats']
+        people.counts = np.array(header['counts'], dtype=np.int64)
+        people._finished = header['finished']
+        people._finished_infections = header['finished_infections']
+        people._events = header['events']
+        people._timeline = timeline.Timeline(people._events) if people._events is not None else None
+        return people
+
     def __len__(self):
-        """Special method returning the length of the 'persons' attribute i.e. population size"""
-        return len(self.persons)
+        """Special method returning the population size"""
+        return len(self.store)
 
     def __str__(self):
         """Special method returning a nicely formatted output for print"""
@@ -288,16 +492,28 @@ class People:
         return f"{self.__class__.__name__} ({stats_string})"
 
     def __getitem__(self, index):
-        """Special method returning the person in the population given an index int"""
-        return self.persons[index]
+        """
+        Special method returning the person in the population given an index int, or a list of them given a slice.
+        Person views are created on request rather than kept for everyone, so that large populations stay cheap to
+        create and restore.
+        """
+        if isinstance(index, slice):
+            return [Person(self, i) for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError('population index out of range')
+        return Person(self, index % len(self))
+
+    def __iter__(self):
+        """Special method iterating over a view of each person in the population"""
+        return (Person(self, i) for i in range(len(self)))
 
     def populate(self, size, ages):
         """
-        Creates many people and stores the objects in the 'persons' list attribute of this class.
+        Fills the store with the initial state of every person in the population.
 
-        Two loops initialise people: bounded by the environment, with random age attributes ranging from 0 to 100
-        (float) and of radius determined by the method input. The number of people created and their health status
-        is determined the attributes n_people and n_infected.
+        People are bounded by the environment, with random age attributes ranging between the given bounds (float)
+        and of radius determined by the method input. The first n_people - n_infected rows are healthy and the
+        remaining n_infected rows are infected.
 
         Parameters
         ----------
@@ -310,23 +526,110 @@ class People:
         None
 
         """
-        for _ in range(self.n_people - self.n_infected):
-            self.persons.append(Person(self.box,
-                                       tools.random_between(ages),
-                                       size=size
-                                       ))
-        for _ in range(self.n_infected):
-            self.persons.append(Person(self.box,
-                                       tools.random_between(ages),
-                                       size=size,
-                                       status=health.infected
-                                       ))
+        store = self.store
+        self.size = size
+        store.age[:] = self.rng.uniform(ages[0], ages[1], self.n_people)
+        store.vector[:] = self.rng.uniform(-1, 1, (self.n_people, 2))
+        store.pos[:] = self.rng.random((self.n_people, 2)) * self.box.dimensions
+        store.status[self.n_people - self.n_infected:] = health.INFECTED
+        self._schedule_infections(np.arange(self.n_people - self.n_infected, self.n_people))
+        self._index_cases = np.arange(self.n_people - self.n_infected, self.n_people)
+        self.transmissions.record(self.frame, transmission.NO_INFECTOR, self._index_cases)
+        store.vector *= self.speeds()[:, np.newaxis]
+        self.counts, self._finished, self._finished_infections = self.recount()
         self.test_population()
 
+    def visible(self):
+        """Boolean mask of the people to draw: everyone except those dead for longer than the dead frame limit."""
+        store = self.store
+        return (store.status != health.DEAD) | (store.hidden_from > self.frame)
+
+    def durations(self, code, n):
+        """
+        Number of frames each of n people entering a status spends in it: drawn from the status's duration if it has
+        one, otherwise its frame limit for everyone.
+
+        Parameters
+        ----------
+        code : int
+            The status code, INFECTED or DEAD.
+        n : int
+            Number of people.
+
+        Returns
+        -------
+        numpy array of ints
+
+        """
+        status = self.statuses[code]
+        if status.duration is not None:
+            return status.duration.draw(n, self.rng)
+        # The frame limit counts frames as the per-frame countdown it replaced did: infected people recovered once
+        # infected for more than the limit and the dead stayed drawn while dead for less than it
+        limit = math.floor(status.frame_limit) + 1 if code == health.INFECTED else math.ceil(status.frame_limit) - 1
+        return np.full(n, max(limit, 0), dtype=np.int64)
+
+    def _schedule_infections(self, indices):
+        """Sets the frame on which newly infected people's infections end and queues them for it."""
+        self.store.infection_end[indices] = self.frame + 1 + self.durations(health.INFECTED, indices.size)
+        self.transitions.push(indices, self.store.infection_end[indices])
+
+    def speeds(self):
+        """Health status dependant speed of every person in the population as an array."""
+        return np.array([status.speed for status in self.statuses])[self.store.status]
+
+    def checkup(self, age_lim):
+        """
+        Checks the health of every person in the population at once. See Person.checkup for the rules applied.
+
+        Only the people whose infection ends on this frame are looked at, taken from the transition queue, so the cost
+        is proportional to the number of transitions rather than to the population size.
+
+        Parameters
+        ----------
+        age_lim : float
+            Age above which an infected person dies.
+
+        Returns
+        -------
+        None
+
+        """
+        store = self.store
+        due = np.unique(self.transitions.pop(self.frame))
+        # People may have changed status since they were queued, e.g. through a Person view
+        due = due[(store.status[due] == health.INFECTED) & (store.infection_end[due] <= self.frame)]
+        self.set_status(due[store.age[due] > age_lim], health.DEAD)
+        self.set_status(due[store.age[due] <= age_lim], health.RECOVERED)
+
+    def government_advice(self, frame, events):
+        """
+        Applies government advice to the population. The events are compiled into a Timeline the first time they are
+        seen, after which each frame costs one lookup and an event changes the behaviour of everyone it targets in one
+        batch. See Person.government_advice for the per person equivalent.
+
+        Parameters
+        ----------
+        frame : int
+            Animation frame number.
+        events : list or object of type Timeline
+            List of events in the config file. Individual events are dictionaries.
+
+        Returns
+        -------
+        None
+
+        """
+        if not isinstance(events, timeline.Timeline):
+            if events is not self._events:
+                self._events = events
+                self._timeline = timeline.Timeline(events)
+            events = self._timeline
+        events.apply(self, frame)
+
     def update(self, frame, age_lim, mode_string, events):
         """
-        All actions to be performed on each person stored in the 'persons' attribute of this class for each frame of
-        animation.
+        All actions to be performed on each person in the population for each frame of animation.
 
         Parameters
         ----------
@@ -339,66 +642,270 @@ class People:
             'basic' = every person is checked against all other people to see if they are close enough for transmission
             'selective' = only healthy people are checked against infected people to see if they are close enough for
                           transmission.
-        events : list
-            List of government advice events on which each person acts individually/
+            'quadtree' = a flat quadtree is built over everyone and the contact pairs are found with a single
+                         self-join of the tree. Suited to clustered populations, where a uniform grid degrades.
+            'grid' = everyone is binned into a uniform grid of cells twice the radius wide and the contact pairs of
+                     neighbouring cells are found in bulk.
+            'tiled' = as 'grid', with the environment split into tiles processed in parallel by worker processes
+                      reading the population from shared memory.
+            'infected_index' = healthy people are checked against a grid of only the infected people, updated as
+                               people are infected and recover. Suited to the start and end of an epidemic, when few
+                               people are infected.
+            'auto' = one of the other modes, chosen each frame by a cost model from measurements of the previous
+                     frames, see strategy.AutoCollision.
+        events : list or object of type Timeline
+            Government advice events, either as listed in the config file or already compiled.
 
         Returns
         -------
         None
 
         """
-        qtree = quadtree.Quadtree(quadtree.Rectangle(self.box.dimensions[0] / 2,
-                                                     self.box.dimensions[1] / 2,
-                                                     self.box.dimensions[0] / 2,
-                                                     self.box.dimensions[1] / 2))
-        for person in self.persons:
-            person.checkup(age_lim)
-            person.government_advice(frame, events)
-            person.move()
-            person.boundary()
-            qtree.insert(quadtree.Point(person.pos[0], person.pos[1], person))
+        self.frame = frame
+        profiler = self.profiler
+        with profiler.phase('checkup'):
+            self.checkup(age_lim)
+        with profiler.phase('government_advice'):
+            self.government_advice(frame, events)
+
+        store = self.store
+        with profiler.phase('movement'):
+            kernels.move_and_bounce(store.pos, store.vector, self.speeds(), store.var_speed, self.size,
+                                    self.box.dimensions)
+
+        with profiler.phase('collision'):
+            self.infect_contacts(*self.contact_pairs(mode_string))
+
+    def contact_pairs(self, mode_string):
+        """
+        Finds the pairs of people close enough for transmission.
 
-        for person in self.persons:
-            person.collide(self.persons, mode=mode_string, qtree=qtree)
+        Parameters
+        ----------
+        mode_string : string
+            Collision detection mode, see update.
 
-    def test_population(self):
+        Returns
+        -------
+        tuple of numpy arrays
+            Indices of the two people in each contact pair.
+
+        """
+        store = self.store
+        if mode_string == 'auto':
+            if self.auto_collision is None:
+                self.auto_collision = strategy.AutoCollision()
+            return self.auto_collision.contact_pairs(self)
+        if mode_string == 'grid':
+            return collision.grid_pairs(store.pos, self.size, self.box.dimensions)
+        if mode_string == 'tiled':
+            if self.tiled_collider is None:
+                self.tiled_collider = tiling.TiledCollider()
+            return self.tiled_collider.pairs(store.pos, store.status, self.size, self.box.dimensions)
+        if mode_string == 'infected_index':
+            if self.infected_index is None:
+                self.infected_index = collision.InfectedIndex(self.size, self.box.dimensions, len(store))
+                self.infected_index.add(np.flatnonzero(store.status == health.INFECTED), store.pos)
+            return self.infected_index.pairs(store.pos, np.flatnonzero(store.status == health.HEALTHY))
+        if mode_string == 'quadtree':
+            with self.profiler.phase('quadtree_build'):
+                qtree = quadtree.FlatQuadtree(store.pos)
+            return qtree.pairs_within(2 * self.size)
+        if mode_string == 'selective':
+            return collision.selective_pairs(store.pos, store.status, self.size)
+        if mode_string == 'basic':
+            return collision.brute_force_pairs(store.pos, self.size)
+        raise ValueError(f"Unknown collision detection mode '{mode_string}'")
+
+    def infect_contacts(self, first, second):
         """
-        Update the stats attributes of this class which keep track of the health status of each person sorted in
-        the 'persons' attribute. Also detects when the population has had no new infections and updates the
-        'infection_free' boolean attribute.
+        Transmits the virus across a batch of contact pairs, see collision.resolve_contacts. Each contact between a
+        healthy and an infected person transmits with the population's transmission probability and one of a newly
+        infected person's transmitting contacts, chosen at random, is credited with the infection.
+
+        Parameters
+        ----------
+        first, second : numpy arrays of ints
+            Indices of the two people in each contact pair.
 
         Returns
         -------
         None
 
         """
-        healthy_count = 0
-        infected_count = 0
-        dead_count = 0
-        recovered_count = 0
-        all_reproduction_nums = np.array([])
-        for person in self.persons:
-            if person.status == health.healthy:
-                healthy_count += 1
-            if person.status == health.infected:
-                infected_count += 1
-            if person.status == health.dead:
-                dead_count += 1
-            if person.status == health.recovered:
-                recovered_count += 1
-
-            if person.status == health.recovered or person.status == health.dead:
-                all_reproduction_nums = np.append(all_reproduction_nums, person.num_infected_by_me)
-
-        if self.status_numbers['infected'] == 0 and self.status_numbers['recovered'] == recovered_count:
-            self.infection_free = True
-
-        self.status_numbers = {'healthy': healthy_count,
-                               'recovered': recovered_count,
-                               'dead': dead_count,
-                               'infected': infected_count,
-                               }
+        store = self.store
+        infectees, infectors = collision.resolve_contacts(first, second, store.status,
+                                                          self.transmission_probability, self.rng)
+        self.set_status(infectees, health.INFECTED)
+        store.num_infected_by_me += np.bincount(infectors, minlength=len(store))
+        if self.transmissions is not None:
+            self.transmissions.record(self.frame, infectors, infectees)
+
+    def set_status(self, indices, code):
+        """
+        Changes the health status of some people, keeping the status counts and reproduction number totals up to date.
+        Every status change must go through this method.
+
+        Parameters
+        ----------
+        indices : int or numpy array of ints
+            Indices of the people whose status changes. Must not contain duplicates.
+        code : int
+            The new status code.
+
+        Returns
+        -------
+        None
+
+        """
+        store = self.store
+        indices = np.atleast_1d(indices)
+        old = store.status[indices]
+        was_finished = (old == health.RECOVERED) | (old == health.DEAD)
+        self.counts -= np.bincount(old, minlength=self.counts.size)
+        self.counts[code] += indices.size
+        self._finished -= np.count_nonzero(was_finished)
+        self._finished_infections -= store.num_infected_by_me[indices[was_finished]].sum()
+        if code == health.RECOVERED or code == health.DEAD:
+            self._finished += indices.size
+            self._finished_infections += store.num_infected_by_me[indices].sum()
+        store.status[indices] = code
+        if code == health.INFECTED:
+            self._schedule_infections(indices)
+        elif code == health.DEAD:
+            store.hidden_from[indices] = self.frame + self.durations(health.DEAD, indices.size)
+        if self.infected_index is not None:
+            if code == health.INFECTED:
+                self.infected_index.add(indices, store.pos)
+            else:
+                self.infected_index.remove(indices[old == health.INFECTED])
+
+    def finished_totals(self):
+        """The number of people who have recovered or died and the total number of people they infected."""
+        return int(self._finished), int(self._finished_infections)
+
+    def recount(self):
+        """
+        Full recount of the population, as kept incrementally by set_status.
+
+        Returns
+        -------
+        tuple
+            Count of each status code (numpy array), the number of people who have recovered or died and the total
+            number of people they infected.
+
+        """
+        return _tally(self.store.status, self.store.num_infected_by_me, len(self.statuses))
+
+    def extract(self, indices):
+        """
+        Removes some people from the population, e.g. when they migrate to another region. The people after them move
+        down to fill the gaps, so existing indices and Person views past the first removed person change.
+
+        Parameters
+        ----------
+        indices : numpy array of ints
+            Indices of the people to remove.
+
+        Returns
+        -------
+        dict
+            The removed people's rows, as returned by PopulationStore.rows.
+
+        """
+        indices = np.unique(indices)
+        store = self.store
+        rows = store.rows(indices)
+        counts, finished, finished_infections = _tally(rows['status'], rows['num_infected_by_me'], self.counts.size)
+        self.counts -= counts
+        self._finished -= finished
+        self._finished_infections -= finished_infections
+        store.remove(indices)
+        self.transitions.remap(indices)
+        self.n_people = len(store)
+        # Indices have changed, so the infected index is rebuilt on next use. The transmission log identifies people
+        # by index too, and the removed people's infections leave with them, so it is no longer kept
+        self.infected_index = None
+        self.transmissions = None
+        self._index_cases = None
+        return rows
+
+    def admit(self, rows):
+        """
+        Adds people to the end of the population, e.g. when they migrate from another region. They keep their health,
+        age and behaviour and are placed at random positions in the environment.
 
-        # TODO - very likely to be the wrong way to calculate this. Needs work.
-        if all_reproduction_nums.size > 0:
-            self.epi_stats = {'r_zero': np.mean(all_reproduction_nums)}
+        Parameters
+        ----------
+        rows : dict
+            The people's rows, as returned by extract.
+
+        Returns
+        -------
+        None
+
+        """
+        store = self.store
+        start = len(store)
+        n = rows['status'].size
+        store.append(dict(rows, pos=self.rng.random((n, 2)) * self.box.dimensions))
+        counts, finished, finished_infections = _tally(rows['status'], rows['num_infected_by_me'], self.counts.size)
+        self.counts += counts
+        self._finished += finished
+        self._finished_infections += finished_infections
+        self.n_people = len(store)
+        infected = start + np.flatnonzero(rows['status'] == health.INFECTED)
+        self.transitions.push(infected, store.infection_end[infected])
+        self.infected_index = None
+        # The infections of the people admitted are not in the log
+        self.transmissions = None
+        self._index_cases = None
+        if counts[health.INFECTED]:
+            self.infection_free = False
+
+    def test_population(self):
+        """
+        Update the stats attributes of this class which keep track of the health status of each person in the
+        population. Also detects when the population has had no new infections and updates the 'infection_free'
+        boolean attribute.
+
+        The statistics are read from the counts kept up to date by set_status, so this costs the same whatever the
+        population size. In debug mode they are checked against a full recount.
+
+        epi_stats['r_zero'] is the basic reproduction number: the mean number of people infected by each of the
+        initially infected, as recorded in the transmission log, which is final once they have all recovered or died.
+        Without a log, once people have migrated, it is the mean number of people infected by those who have recovered
+        or died. For the effective reproduction number over time see TransmissionLog.reproduction_numbers.
+
+        Returns
+        -------
+        None
+
+        """
+        with self.profiler.phase('test_population'):
+            counts = self.counts
+            if self.debug:
+                counts_check, finished_check, infections_check = self.recount()
+                if (not np.array_equal(counts, counts_check) or self._finished != finished_check or
+                        self._finished_infections != infections_check):
+                    raise RuntimeError(f"Incremental statistics {counts}, {self._finished}, "
+                                       f"{self._finished_infections} do not match a recount {counts_check}, "
+                                       f"{finished_check}, {infections_check}")
+                if self.infected_index is not None and not np.array_equal(
+                        np.sort(self.infected_index.members), np.flatnonzero(self.store.status == health.INFECTED)):
+                    raise RuntimeError("The infected index does not hold exactly the infected people")
+
+            if self.status_numbers['infected'] == 0 and self.status_numbers['recovered'] == counts[health.RECOVERED]:
+                self.infection_free = True
+
+            self.status_numbers = {'healthy': int(counts[health.HEALTHY]),
+                                   'recovered': int(counts[health.RECOVERED]),
+                                   'dead': int(counts[health.DEAD]),
+                                   'infected': int(counts[health.INFECTED]),
+                                   }
+
+            if self._index_cases is not None:
+                if self._index_cases.size:
+                    self.epi_stats = {'r_zero': float(self.store.num_infected_by_me[self._index_cases].mean())}
+            elif self._finished > 0:
+                self.epi_stats = {'r_zero': self._finished_infections / self._finished}
@@ -0,0 +1,143 @@
+import json
+import time
+
+
+class _Phase:
+    """Reusable context manager timing one named phase of a Profiler."""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+
+
+class _NullPhase:
+    """Context manager doing nothing, shared by every phase of a disabled profiler."""
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class Profiler:
+    """
+    Low overhead wall clock timers around the phases of a frame.
+
+    Phases are timed with 'with profiler.phase(name):'. One context manager is kept per phase name, so timing a phase
+    allocates nothing.
+
+    Attributes
+    ----------
+    enabled : bool
+        Always True; False for the disabled profiler NULL.
+    trace : bool
+        Whether every timed phase is also kept as an event for write_trace.
+    smoothing : float
+        Weight of the latest time in each phase's moving average.
+
+    """
+    enabled = True
+
+    def __init__(self, trace=False, smoothing=0.1):
+        self.trace = trace
+        self.smoothing = smoothing
+        self._phases = {}
+        self._stats = {}
+        self._events = []
+        self._origin = time.perf_counter()
+
+    def phase(self, name):
+        """Context manager timing the named phase."""
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def record(self, name, start, end):
+        """Adds one timing of a phase, given its perf_counter start and end."""
+        elapsed = end - start
+        stats = self._stats.get(name)
+        if stats is None:
+            self._stats[name] = [1, elapsed, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = elapsed
+            stats[3] += self.smoothing * (elapsed - stats[3])
+        if self.trace:
+            self._events.append((name, start, elapsed))
+
+    def timings(self):
+        """
+        Timings of every phase so far.
+
+        Returns
+        -------
+        dict
+            Maps each phase name to a dictionary of its number of 'calls', 'total', 'last' and moving 'average' times
+            in seconds.
+
+        """
+        return {name: {'calls': stats[0], 'total': stats[1], 'last': stats[2], 'average': stats[3]}
+                for name, stats in self._stats.items()}
+
+    def reset(self):
+        """Forgets every timing and trace event."""
+        self._stats.clear()
+        self._events.clear()
+
+    def write_trace(self, path):
+        """
+        Writes the traced phases as a Chrome trace event file, viewable in chrome://tracing or Perfetto.
+
+        Parameters
+        ----------
+        path : string
+            Path of the json file to write.
+
+        Returns
+        -------
+        None
+
+        """
+        events = [{'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                   'ts': (start - self._origin) * 1e6, 'dur': elapsed * 1e6}
+                  for name, start, elapsed in self._events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+class _NullProfiler:
+    """A disabled profiler. Every phase is the same do-nothing context manager and nothing is recorded."""
+    enabled = False
+    trace = False
+
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def record(self, name, start, end):
+        pass
+
+    def timings(self):
+        return {}
+
+    def reset(self):
+        pass
+
+    def write_trace(self, path):
+        pass
+
+
+NULL = _NullProfiler()
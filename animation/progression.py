@@ -0,0 +1,74 @@
+import heapq
+import numpy as np
+
+
+class TransitionQueue:
+    """
+    Time-bucketed queue of the people due to change status on a given frame.
+
+    People are pushed with the frame of their transition and kept in one bucket per frame, so popping the transitions
+    due on a frame only touches the people in that bucket, whatever the size of the population. The frames with a
+    bucket are kept in a heap, so buckets for frames already passed are popped too.
+
+    """
+    def __init__(self):
+        self._buckets = {}
+        self._frames = []
+
+    def __len__(self):
+        """Special method returning the number of people in the queue"""
+        return sum(part.size for parts in self._buckets.values() for part in parts)
+
+    def push(self, indices, frames):
+        """
+        Schedules some people's transitions.
+
+        Parameters
+        ----------
+        indices : numpy array of ints
+            Indices of the people.
+        frames : numpy array of ints
+            Frame of each person's transition.
+
+        Returns
+        -------
+        None
+
+        """
+        order = np.argsort(frames, kind='stable')
+        frames, indices = frames[order], indices[order]
+        unique, starts = np.unique(frames, return_index=True)
+        for frame, part in zip(unique.tolist(), np.split(indices, starts[1:])):
+            if frame not in self._buckets:
+                self._buckets[frame] = []
+                heapq.heappush(self._frames, frame)
+            self._buckets[frame].append(part)
+
+    def pop(self, frame):
+        """Removes and returns the indices of the people whose transitions are due on or before a frame."""
+        parts = []
+        while self._frames and self._frames[0] <= frame:
+            parts.extend(self._buckets.pop(heapq.heappop(self._frames)))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def remap(self, removed):
+        """
+        Renumbers the queue after some people have been removed from the population, see People.extract.
+
+        Parameters
+        ----------
+        removed : numpy array of ints
+            Sorted indices, before the removal, of the people removed.
+
+        Returns
+        -------
+        None
+
+        """
+        if not removed.size:
+            return
+        for parts in self._buckets.values():
+            for i, part in enumerate(parts):
+                shift = np.searchsorted(removed, part)
+                kept = (shift == removed.size) | (removed[np.minimum(shift, removed.size - 1)] != part)
+                parts[i] = part[kept] - shift[kept]
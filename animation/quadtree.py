@@ -1,3 +1,7 @@
+import numpy as np
+import collision
+
+
 class Point:
     def __init__(self, x, y, data):
         self.x = x
@@ -45,7 +49,7 @@ class Quadtree:
         self.nw = Quadtree(Rectangle(x - half_w, y - half_h, half_w, half_h))
         self.ne = Quadtree(Rectangle(x + half_w, y - half_h, half_w, half_h))
         self.sw = Quadtree(Rectangle(x - half_w, y + half_h, half_w, half_h))
-        self.se = Quadtree(Rectangle(x - half_w, y + half_h, half_w, half_h))
+        self.se = Quadtree(Rectangle(x + half_w, y + half_h, half_w, half_h))
 
     def insert(self, point):
         if not self.boundary.contains(point):
@@ -76,7 +80,7 @@ class Quadtree:
             return points_in_domain
 
         for point in self.points:
-            if self.boundary.contains(point):
+            if domain.contains(point):
                 points_in_domain.append(point)
 
         if not self.nw:
@@ -88,3 +92,194 @@ class Quadtree:
         points_in_domain += self.se.query(domain)
 
         return points_in_domain
+
+
+class FlatQuadtree:
+    """
+    A quadtree stored in flat arrays and built from coordinate arrays in one bulk pass.
+
+    Points are sorted along a Morton (Z-order) curve so that the points of every node occupy one contiguous slice of
+    the 'index' array. Nodes are split level by level while they hold more than 'capacity' points, each level being
+    one set of vectorised operations over all nodes of that depth.
+
+    Attributes
+    ----------
+    points : (n, 2) numpy array of floats
+        x and y values of the points held by the tree.
+    index : (n,) numpy array of ints
+        Point indices in Morton order. Node k holds index[start[k]:start[k] + count[k]].
+    x, y, w, h : numpy arrays of floats
+        Centre and half width and height of each node, as for Rectangle.
+    start, count : numpy arrays of ints
+        Slice of the 'index' array holding each node's points.
+    children : (m, 4) numpy array of ints
+        The nw, ne, sw and se children of each node, or -1 for leaves.
+
+    """
+    CAPACITY = 4
+    MAX_DEPTH = 16
+
+    def __init__(self, points, boundary=None, capacity=CAPACITY, max_depth=MAX_DEPTH):
+        self.points = np.asarray(points, dtype=float)
+        if boundary is None:
+            lower = self.points.min(axis=0) if len(self.points) else np.zeros(2)
+            upper = self.points.max(axis=0) if len(self.points) else np.ones(2)
+            half = np.maximum((upper - lower) / 2, 0.5)
+            boundary = Rectangle(*(lower + half), *half)
+        self.boundary = boundary
+        self.capacity = capacity
+        self.max_depth = max_depth
+        self._build()
+
+    def __len__(self):
+        """Special method returning the number of nodes in the tree"""
+        return self.start.size
+
+    def _build(self):
+        depth = self.max_depth
+        cells = 1 << depth
+        left = np.array([self.boundary.left, self.boundary.top])
+        extent = np.array([self.boundary.right, self.boundary.bottom]) - left
+        scaled = np.clip(((self.points - left) / extent * cells).astype(np.int64), 0, cells - 1)
+        codes = _spread_bits(scaled[:, 0]) | (_spread_bits(scaled[:, 1]) << 1)
+        self.index = np.argsort(codes, kind='stable')
+        codes = codes[self.index]
+
+        x, y = [np.array([self.boundary.x])], [np.array([self.boundary.y])]
+        w, h = [np.array([self.boundary.w])], [np.array([self.boundary.h])]
+        start, count = [np.array([0])], [np.array([codes.size])]
+        children = [np.full((1, 4), -1)]
+        prefix = np.array([0], dtype=np.int64)
+        n_nodes = 1
+        for level in range(depth):
+            split = np.flatnonzero(count[-1] > self.capacity)
+            if split.size == 0:
+                break
+            shift = 2 * (depth - level - 1)
+            child_prefix = (prefix[split, np.newaxis] << 2) + np.arange(4)
+            child_start = np.searchsorted(codes, child_prefix << shift)
+            child_end = np.append(child_start[:, 1:], (start[-1] + count[-1])[split, np.newaxis], axis=1)
+            children[-1][split] = n_nodes + np.arange(4 * split.size).reshape(-1, 4)
+
+            half_w = w[-1][split, np.newaxis] / 2
+            half_h = h[-1][split, np.newaxis] / 2
+            x.append((x[-1][split, np.newaxis] + half_w * np.array([-1, 1, -1, 1])).ravel())
+            y.append((y[-1][split, np.newaxis] + half_h * np.array([-1, -1, 1, 1])).ravel())
+            w.append(np.repeat(half_w.ravel(), 4))
+            h.append(np.repeat(half_h.ravel(), 4))
+            start.append(child_start.ravel())
+            count.append((child_end - child_start).ravel())
+            children.append(np.full((4 * split.size, 4), -1))
+            prefix = child_prefix.ravel()
+            n_nodes += 4 * split.size
+
+        self.x, self.y = np.concatenate(x), np.concatenate(y)
+        self.w, self.h = np.concatenate(w), np.concatenate(h)
+        self.start, self.count = np.concatenate(start), np.concatenate(count)
+        self.children = np.concatenate(children)
+
+    def _gap(self, a, b):
+        """Squared distance between the bounds of nodes a and b (zero if they overlap)."""
+        gap_x = np.maximum(np.abs(self.x[a] - self.x[b]) - self.w[a] - self.w[b], 0)
+        gap_y = np.maximum(np.abs(self.y[a] - self.y[b]) - self.h[a] - self.h[b], 0)
+        return gap_x ** 2 + gap_y ** 2
+
+    def query(self, domain):
+        """
+        Finds the points lying inside a rectangular domain.
+
+        Parameters
+        ----------
+        domain : object of type Rectangle
+            The region to search.
+
+        Returns
+        -------
+        numpy array of ints
+            Indices of the points inside the domain.
+
+        """
+        found = []
+        nodes = np.array([0])
+        while nodes.size:
+            nodes = nodes[(self.count[nodes] > 0) &
+                          ~((self.x[nodes] - self.w[nodes] > domain.right) |
+                            (self.x[nodes] + self.w[nodes] < domain.left) |
+                            (self.y[nodes] - self.h[nodes] > domain.bottom) |
+                            (self.y[nodes] + self.h[nodes] < domain.top))]
+            leaf = self.children[nodes, 0] < 0
+            _, slots = collision.expand_ranges(self.start[nodes[leaf]], self.count[nodes[leaf]])
+            found.append(self.index[slots])
+            nodes = self.children[nodes[~leaf]].ravel()
+        found = np.concatenate(found)
+        x, y = self.points[found, 0], self.points[found, 1]
+        inside = (domain.left < x) & (x < domain.right) & (domain.top < y) & (y < domain.bottom)
+        return found[inside]
+
+    def pairs_within(self, distance):
+        """
+        Self-join finding every pair of points closer than a given distance in one traversal of the tree.
+
+        Pairs of nodes are visited level by level, starting from the root paired with itself. Node pairs whose bounds
+        are further apart than the distance are discarded, pairs of leaves emit their candidate point pairs and any
+        other pair is replaced by the pairs of its children.
+
+        Parameters
+        ----------
+        distance : float
+            Points strictly closer than this distance are paired.
+
+        Returns
+        -------
+        tuple of numpy arrays
+            Indices (first, second) of each pair of points, with first < second.
+
+        """
+        firsts, seconds = [], []
+        self_a, self_b = np.array(np.triu_indices(4))
+        a = b = np.array([0])
+        while a.size:
+            keep = (self.count[a] > 0) & (self.count[b] > 0) & (self._gap(a, b) < distance ** 2)
+            a, b = a[keep], b[keep]
+            leaf_a = self.children[a, 0] < 0
+            leaf_b = self.children[b, 0] < 0
+            emit = leaf_a & leaf_b
+            self._emit_pairs(a[emit], b[emit], firsts, seconds)
+
+            # Split self pairs into the ten pairs of their children, otherwise split the larger (non-leaf) node
+            same = ~emit & (a == b)
+            split_a = ~emit & ~same & ~leaf_a & (leaf_b | (self.w[a] >= self.w[b]))
+            split_b = ~emit & ~same & ~split_a
+            next_a = [self.children[a[same]][:, self_a].ravel(),
+                      self.children[a[split_a]].ravel(),
+                      np.repeat(a[split_b], 4)]
+            next_b = [self.children[a[same]][:, self_b].ravel(),
+                      np.repeat(b[split_a], 4),
+                      self.children[b[split_b]].ravel()]
+            a, b = np.concatenate(next_a), np.concatenate(next_b)
+
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        delta = self.points[first] - self.points[second]
+        close = np.hypot(delta[:, 0], delta[:, 1]) < distance
+        first, second = first[close], second[close]
+        return np.minimum(first, second), np.maximum(first, second)
+
+    def _emit_pairs(self, a, b, firsts, seconds):
+        """Appends every candidate point pair between leaf nodes a and b (each pair once when a == b)."""
+        owner, combination = collision.expand_ranges(np.zeros_like(a), self.count[a] * self.count[b])
+        in_a = combination // self.count[b][owner]
+        in_b = combination % self.count[b][owner]
+        valid = (a[owner] != b[owner]) | (in_a < in_b)
+        owner, in_a, in_b = owner[valid], in_a[valid], in_b[valid]
+        firsts.append(self.index[self.start[a][owner] + in_a])
+        seconds.append(self.index[self.start[b][owner] + in_b])
+
+
+def _spread_bits(values):
+    """Spreads the lower 16 bits of each value so that a zero bit separates every original bit (Morton encoding)."""
+    values = values & 0xFFFF
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    values = (values | (values << 1)) & 0x55555555
+    return values
@@ -0,0 +1,146 @@
+import json
+import os
+import numpy as np
+import health
+
+# First bytes of every recording file
+MAGIC = b'PANDREC1'
+
+# Status recorded for the dead who are no longer drawn
+HIDDEN = 255
+
+# Positions are recorded as fractions of the environment dimensions, scaled to the range of a uint16
+SCALE = 65535
+
+# The frames start at a multiple of this many bytes from the start of the file
+ALIGNMENT = 64
+
+
+def frame_dtype(n_people):
+    """The numpy structured dtype of one recorded frame: quantized positions followed by statuses."""
+    return np.dtype([('pos', np.uint16, (n_people, 2)), ('status', np.uint8, (n_people,))])
+
+
+class Recorder:
+    """
+    Records the positions and statuses of a population every frame into a compact binary file.
+
+    The file starts with MAGIC, the length of a json header as a little endian uint32 and the header, padded to a
+    multiple of ALIGNMENT bytes. One fixed size record per frame follows (see frame_dtype), so a frame can be found by
+    its number alone. Positions are quantized to uint16 and statuses stored as uint8, with HIDDEN for the dead who are
+    no longer drawn: 5 bytes per person per frame instead of 17 for float64 positions and int8 statuses. Frames are
+    collected into chunks of 'frames_per_chunk' and each chunk is written with a single call through a buffered file.
+
+    Attributes
+    ----------
+    n_people : int
+        Number of people recorded each frame. The population size must not change during a recording.
+    dimensions : numpy array of floats
+        Width and height of the environment.
+    frames : int
+        Number of frames recorded so far.
+
+    """
+    def __init__(self, file, people, frames_per_chunk=64, metadata=None, buffering=1 << 20):
+        self.n_people = len(people)
+        self.dimensions = np.asarray(people.box.dimensions, dtype=float)
+        self.frames = 0
+        self._scale = SCALE / self.dimensions
+        self._chunk = np.zeros(frames_per_chunk, dtype=frame_dtype(self.n_people))
+        self._filled = 0
+
+        header = json.dumps({'version': 1,
+                             'n_people': self.n_people,
+                             'dimensions': self.dimensions.tolist(),
+                             'radius': people.size,
+                             'frames_per_chunk': frames_per_chunk,
+                             'metadata': metadata or {},
+                             }).encode()
+        header += b' ' * (-(len(MAGIC) + 4 + len(header)) % ALIGNMENT)
+        self._file = open(file, 'wb', buffering=buffering)
+        self._file.write(MAGIC + len(header).to_bytes(4, 'little') + header)
+
+    def add(self, people):
+        """Records the current positions and statuses of a population as the next frame."""
+        if len(people) != self.n_people:
+            raise ValueError(f"Recording {self.n_people} people, the population has {len(people)}")
+        frame = self._chunk[self._filled]
+        frame['pos'] = np.clip(np.rint(people.store.pos * self._scale), 0, SCALE)
+        frame['status'] = np.where(people.visible(), people.store.status, HIDDEN)
+        self._filled += 1
+        self.frames += 1
+        if self._filled == self._chunk.size:
+            self.flush()
+
+    def flush(self):
+        """Writes the frames collected so far to the file."""
+        self._file.write(self._chunk[:self._filled].tobytes())
+        self._filled = 0
+
+    def close(self):
+        """Writes any remaining frames and closes the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Recording:
+    """
+    A recorded run, memory-mapped so that any frame can be read without loading or replaying the others.
+
+    Attributes
+    ----------
+    header : dict
+        The header written by the Recorder, including its 'metadata'.
+    n_people : int
+        Number of people in each frame.
+    dimensions : numpy array of floats
+        Width and height of the environment.
+    radius : int
+        Radius, in number of pixels, of every person.
+    frames : numpy memmap
+        The recorded frames, see frame_dtype.
+
+    """
+    def __init__(self, file):
+        with open(file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"'{file}' is not a recording")
+            length = int.from_bytes(f.read(4), 'little')
+            self.header = json.loads(f.read(length))
+        self.n_people = self.header['n_people']
+        self.dimensions = np.array(self.header['dimensions'])
+        self.radius = self.header['radius']
+
+        dtype = frame_dtype(self.n_people)
+        offset = len(MAGIC) + 4 + length
+        # A run cut short may have left part of a frame at the end, which is ignored
+        n_frames = (os.path.getsize(file) - offset) // dtype.itemsize
+        if n_frames:
+            self.frames = np.memmap(file, dtype=dtype, mode='r', offset=offset, shape=(n_frames,))
+        else:
+            self.frames = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        """Special method returning the number of recorded frames"""
+        return self.frames.size
+
+    def positions(self, frame):
+        """Positions of everyone in a frame, numbered from 0, as an (n, 2) array of floats."""
+        return self.frames[frame]['pos'] * (self.dimensions / SCALE)
+
+    def statuses(self, frame):
+        """Status codes of everyone in a frame, numbered from 0, with HIDDEN for the dead who are no longer drawn."""
+        return self.frames[frame]['status']
+
+    def status_numbers(self, frame, names=('healthy', 'recovered', 'dead', 'infected')):
+        """Number of people with each status in a frame, as People.status_numbers."""
+        counts = np.bincount(self.statuses(frame), minlength=HIDDEN + 1)
+        counts[health.DEAD] += counts[HIDDEN]
+        return {name: int(count) for name, count in zip(names, counts)}
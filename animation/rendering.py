@@ -0,0 +1,130 @@
+import pygame
+import numpy as np
+
+# Names of the status colours in the config file, indexed by status code
+COLOUR_KEYS = ('healthy_colour', 'recovered_colour', 'dead_colour', 'infected_colour')
+
+
+class PopulationRenderer:
+    """
+    Draws a whole population with one batched Surface.blits call per health status.
+
+    One sprite is pre-rendered per status colour and radius. The area is divided into square tiles and only the tiles
+    touched by a person this frame or the previous one are cleared and reported as dirty, so the display can be
+    updated with pygame.display.update(rects) instead of a full flip.
+
+    Attributes
+    ----------
+    radius : int
+        Radius, in number of pixels, of every person.
+    sprites : list of pygame Surfaces
+        Pre-rendered person of each status, indexed by status code.
+    bg_colour : list of ints
+        Background colour of the simulation area.
+    area : pygame Rect
+        The region of the surface the population is drawn in.
+    tile : int
+        Side length, in pixels, of the tiles used to track changed regions.
+
+    """
+    TILE = 32
+
+    def __init__(self, configurations, tile=TILE):
+        self.radius = configurations['people']['radius']
+        self.bg_colour = configurations['appearance']['background']['bg_colour']
+        self.area = pygame.Rect(0, 0,
+                                configurations['environment']['dimensions'][0],
+                                configurations['environment']['dimensions'][1] + 5)  # 5 pixels buffer
+        self.tile = tile
+        self.sprites = [self._sprite(configurations['appearance']['people'][key]) for key in COLOUR_KEYS]
+        self._tiles_shape = (-(-self.area.width // tile), -(-self.area.height // tile))
+        self._previous_tiles = np.zeros(self._tiles_shape[0] * self._tiles_shape[1], dtype=bool)
+
+    def _sprite(self, colour):
+        """A person of the given colour on a background coloured, colour keyed surface."""
+        diameter = 2 * self.radius + 1
+        sprite = pygame.Surface((diameter, diameter))
+        sprite.fill(self.bg_colour)
+        pygame.draw.circle(sprite, colour, (self.radius, self.radius), self.radius)
+        sprite.set_colorkey(self.bg_colour, pygame.RLEACCEL)
+        return sprite
+
+    def _touched_tiles(self, corners):
+        """Boolean mask of the tiles overlapped by sprites with the given top left corners."""
+        touched = np.zeros_like(self._previous_tiles)
+        for dx in (0, 2 * self.radius):
+            for dy in (0, 2 * self.radius):
+                tx = np.clip((corners[:, 0] + dx) // self.tile, 0, self._tiles_shape[0] - 1)
+                ty = np.clip((corners[:, 1] + dy) // self.tile, 0, self._tiles_shape[1] - 1)
+                touched[ty * self._tiles_shape[0] + tx] = True
+        return touched
+
+    def _tile_rect(self, tile_id):
+        x = (tile_id % self._tiles_shape[0]) * self.tile
+        y = (tile_id // self._tiles_shape[0]) * self.tile
+        return pygame.Rect(x, y, self.tile, self.tile).clip(self.area)
+
+    def visible(self, people):
+        """Boolean mask of the people to draw, see People.visible."""
+        return people.visible()
+
+    def clear(self, surface):
+        """Fills the whole simulation area with the background colour and forgets what was drawn."""
+        surface.fill(self.bg_colour, self.area)
+        self._previous_tiles[:] = False
+
+    def draw(self, surface, people):
+        """
+        Draws the population, first clearing whatever it drew on the previous call.
+
+        Parameters
+        ----------
+        surface : pygame Surface
+            The surface to draw on.
+        people : People object
+            The population to draw.
+
+        Returns
+        -------
+        list of pygame Rects
+            The regions of the surface changed since the previous call.
+
+        """
+        return self.draw_arrays(surface, people.store.pos, people.store.status, self.visible(people))
+
+    def draw_arrays(self, surface, pos, status, visible):
+        """
+        Draws people given as arrays, e.g. a recorded frame, first clearing whatever was drawn on the previous call.
+
+        Parameters
+        ----------
+        surface : pygame Surface
+            The surface to draw on.
+        pos : (n, 2) numpy array of floats
+            Positions of the people.
+        status : (n,) numpy array of ints
+            Health status codes of the people.
+        visible : (n,) numpy array of bools
+            Which of the people to draw.
+
+        Returns
+        -------
+        list of pygame Rects
+            The regions of the surface changed since the previous call.
+
+        """
+        corners = pos.astype(int) - self.radius
+
+        touched = self._touched_tiles(corners[visible])
+        dirty = [self._tile_rect(tile_id) for tile_id in np.flatnonzero(touched | self._previous_tiles)]
+        for rect in dirty:
+            surface.fill(self.bg_colour, rect)
+        self._previous_tiles = touched
+
+        clip = surface.get_clip()
+        surface.set_clip(self.area)
+        for code, sprite in enumerate(self.sprites):
+            selected = corners[visible & (status == code)]
+            surface.blits([(sprite, corner) for corner in selected.tolist()], doreturn=False)
+        surface.set_clip(clip)
+        return dirty
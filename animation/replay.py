@@ -0,0 +1,165 @@
+import argparse
+import copy
+import pygame
+import numpy as np
+import config
+import overlay
+import recording
+import rendering
+import scheduler
+
+# Number of frames skipped by the left and right arrow keys, ten times as many with shift held
+SEEK_FRAMES = 60
+
+
+def replay_configurations(configurations, replay):
+    """
+    The configuration with the environment dimensions and radius of a recording, for drawing it.
+
+    Parameters
+    ----------
+    configurations : dict
+        Configuration dictionary from yaml file.
+    replay : Recording object
+        The recording to draw.
+
+    Returns
+    -------
+    dict
+        A copy of the configuration dictionary.
+
+    """
+    configs = copy.deepcopy(configurations)
+    configs['environment']['dimensions'] = [int(dimension) for dimension in replay.dimensions]
+    configs['people']['radius'] = replay.radius
+    return configs
+
+
+def seek(frame, key, mods, n_frames):
+    """
+    The frame to show after a key press: the arrow keys step back and forward, home and end go to the first and last
+    frames and the number keys jump to a tenth of the way through, e.g. 5 to the middle.
+
+    Parameters
+    ----------
+    frame : int
+        The frame shown.
+    key : int
+        The pygame key pressed.
+    mods : int
+        The pygame modifier keys held.
+    n_frames : int
+        Number of frames in the recording.
+
+    Returns
+    -------
+    int
+        The frame to show.
+
+    """
+    step = SEEK_FRAMES * (10 if mods & pygame.KMOD_SHIFT else 1)
+    if key == pygame.K_LEFT:
+        frame -= step
+    elif key == pygame.K_RIGHT:
+        frame += step
+    elif key == pygame.K_HOME:
+        frame = 0
+    elif key == pygame.K_END:
+        frame = n_frames - 1
+    elif pygame.K_0 <= key <= pygame.K_9:
+        frame = (key - pygame.K_0) * n_frames // 10
+    return int(np.clip(frame, 0, n_frames - 1))
+
+
+def render_frame(replay, frame):
+    """
+    Renders one recorded frame, and its statistics, to screen.
+
+    Parameters
+    ----------
+    replay : Recording object
+        The recording being replayed.
+    frame : int
+        Number of the frame, from 0.
+
+    Returns
+    -------
+    list of pygame Rects
+        Regions of the screen changed.
+
+    """
+    statuses = replay.statuses(frame)
+    dirty = population_renderer.draw_arrays(screen, replay.positions(frame), statuses,
+                                            statuses != recording.HIDDEN)
+    # Draw line between simulation and the statistics, which the renderer clears over
+    dirty.append(pygame.draw.rect(screen, (220, 220, 220), (0, configs['environment']['dimensions'][1],
+                                                            configs['environment']['dimensions'][0], 1), 0))
+    dirty += stats_overlay.draw(screen, replay.status_numbers(frame))
+    label = labels.render(f"Frame {frame + 1} / {len(replay)}", (0, 0, 0))
+    dirty.append(screen.fill(configs['appearance']['background']['bg_colour'],
+                             (frame_origin, (label.get_width() + 40, label.get_height()))))
+    screen.blit(label, frame_origin)
+    return dirty
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Replay a recorded pandemic simulation.')
+    parser.add_argument('file', help='recording written by headless.py --record')
+    parser.add_argument('--config', default=config.DEFAULT_FILE, help='path of the yaml configuration file')
+    args = parser.parse_args()
+
+    replay = recording.Recording(args.file)
+    if not len(replay):
+        parser.error(f"'{args.file}' holds no frames")
+    configs = replay_configurations(config.load(args.config), replay)
+
+    pygame.init()
+    pygame.display.set_caption('Pandemic Simulation Replay')
+    font = pygame.font.SysFont(configs['appearance']['text']['font'], configs['appearance']['text']['size'])
+    labels = overlay.LabelCache(font)
+
+    # Leave room below the simulation for the statistics and the frame counter
+    screen = pygame.display.set_mode(np.array(configs['environment']['dimensions']) + np.array([0, 130]))
+    screen.fill(configs['appearance']['background']['bg_colour'])
+    pygame.display.flip()
+
+    population_renderer = rendering.PopulationRenderer(configs)
+    stats_overlay = overlay.StatsText(labels,
+                                      configs['appearance']['origins']['text'],
+                                      overlay.status_colours(configs),
+                                      configs['appearance']['background']['bg_colour'])
+    frame_origin = configs['appearance']['origins']['plot']
+    frame_scheduler = scheduler.FrameScheduler(configs['timing']['tick_rate'],
+                                               configs['timing']['render_rate'],
+                                               configs['timing']['max_ticks_per_frame'],
+                                               configs['timing']['fast_forward_render_rate'])
+
+    frame_number = 0
+    shown = None
+    paused = False
+    # Run until the user asks to quit
+    running = True
+    while running:
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_f:
+                    frame_scheduler.toggle_fast_forward()
+                else:
+                    frame_number = seek(frame_number, event.key, event.mod, len(replay))
+
+        # Each simulation tick that would have run is one recorded frame
+        for _ in frame_scheduler.ticks():
+            if not paused:
+                frame_number = min(frame_number + 1, len(replay) - 1)
+
+        if frame_number != shown:
+            pygame.display.update(render_frame(replay, frame_number))
+            shown = frame_number
+
+    pygame.quit()
@@ -0,0 +1,80 @@
+import pygame
+
+
+class FrameScheduler:
+    """
+    Fixed-timestep scheduler decoupling the simulation tick rate from the rendered frame rate.
+
+    Each rendered frame asks ticks() how many simulation ticks to run first. Real time elapsed since the previous frame
+    is accumulated and spent in ticks of 1 / tick_rate seconds, so several ticks run per frame when rendering is the
+    bottleneck. When the simulation falls behind, up to max_ticks_per_frame ticks run before the next frame is drawn
+    (rendered frames are skipped) and any backlog beyond that is dropped so the simulation slows down rather than
+    spiralling. The display rate is capped with pygame.time.Clock.
+
+    In fast forward, ticks run back to back as fast as possible and a frame is only rendered every
+    1 / fast_forward_render_rate seconds.
+
+    Attributes
+    ----------
+    tick_rate : float
+        Simulation ticks per second.
+    render_rate : float
+        Maximum rendered frames per second.
+    max_ticks_per_frame : int
+        Maximum number of ticks run before each rendered frame.
+    fast_forward_render_rate : float
+        Rendered frames per second in fast forward.
+    fast_forward : bool
+        Whether the scheduler is in fast forward.
+    clock : pygame Clock
+        Clock used to cap the display rate and measure the frame rate.
+
+    """
+    def __init__(self, tick_rate=60, render_rate=60, max_ticks_per_frame=5, fast_forward_render_rate=4):
+        self.tick_rate = tick_rate
+        self.render_rate = render_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.fast_forward_render_rate = fast_forward_render_rate
+        self.fast_forward = False
+        self.clock = pygame.time.Clock()
+        self._accumulator = 0.0
+
+    def toggle_fast_forward(self):
+        """Switches fast forward on or off."""
+        self.fast_forward = not self.fast_forward
+        self._accumulator = 0.0
+
+    def ticks(self):
+        """
+        Waits as needed to cap the display rate, then yields once for each simulation tick to run before the next
+        frame is rendered.
+
+        Yields
+        ------
+        int
+            Number of the tick within this frame, starting at 0.
+
+        """
+        if self.fast_forward:
+            self.clock.tick()
+            deadline = pygame.time.get_ticks() + 1000 / self.fast_forward_render_rate
+            tick = 0
+            while tick == 0 or pygame.time.get_ticks() < deadline:
+                yield tick
+                tick += 1
+            return
+
+        self._accumulator += self.clock.tick(self.render_rate)
+        tick_interval = 1000 / self.tick_rate
+        due = int(self._accumulator // tick_interval)
+        if due > self.max_ticks_per_frame:
+            due = self.max_ticks_per_frame
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= due * tick_interval
+        for tick in range(due):
+            yield tick
+
+    def get_fps(self):
+        """Rendered frames per second, averaged over the last few frames."""
+        return self.clock.get_fps()
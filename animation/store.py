@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class PopulationStore:
+    """
+    Struct-of-arrays storage for every person in a population. Row i of each array describes person i.
+
+    Attributes
+    ----------
+    pos : (n, 2) numpy array of floats
+        x and y values defining the centre of each person's position in 2-D.
+    vector : (n, 2) numpy array of floats
+        Vx and Vy values defining the vector of motion for each person.
+    status : (n,) numpy array of int8
+        Health status code of each person (see the codes defined in the health module).
+    age : (n,) numpy array of floats
+        Each person's age.
+    infection_end : (n,) numpy array of ints
+        Frame on which each infected person recovers or dies.
+    hidden_from : (n,) numpy array of ints
+        Frame from which each dead person is no longer drawn.
+    var_speed : (n,) numpy array of floats
+        Speed multiplier of each person, altered by events.
+    num_infected_by_me : (n,) numpy array of ints
+        Count of the number of people each individual is responsible for infecting.
+
+    """
+    fields = ('pos', 'vector', 'status', 'age', 'infection_end', 'hidden_from', 'var_speed', 'num_infected_by_me')
+
+    def __init__(self, n):
+        self.pos = np.zeros((n, 2))
+        self.vector = np.zeros((n, 2))
+        self.status = np.zeros(n, dtype=np.int8)
+        self.age = np.zeros(n)
+        self.infection_end = np.zeros(n, dtype=np.int64)
+        self.hidden_from = np.zeros(n, dtype=np.int64)
+        self.var_speed = np.ones(n)
+        self.num_infected_by_me = np.zeros(n, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Creates a store holding existing arrays, e.g. memory-mapped from a checkpoint, without copying them.
+
+        Parameters
+        ----------
+        arrays : dict
+            Maps the name of every field to its array.
+
+        Returns
+        -------
+        PopulationStore object
+
+        """
+        store = cls.__new__(cls)
+        for field in cls.fields:
+            setattr(store, field, arrays[field])
+        return store
+
+    def __len__(self):
+        """Special method returning the number of people held in the store"""
+        return self.status.size
+
+    def rows(self, indices):
+        """Copies of some rows of every array, as a dictionary of field name to array."""
+        return {field: getattr(self, field)[indices].copy() for field in self.fields}
+
+    def remove(self, indices):
+        """Removes some rows from every array."""
+        for field in self.fields:
+            setattr(self, field, np.delete(getattr(self, field), indices, axis=0))
+
+    def append(self, rows):
+        """Appends rows, given as a dictionary of field name to array (see rows), to every array."""
+        for field in self.fields:
+            setattr(self, field, np.concatenate((getattr(self, field), rows[field])))
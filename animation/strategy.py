@@ -0,0 +1,200 @@
+import logging
+import math
+import time
+import health
+
+logger = logging.getLogger(__name__)
+
+# Relative amount of work each collision mode does for a population, from its size 'n', the number of 'healthy' and
+# 'infected' people and the expected number of 'neighbours' within contact distance of each person
+WORKLOADS = {'basic': lambda f: f['n'] * f['n'],
+             'selective': lambda f: f['n'] + f['healthy'] * f['infected'],
+             'quadtree': lambda f: f['n'] * (math.log2(f['n'] + 1) + f['neighbours']),
+             'grid': lambda f: f['n'] * (1 + f['neighbours']),
+             'tiled': lambda f: f['n'] * (1 + f['neighbours']),
+             'infected_index': lambda f: f['n'] + f['infected'] * (9 + f['neighbours']),
+             }
+
+# Typical cost, in seconds per unit of workload, of each collision mode, used until the mode has been measured
+PRIOR_UNIT_COSTS = {'basic': 4e-8,
+                    'selective': 3e-8,
+                    'quadtree': 2e-7,
+                    'grid': 3e-7,
+                    'tiled': 5e-7,
+                    'infected_index': 1.2e-7,
+                    }
+
+
+def features(people):
+    """
+    The properties of a population that the cost of each collision mode depends on.
+
+    Parameters
+    ----------
+    people : People object
+        The population.
+
+    Returns
+    -------
+    dict
+        'n', 'healthy', 'infected' and 'neighbours', the expected number of people within contact distance of each
+        person.
+
+    """
+    n = len(people)
+    area = float(people.box.dimensions[0]) * float(people.box.dimensions[1])
+    return {'n': n,
+            'healthy': int(people.counts[health.HEALTHY]),
+            'infected': int(people.counts[health.INFECTED]),
+            'neighbours': n * math.pi * (2 * people.size) ** 2 / area,
+            }
+
+
+class AutoCollision:
+    """
+    Chooses the collision mode of each frame of the 'auto' collision mode from a runtime cost model.
+
+    Every mode's cost is modelled as its workload (see WORKLOADS) times a cost per unit of work. The cost per unit of
+    work starts at PRIOR_UNIT_COSTS and is then measured: a moving average of the time the mode took divided by its
+    workload over the frames it was used. The mode with the lowest predicted cost is used, switching only when
+    another mode is predicted to be cheaper by more than 'hysteresis', and at most once every 'window' frames. Modes
+    predicted to cost no more than 'explore_factor' times the cheapest are tried for one frame before they are relied
+    on, and every 'remeasure_every' frames the one measured longest ago is tried again so that the model follows the
+    machine and the population as it changes. Modes predicted to be far more expensive, e.g. 'basic' for a large
+    population, are never tried. The first frame of each mode is not measured, as it may include setting the mode up
+    (e.g. building the infected index). Switches are logged, with their reason, at INFO level and trials at DEBUG
+    level.
+
+    Attributes
+    ----------
+    candidates : tuple of strings
+        The collision modes to choose from.
+    window : int
+        Number of recent measurements each cost per unit of work is averaged over, and the minimum number of frames
+        between switches.
+    remeasure_every : int
+        Number of frames between trials of the mode measured longest ago.
+    hysteresis : float
+        Fraction by which another mode must be predicted to be cheaper than the current one to switch to it.
+    explore_factor : float
+        Modes predicted to cost up to this many times the cheapest are measured.
+    mode : string
+        Mode in use, or None before the first frame.
+    unit_costs : dict
+        Cost in seconds per unit of work of each candidate, measured or prior.
+    switches : list of tuples
+        Frame count, previous mode, new mode and reason of every switch, for tuning the thresholds.
+
+    """
+    def __init__(self, candidates=('basic', 'selective', 'quadtree', 'grid', 'infected_index'), window=10,
+                 remeasure_every=100, hysteresis=0.2, explore_factor=4):
+        self.candidates = tuple(candidates)
+        self.window = window
+        self.remeasure_every = remeasure_every
+        self.hysteresis = hysteresis
+        self.explore_factor = explore_factor
+        self.mode = None
+        self.unit_costs = {mode: PRIOR_UNIT_COSTS[mode] for mode in self.candidates}
+        self.switches = []
+        self._frames = 0
+        self._switched = 0
+        self._measured = {}
+        self._warmed_up = set()
+
+    def predicted_costs(self, population_features):
+        """Predicted time, in seconds, of each candidate for a population with the given features."""
+        return {mode: cost * WORKLOADS[mode](population_features) for mode, cost in self.unit_costs.items()}
+
+    def choose(self, people):
+        """
+        Chooses the collision mode for the next frame of a population.
+
+        Parameters
+        ----------
+        people : People object
+            The population.
+
+        Returns
+        -------
+        string
+            The collision mode to use.
+
+        """
+        self._frames += 1
+        population_features = features(people)
+        predicted = self.predicted_costs(population_features)
+        best = min(predicted, key=predicted.get)
+        plausible = [mode for mode in self.candidates if predicted[mode] <= self.explore_factor * predicted[best]]
+        unmeasured = [mode for mode in plausible if mode not in self._measured]
+        if unmeasured:
+            logger.debug("frame %d: trying '%s' for the first time", self._frames, unmeasured[0])
+            return unmeasured[0]
+
+        if self.mode is None:
+            self._switch(best, f"lowest predicted cost, {predicted[best] * 1000:.3f} ms", population_features)
+        elif (best != self.mode and predicted[best] < (1 - self.hysteresis) * predicted[self.mode] and
+              self._frames - self._switched >= self.window):
+            self._switch(best, f"predicted {predicted[best] * 1000:.3f} ms against "
+                               f"{predicted[self.mode] * 1000:.3f} ms for '{self.mode}'", population_features)
+        elif self._frames % self.remeasure_every == 0 and len(plausible) > 1:
+            trial = min((mode for mode in plausible if mode != self.mode), key=self._measured.get)
+            logger.debug("frame %d: re-measuring '%s'", self._frames, trial)
+            return trial
+        return self.mode
+
+    def _switch(self, mode, reason, population_features):
+        logger.info("frame %d: collision mode '%s' -> '%s': %s (n=%d, infected=%d, neighbours=%.2f)", self._frames,
+                    self.mode, mode, reason, population_features['n'], population_features['infected'],
+                    population_features['neighbours'])
+        self.switches.append((self._frames, self.mode, mode, reason))
+        self._switched = self._frames
+        self.mode = mode
+
+    def record(self, mode, seconds, people):
+        """
+        Adds a measurement of the time a mode took for a population to its cost per unit of work.
+
+        Parameters
+        ----------
+        mode : string
+            The collision mode used.
+        seconds : float
+            The time it took.
+        people : People object
+            The population, in the state the mode was used on.
+
+        Returns
+        -------
+        None
+
+        """
+        if mode not in self._warmed_up:
+            self._warmed_up.add(mode)
+            return
+        cost = seconds / max(WORKLOADS[mode](features(people)), 1)
+        if mode in self._measured:
+            weight = 2 / (self.window + 1)
+            cost = (1 - weight) * self.unit_costs[mode] + weight * cost
+        self.unit_costs[mode] = cost
+        self._measured[mode] = self._frames
+
+    def contact_pairs(self, people):
+        """
+        Finds the contact pairs of a population with the mode chosen for this frame, measuring how long it takes.
+
+        Parameters
+        ----------
+        people : People object
+            The population.
+
+        Returns
+        -------
+        tuple of numpy arrays
+            Indices of the two people in each contact pair.
+
+        """
+        mode = self.choose(people)
+        start = time.perf_counter()
+        pairs = people.contact_pairs(mode)
+        self.record(mode, time.perf_counter() - start, people)
+        return pairs
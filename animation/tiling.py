@@ -0,0 +1,198 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import collision
+import health
+
+# Shared memory blocks attached by this (worker) process, by name
+_attached = {}
+
+
+def _attach(name, dtype, shape):
+    """A numpy view onto a named shared memory block, attaching to it on first use."""
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=_attached[name].buf)
+
+
+def _release(keep):
+    """Detaches from every shared memory block not named in keep."""
+    for name in list(_attached):
+        if name not in keep:
+            _attached.pop(name).close()
+
+
+def tile_pairs(blocks, n_people, shape, tile_size, radius, tile):
+    """
+    Worker task: the contact pairs owned by one tile, read straight from shared memory.
+
+    A pair is owned by the tile holding its lower indexed person. Tiles are at least one contact distance wide, so
+    everyone in contact with the tile's people lies within the tile's halo, which only reaches the adjacent tiles.
+    Only pairs of one healthy and one infected person are returned, as no other contact changes anything.
+
+    Parameters
+    ----------
+    blocks : dict
+        Names of the shared memory blocks holding 'pos', 'status', 'order' and 'starts'.
+    n_people : int
+        Population size.
+    shape : tuple of ints
+        Number of tiles along x and y.
+    tile_size : numpy array of floats
+        Width and height of a tile.
+    radius : int
+        Radius, in number of pixels, of every person.
+    tile : tuple of ints
+        x and y index of the tile.
+
+    Returns
+    -------
+    tuple of numpy arrays
+        Indices (first, second) of each pair in contact, with first < second.
+
+    """
+    _release(set(blocks.values()))
+    pos = _attach(blocks['pos'], np.float64, (n_people, 2))
+    status = _attach(blocks['status'], np.int8, (n_people,))
+    order = _attach(blocks['order'], np.int64, (n_people,))
+    starts = _attach(blocks['starts'], np.int64, (shape[0] * shape[1] + 1,))
+
+    tx, ty = tile
+    members = [order[starts[y * shape[0] + x]:starts[y * shape[0] + x + 1]]
+               for y in range(max(ty - 1, 0), min(ty + 2, shape[1]))
+               for x in range(max(tx - 1, 0), min(tx + 2, shape[0]))]
+    members = np.concatenate(members)
+
+    contact = 2 * radius
+    lower = np.array([tx, ty]) * tile_size - contact
+    upper = lower + tile_size + 2 * contact
+    local = pos[members]
+    in_halo = np.all((local >= lower) & (local < upper), axis=1)
+    members, local = members[in_halo], local[in_halo]
+
+    first, second = collision.grid_pairs(local - lower, radius, upper - lower)
+    first, second = members[first], members[second]
+    swap = first > second
+    first[swap], second[swap] = second[swap], first[swap]
+
+    owner = np.clip((pos[first] // tile_size).astype(np.int64), 0, np.array(shape) - 1)
+    first_status, second_status = status[first], status[second]
+    discordant = (((first_status == health.INFECTED) & (second_status == health.HEALTHY)) |
+                  ((first_status == health.HEALTHY) & (second_status == health.INFECTED)))
+    keep = (owner[:, 0] == tx) & (owner[:, 1] == ty) & discordant
+    return first[keep], second[keep]
+
+
+class TiledCollider:
+    """
+    Multi-core collision detection. The environment is partitioned into spatial tiles, each extended by a halo of one
+    contact distance, and the tiles are processed by a pool of worker processes.
+
+    Positions and statuses are written once per frame into shared memory, together with the people sorted by tile,
+    and every worker reads them from there without copying. The pairs found by the tiles are disjoint and their union
+    is the set of healthy-infected pairs found by collision.grid_pairs, so once resolved (with People.infect_contacts,
+    which does not depend on the order of the pairs) the outcome is the same as the single-threaded collision modes.
+
+    Attributes
+    ----------
+    workers : int
+        Number of worker processes.
+    tiles_per_worker : int
+        Number of tiles per worker process, for load balancing.
+
+    """
+    def __init__(self, workers=None, tiles_per_worker=4):
+        self.workers = workers or os.cpu_count()
+        self.tiles_per_worker = tiles_per_worker
+        self._pool = None
+        self._blocks = {}
+        self._capacity = 0
+        self._finalizer = None
+
+    def _allocate(self, n_people, n_tiles):
+        """(Re)allocates the shared memory blocks if they are too small."""
+        if self._blocks and n_people <= self._capacity and self._blocks['starts'].size >= (n_tiles + 1) * 8:
+            return
+        self._free()
+        self._capacity = max(n_people, 2 * self._capacity)
+        sizes = {'pos': self._capacity * 16, 'status': self._capacity, 'order': self._capacity * 8,
+                 'starts': (n_tiles + 1) * 8}
+        self._blocks = {key: shared_memory.SharedMemory(create=True, size=size) for key, size in sizes.items()}
+        self._finalizer = weakref.finalize(self, TiledCollider._unlink, list(self._blocks.values()))
+
+    @staticmethod
+    def _unlink(blocks):
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    def _free(self):
+        if self._finalizer is not None:
+            self._finalizer()
+        self._blocks = {}
+
+    def _view(self, key, dtype, shape):
+        return np.ndarray(shape, dtype=dtype, buffer=self._blocks[key].buf)
+
+    def tiles(self, dimensions, radius):
+        """Number of tiles along x and y: about tiles_per_worker per worker, each at least a contact distance wide."""
+        dimensions = np.asarray(dimensions, dtype=float)
+        target = self.workers * self.tiles_per_worker
+        nx = max(int(round(np.sqrt(target * dimensions[0] / dimensions[1]))), 1)
+        ny = max(int(round(target / nx)), 1)
+        largest = np.maximum((dimensions // (2 * radius)).astype(int), 1)
+        return int(min(nx, largest[0])), int(min(ny, largest[1]))
+
+    def pairs(self, pos, status, radius, dimensions):
+        """
+        Finds every pair of one healthy and one infected person close enough for transmission.
+
+        Parameters
+        ----------
+        pos : (n, 2) numpy array of floats
+            Positions of the people.
+        status : (n,) numpy array of int8
+            Health status codes of the people.
+        radius : int
+            Radius, in number of pixels, of every person.
+        dimensions : 2 element numpy array of ints
+            Width and height bounds of the environment.
+
+        Returns
+        -------
+        tuple of numpy arrays
+            Indices (first, second) of each pair in contact, with first < second.
+
+        """
+        n_people = len(pos)
+        shape = self.tiles(dimensions, radius)
+        self._allocate(n_people, shape[0] * shape[1])
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        tile_size = np.asarray(dimensions, dtype=float) / shape
+        cells = np.clip((pos // tile_size).astype(np.int64), 0, np.array(shape) - 1)
+        tile_ids = cells[:, 1] * shape[0] + cells[:, 0]
+        self._view('pos', np.float64, (n_people, 2))[:] = pos
+        self._view('status', np.int8, (n_people,))[:] = status
+        self._view('order', np.int64, (n_people,))[:] = np.argsort(tile_ids, kind='stable')
+        starts = self._view('starts', np.int64, (shape[0] * shape[1] + 1,))
+        starts[0] = 0
+        np.cumsum(np.bincount(tile_ids, minlength=shape[0] * shape[1]), out=starts[1:])
+
+        names = {key: block.name for key, block in self._blocks.items()}
+        futures = [self._pool.submit(tile_pairs, names, n_people, shape, tile_size, radius, (tx, ty))
+                   for ty in range(shape[1]) for tx in range(shape[0])]
+        results = [future.result() for future in futures]
+        return (np.concatenate([first for first, _ in results]),
+                np.concatenate([second for _, second in results]))
+
+    def close(self):
+        """Shuts down the worker pool and frees the shared memory."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._free()
+        self._capacity = 0
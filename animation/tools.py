@@ -3,9 +3,24 @@ import yaml
 import pathlib
 
 
-def random_between(lower_upper_list):
-    """Random number (float) between given lower and upper bounds stored in list as [lower, upper]"""
-    return ((lower_upper_list[1] - lower_upper_list[0]) * random()) + lower_upper_list[0]
+def random_between(lower_upper_list, rng=None):
+    """
+    Random number (float) between given lower and upper bounds stored in list as [lower, upper]. Drawn from the numpy
+    Generator 'rng' if one is given, otherwise from the standard library's global random state.
+    """
+    uniform = rng.random() if rng is not None else random()
+    return ((lower_upper_list[1] - lower_upper_list[0]) * uniform) + lower_upper_list[0]
+
+
+def resolve_path(file):
+    """
+    Absolute path of a file given relative to the working directory or, if it does not exist there, to this module's
+    directory.
+    """
+    path = pathlib.Path(file)
+    if not path.is_absolute() and not path.exists():
+        path = pathlib.Path(__file__).parent / path
+    return path.resolve()
 
 
 def load_yaml(file):
@@ -14,15 +29,15 @@ def load_yaml(file):
 
     Parameters
     ----------
-    file : string
-        Name of the yaml file with extension i.e. 'filename.yaml'.
+    file : string or pathlib.Path
+        Path of the yaml file with extension i.e. 'filename.yaml', see resolve_path.
 
     Returns
     -------
     dict
         Structured contents of the yaml file.
     """
-    yaml_path = pathlib.Path.cwd() / 'pandemic_simulation' / 'animation' / file
+    yaml_path = resolve_path(file)
     with yaml_path.open(mode='r') as f:
         yaml_doc = f.read()
     return yaml.load(yaml_doc, Loader=yaml.FullLoader)
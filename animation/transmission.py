@@ -0,0 +1,196 @@
+import numpy as np
+
+# Infector recorded for the people infected at the start of a run, who were not infected by anyone in it
+NO_INFECTOR = -1
+
+
+class TransmissionLog:
+    """
+    Append-only record of every infection of a population: the frame, the infector and the infectee, each held in a
+    growable int32 array whose capacity doubles when full. Recording a frame's infections costs one slice assignment
+    per array, and the log takes 12 bytes per infection.
+
+    People are identified by their index in the population's store. The transmission tree, reproduction numbers and
+    generation intervals are computed from the log on demand with vectorised passes.
+
+    Attributes
+    ----------
+    size : int
+        Number of infections recorded.
+
+    """
+    FIELDS = ('frame', 'infector', 'infectee')
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self._arrays = {field: np.zeros(capacity, dtype=np.int32) for field in self.FIELDS}
+
+    @classmethod
+    def from_arrays(cls, frames, infectors, infectees):
+        """
+        Creates a log holding copies of recorded infections, e.g. read from a checkpoint.
+
+        Parameters
+        ----------
+        frames, infectors, infectees : numpy arrays of ints
+            Frame, infector and infectee of each infection, in the order they were recorded.
+
+        Returns
+        -------
+        TransmissionLog object
+
+        """
+        log = cls(max(2 * len(frames), 1024))
+        log.record(frames, infectors, infectees)
+        return log
+
+    def __len__(self):
+        """Special method returning the number of infections recorded"""
+        return self.size
+
+    @property
+    def frames(self):
+        """Frame of each infection, as a view of the recorded part of the array."""
+        return self._arrays['frame'][:self.size]
+
+    @property
+    def infectors(self):
+        """Infector of each infection, NO_INFECTOR for the initially infected."""
+        return self._arrays['infector'][:self.size]
+
+    @property
+    def infectees(self):
+        """Person infected by each infection."""
+        return self._arrays['infectee'][:self.size]
+
+    def record(self, frame, infectors, infectees):
+        """
+        Appends infections to the log.
+
+        Parameters
+        ----------
+        frame : int or numpy array of ints
+            Frame of the infections, or of each infection.
+        infectors : int or numpy array of ints
+            Infector of each infection, or NO_INFECTOR.
+        infectees : numpy array of ints
+            Person infected by each infection.
+
+        Returns
+        -------
+        None
+
+        """
+        n = np.size(infectees)
+        if self.size + n > self._arrays['frame'].size:
+            capacity = max(2 * self._arrays['frame'].size, self.size + n)
+            for field, array in self._arrays.items():
+                grown = np.zeros(capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                self._arrays[field] = grown
+        for field, values in zip(self.FIELDS, (frame, infectors, infectees)):
+            self._arrays[field][self.size:self.size + n] = values
+        self.size += n
+
+    def index_cases(self):
+        """The people infected at the start of the run, logged with NO_INFECTOR."""
+        return self.infectees[self.infectors == NO_INFECTOR]
+
+    def _n_people(self, n_people):
+        if n_people is not None:
+            return n_people
+        return int(self.infectees.max()) + 1 if self.size else 0
+
+    def infection_frames(self, n_people=None):
+        """
+        Frame each person was infected on.
+
+        Parameters
+        ----------
+        n_people : int
+            Population size. If None, up to the highest index in the log.
+
+        Returns
+        -------
+        numpy array of ints
+            -1 for people never infected.
+
+        """
+        infected_on = np.full(self._n_people(n_people), -1, dtype=np.int64)
+        infected_on[self.infectees] = self.frames
+        return infected_on
+
+    def secondary_cases(self, n_people=None):
+        """Number of people each person infected, as an array indexed by person. See infection_frames."""
+        infectors = self.infectors
+        return np.bincount(infectors[infectors != NO_INFECTOR], minlength=self._n_people(n_people))
+
+    def tree(self, n_people=None):
+        """
+        The transmission tree, as the infector of each person.
+
+        Returns
+        -------
+        numpy array of ints
+            NO_INFECTOR for the initially infected and the people never infected. See infection_frames.
+
+        """
+        parents = np.full(self._n_people(n_people), NO_INFECTOR, dtype=np.int64)
+        parents[self.infectees] = self.infectors
+        return parents
+
+    def generations(self, n_people=None):
+        """
+        Generation of each person in the transmission tree: 0 for the initially infected, 1 for the people they
+        infected and so on. Computed by pointer jumping, in a number of vectorised passes that grows with the logarithm
+        of the depth of the tree.
+
+        Returns
+        -------
+        numpy array of ints
+            -1 for people never infected. See infection_frames.
+
+        """
+        ancestors = self.tree(n_people)
+        generations = (ancestors != NO_INFECTOR).astype(np.int64)
+        jumping = np.flatnonzero(ancestors != NO_INFECTOR)
+        while jumping.size:
+            targets = ancestors[jumping]
+            generations[jumping] += generations[targets]
+            ancestors[jumping] = ancestors[targets]
+            jumping = jumping[ancestors[jumping] != NO_INFECTOR]
+        generations[self.infection_frames(n_people) < 0] = -1
+        return generations
+
+    def generation_intervals(self):
+        """Frames between the infection of each infector and each infection they caused, in the order of the log."""
+        infected_on = self.infection_frames()
+        caused = self.infectors != NO_INFECTOR
+        return self.frames[caused] - infected_on[self.infectors[caused]]
+
+    def reproduction_numbers(self, cohort_frames=1, n_people=None):
+        """
+        Effective reproduction number R(t) by infection cohort: the mean number of people infected by the people who
+        were themselves infected in each window of 'cohort_frames' frames. Cohorts still infectious have not caused
+        all their infections yet, so the latest values are underestimates until the epidemic ends.
+
+        Parameters
+        ----------
+        cohort_frames : int
+            Number of frames in each cohort.
+        n_people : int
+            Population size, see infection_frames.
+
+        Returns
+        -------
+        tuple of numpy arrays
+            The first frame of each cohort with at least one infection, its reproduction number and its size.
+
+        """
+        infected_on = self.infection_frames(n_people)
+        infected = infected_on >= 0
+        cohorts = infected_on[infected] // cohort_frames
+        sizes = np.bincount(cohorts)
+        cases = np.bincount(cohorts, weights=self.secondary_cases(n_people)[infected], minlength=sizes.size)
+        present = np.flatnonzero(sizes)
+        return present * cohort_frames, cases[present] / sizes[present], sizes[present]
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import checkpoint
+import config
+import headless
+import population
+
+
+class CheckpointTests(unittest.TestCase):
+
+    def setUp(self):
+        self.configurations = config.load()
+        self.configurations['people']['number'] = 400
+        self.configurations['environment']['dimensions'] = [400, 300]
+        self.configurations['events'] = [{'enable': True, 'type': 'social distancing', 'frame_trigger': {'frame': 150}}]
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, 'state.ckpt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_series_equal(self, resumed, uninterrupted, start):
+        for key, values in uninterrupted.items():
+            np.testing.assert_array_equal(resumed[key], values[start:], err_msg=key)
+
+    def run_and_resume(self, mmap_mode):
+        people = population.People.from_config(self.configurations, np.random.default_rng(7))
+        headless.simulate(people, self.configurations, 1, 100)
+        checkpoint.save(self.file, people, 100)
+        uninterrupted = headless.simulate(people, self.configurations, 101, 400)
+
+        restored, frame, events = checkpoint.restore(self.file, mmap_mode)
+        self.assertEqual(frame, 100)
+        resumed = headless.simulate(restored, self.configurations, frame + 1, 400, events)
+        self.assert_series_equal(resumed, uninterrupted, 0)
+        for field in ('pos', 'vector', 'status', 'num_infected_by_me'):
+            np.testing.assert_array_equal(getattr(restored.store, field), getattr(people.store, field))
+        np.testing.assert_array_equal(restored.transmissions.infectees, people.transmissions.infectees)
+
+    def test_resume_equals_uninterrupted_run(self):
+        self.run_and_resume('c')
+
+    def test_resume_read_into_memory(self):
+        self.run_and_resume(None)
+
+    def test_resuming_leaves_the_checkpoint_unchanged(self):
+        people = population.People.from_config(self.configurations, np.random.default_rng(8))
+        headless.simulate(people, self.configurations, 1, 50)
+        checkpoint.save(self.file, people, 50)
+        with open(self.file, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        restored, frame, events = checkpoint.restore(self.file)
+        headless.simulate(restored, self.configurations, frame + 1, 150, events)
+        with open(self.file, 'rb') as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), digest)
+
+    def test_not_a_checkpoint(self):
+        with open(self.file, 'wb') as f:
+            f.write(b'not a checkpoint')
+        with self.assertRaises(ValueError):
+            checkpoint.restore(self.file)
+
+
+if __name__ == '__main__':
+    unittest.main()
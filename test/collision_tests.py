@@ -0,0 +1,125 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import collision
+import health
+import tiling
+
+
+def pair_set(first, second):
+    return set(zip(np.minimum(first, second).tolist(), np.maximum(first, second).tolist()))
+
+
+class TiledColliderTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.collider = tiling.TiledCollider(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.collider.close()
+
+    def assert_matches_grid(self, pos, status, radius, dimensions):
+        first, second = collision.grid_pairs(pos, radius, dimensions)
+        discordant = ((status[first] == health.INFECTED) & (status[second] == health.HEALTHY) |
+                      (status[first] == health.HEALTHY) & (status[second] == health.INFECTED))
+        tiled = self.collider.pairs(pos, status, radius, dimensions)
+        self.assertTrue(np.all(tiled[0] < tiled[1]))
+        self.assertEqual(len(tiled[0]), len(pair_set(*tiled)))
+        self.assertEqual(pair_set(*tiled), pair_set(first[discordant], second[discordant]))
+
+    def test_uniform_population(self):
+        rng = np.random.default_rng(0)
+        dimensions = np.array([1000, 400])
+        pos = rng.random((5000, 2)) * dimensions
+        status = rng.choice(np.array([health.HEALTHY, health.INFECTED, health.RECOVERED], dtype=np.int8), 5000)
+        self.assert_matches_grid(pos, status, 5, dimensions)
+
+    def test_clustered_population_across_tile_edges(self):
+        rng = np.random.default_rng(1)
+        dimensions = np.array([600, 600])
+        # Clusters on the centre lines, where the tiles meet
+        centres = np.array([[300, 300], [300, 150], [150, 300]])
+        pos = np.clip(centres[rng.integers(0, 3, 3000)] + rng.normal(0, 15, (3000, 2)), 0, 600)
+        status = np.where(rng.random(3000) < 0.3, health.INFECTED, health.HEALTHY).astype(np.int8)
+        self.assert_matches_grid(pos, status, 4, dimensions)
+
+    def test_population_growing_between_calls(self):
+        rng = np.random.default_rng(2)
+        dimensions = np.array([500, 500])
+        for n_people in (100, 3000):
+            pos = rng.random((n_people, 2)) * dimensions
+            status = np.where(rng.random(n_people) < 0.5, health.INFECTED, health.HEALTHY).astype(np.int8)
+            self.assert_matches_grid(pos, status, 5, dimensions)
+
+
+class ResolveContactsTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.status = rng.choice(np.array([health.HEALTHY, health.INFECTED, health.RECOVERED], dtype=np.int8), 2000)
+        pairs = np.unique(np.sort(rng.integers(0, 2000, (20000, 2)), axis=1), axis=0)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        self.first, self.second = pairs[:, 0], pairs[:, 1]
+        discordant = ((self.status[self.first] == health.INFECTED) & (self.status[self.second] == health.HEALTHY) |
+                      (self.status[self.first] == health.HEALTHY) & (self.status[self.second] == health.INFECTED))
+        self.contacts = pair_set(self.first[discordant], self.second[discordant])
+
+    def assert_valid(self, infectees, infectors):
+        self.assertTrue(np.all(np.diff(infectees) > 0))
+        np.testing.assert_array_equal(self.status[infectees], health.HEALTHY)
+        np.testing.assert_array_equal(self.status[infectors], health.INFECTED)
+        self.assertTrue(pair_set(infectees, infectors) <= self.contacts)
+
+    def test_every_contact_transmits_without_rng(self):
+        infectees, infectors = collision.resolve_contacts(self.first, self.second, self.status)
+        self.assert_valid(infectees, infectors)
+        self.assertEqual(set(infectees.tolist()), {min(pair, key=lambda i: self.status[i]) for pair in self.contacts})
+        lowest = {}
+        for pair in self.contacts:
+            infectee, infector = sorted(pair, key=lambda i: self.status[i])
+            lowest[infectee] = min(lowest.get(infectee, infector), infector)
+        self.assertEqual(dict(zip(infectees.tolist(), infectors.tolist())), lowest)
+
+    def test_transmission_probability(self):
+        probability = 0.3
+        infectees, infectors = collision.resolve_contacts(self.first, self.second, self.status, probability,
+                                                          np.random.default_rng(4))
+        self.assert_valid(infectees, infectors)
+        # A healthy person with k infected contacts is infected with probability 1 - (1 - p)^k
+        exposed = np.bincount([min(pair, key=lambda i: self.status[i]) for pair in self.contacts], minlength=2000)
+        expected = (1 - (1 - probability) ** exposed).sum()
+        spread = np.sqrt(expected)
+        self.assertGreater(expected, 300)
+        self.assertLess(abs(infectees.size - expected), 4 * spread)
+        no_transmission = collision.resolve_contacts(self.first, self.second, self.status, 0.0,
+                                                     np.random.default_rng(4))
+        self.assertEqual(no_transmission[0].size, 0)
+
+    def test_pair_order_does_not_change_outcome(self):
+        order = np.random.default_rng(5).permutation(self.first.size)
+        outcomes = [collision.resolve_contacts(first, second, self.status, 0.5, np.random.default_rng(6))
+                    for first, second in ((self.first, self.second), (self.second[order], self.first[order]))]
+        np.testing.assert_array_equal(outcomes[0][0], outcomes[1][0])
+        np.testing.assert_array_equal(outcomes[0][1], outcomes[1][1])
+
+    def test_random_attribution_is_uniform(self):
+        status = np.array([health.HEALTHY] + [health.INFECTED] * 4, dtype=np.int8)
+        rng = np.random.default_rng(7)
+        credited = np.zeros(5, dtype=int)
+        for _ in range(4000):
+            infectees, infectors = collision.resolve_contacts(np.zeros(4, dtype=int), np.arange(1, 5), status, 1.0,
+                                                              rng)
+            self.assertEqual(infectees.tolist(), [0])
+            credited[infectors] += 1
+        self.assertEqual(credited[0], 0)
+        self.assertTrue(np.all(np.abs(credited[1:] - 1000) < 150), credited)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import config
+
+# The settings of the original config.yaml, before any of the optional settings existed
+MINIMAL = """
+pandemic:
+  collision_detection: 'quadtree'
+  at_risk_age: 80
+environment:
+  dimensions: [1000, 400]
+people:
+  number: 1000
+  initially_infected: 8
+  radius: 5
+  age_range: [0, 100]
+  healthy: {speed: [0.8, 1.4], frame_limit: [0, 0]}
+  infected: {speed: [0.5, 1.5], frame_limit: [150, 350]}
+  recovered: {speed: [0.8, 1.4], frame_limit: [0, 0]}
+  dead: {speed: [0, 0], frame_limit: [100, 250]}
+events: []
+"""
+
+
+class ValidateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.configurations = config.load()
+
+    def assert_invalid(self, message):
+        with self.assertRaises(config.ConfigError) as raised:
+            config.validate(self.configurations)
+        self.assertIn(message, str(raised.exception))
+
+    def test_default_file_is_valid(self):
+        config.validate(self.configurations)
+
+    def test_load_returns_copies(self):
+        self.configurations['people']['number'] = 1
+        self.assertNotEqual(config.load()['people']['number'], 1)
+
+    def test_minimal_file_gets_defaults(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'minimal.yaml')
+            with open(path, 'w') as f:
+                f.write(MINIMAL)
+            configurations = config.load(path)
+        for keys, value in config.DEFAULTS.items():
+            setting = configurations
+            for key in keys:
+                setting = setting[key]
+            self.assertEqual(setting, value, '/'.join(keys))
+
+    def test_config_error_is_value_error(self):
+        self.assertTrue(issubclass(config.ConfigError, ValueError))
+
+    def test_missing_setting(self):
+        del self.configurations['people']['radius']
+        self.assert_invalid("Missing setting 'people/radius'")
+        self.configurations = config.load()
+        del self.configurations['environment']
+        self.assert_invalid("Missing setting 'environment'")
+
+    def test_invalid_collision_mode(self):
+        self.configurations['pandemic']['collision_detection'] = 'octree'
+        self.assert_invalid('pandemic/collision_detection')
+
+    def test_auto_candidates_only_checked_in_auto_mode(self):
+        self.configurations['pandemic']['auto']['candidates'] = ['auto']
+        config.validate(self.configurations)
+        self.configurations['pandemic']['collision_detection'] = 'auto'
+        self.assert_invalid('pandemic/auto/candidates')
+
+    def test_invalid_values(self):
+        invalid = {('pandemic', 'transmission_probability'): 1.5,
+                   ('environment', 'dimensions'): [0, 400],
+                   ('people', 'initially_infected'): 2000,
+                   ('people', 'radius'): 2.5,
+                   ('people', 'age_range'): [100, 0],
+                   ('people', 'infected', 'duration'): 250,
+                   ('timing', 'tick_rate'): 0,
+                   ('profiling', 'enabled'): 'no',
+                   ('profiling', 'trace'): 3,
+                   ('appearance', 'dirty_rects'): None,
+                   ('appearance', 'plot_frames_per_column'): 0}
+        for keys, value in invalid.items():
+            with self.subTest(setting='/'.join(keys)):
+                self.configurations = config.load()
+                container = self.configurations
+                for key in keys[:-1]:
+                    container = container[key]
+                container[keys[-1]] = value
+                self.assert_invalid('/'.join(keys))
+
+    def test_invalid_metapopulation(self):
+        self.configurations['metapopulation']['regions'][1]['initially_infected'] = 600
+        with self.assertRaises(config.ConfigError):
+            config.validate_metapopulation(self.configurations)
+
+    def test_invalid_forking(self):
+        self.configurations['forking']['branches'] = {}
+        with self.assertRaises(config.ConfigError):
+            config.validate_forking(self.configurations)
+
+
+if __name__ == '__main__':
+    unittest.main()
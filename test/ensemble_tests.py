@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import config
+import ensemble
+
+
+class EnsembleTests(unittest.TestCase):
+
+    def setUp(self):
+        self.configurations = config.load()
+        self.configurations['people']['number'] = 200
+        self.configurations['environment']['dimensions'] = [300, 200]
+
+    def test_parameter_grid(self):
+        grid = ensemble.parameter_grid({'a': [1, 2], 'b': ['x', 'y', 'z']})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {'a': 1, 'b': 'x'})
+        self.assertEqual(grid[-1], {'a': 2, 'b': 'z'})
+        self.assertEqual(ensemble.parameter_grid(None), [{}])
+
+    def test_set_parameter(self):
+        ensemble.set_parameter(self.configurations, 'environment.dimensions.1', 250)
+        self.assertEqual(self.configurations['environment']['dimensions'], [300, 250])
+
+    def test_sweep_over_list_values(self):
+        dimensions = [[300, 200], [150, 100]]
+        results = ensemble.run_ensemble(self.configurations, runs=2, parameters={'environment.dimensions': dimensions},
+                                        frames=30, seed=4, workers=2)
+        self.assertEqual([point for point, _ in results], [{'environment.dimensions': value} for value in dimensions])
+        for _, curves in results:
+            np.testing.assert_array_equal(curves['frame'], np.arange(1, 31))
+            total = sum(curves[key]['mean'] for key in ('healthy', 'recovered', 'dead', 'infected'))
+            np.testing.assert_array_equal(total, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
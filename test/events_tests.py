@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import environment
+import events
+import population
+
+
+def event(kind, frame, enable=True, **extra):
+    return dict({'enable': enable, 'type': kind, 'frame_trigger': {'frame': frame}}, **extra)
+
+
+class TimelineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.people = population.People(environment.Area(np.array([400, 300])), 200, 5, 5, [0, 100],
+                                        rng=np.random.default_rng(2))
+
+    def test_schedule(self):
+        timeline = events.Timeline([event('lockdown', 10), event('normal', 20), event('lockdown', 10, enable=False),
+                                    event('social distancing', 10)])
+        self.assertEqual(sorted(timeline.schedule), [10, 20])
+        self.assertEqual([action.speed for action in timeline.actions(10)], [0.1, 0.5])
+        self.assertEqual(timeline.actions(11), [])
+
+    def test_every_person_targeted_by_default(self):
+        events.Timeline([event('lockdown', 3)]).apply(self.people, 3)
+        np.testing.assert_array_equal(self.people.store.var_speed, 0.1)
+
+    def test_custom_speed(self):
+        timeline = events.Timeline([event('curfew', 4, speed=0.25), event('lockdown', 5, speed=0.3)])
+        timeline.apply(self.people, 4)
+        np.testing.assert_array_equal(self.people.store.var_speed, 0.25)
+        timeline.apply(self.people, 5)
+        np.testing.assert_array_equal(self.people.store.var_speed, 0.3)
+
+    def test_age_target(self):
+        events.Timeline([event('lockdown', 1, target={'age': [70, 100]})]).apply(self.people, 1)
+        store = self.people.store
+        old = store.age >= 70
+        self.assertTrue(old.any() and not old.all())
+        np.testing.assert_array_equal(store.var_speed[old], 0.1)
+        np.testing.assert_array_equal(store.var_speed[~old], 1.0)
+
+    def test_region_target(self):
+        events.Timeline([event('social distancing', 1, target={'region': [0, 0, 200, 150]})]).apply(self.people, 1)
+        store = self.people.store
+        inside = (store.pos[:, 0] <= 200) & (store.pos[:, 1] <= 150)
+        self.assertTrue(inside.any() and not inside.all())
+        np.testing.assert_array_equal(store.var_speed[inside], 0.5)
+        np.testing.assert_array_equal(store.var_speed[~inside], 1.0)
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            events.Timeline([event('curfew', 1)])
+        events.Timeline([event('curfew', 1, enable=False)])
+
+    def test_person_matches_population(self):
+        config_events = [event('lockdown', 2, target={'age': [0, 40], 'region': [0, 0, 300, 300]}),
+                         event('curfew', 2, speed=0.7, target={'age': [60, 100]})]
+        for person in self.people:
+            person.government_advice(2, config_events)
+        expected = self.people.store.var_speed.copy()
+        self.people.store.var_speed[:] = 1.0
+        self.people.government_advice(2, config_events)
+        np.testing.assert_array_equal(self.people.store.var_speed, expected)
+        self.assertEqual(set(expected.tolist()), {0.1, 0.7, 1.0})
+        with self.assertRaises(ValueError):
+            self.people[0].government_advice(2, [event('curfew', 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
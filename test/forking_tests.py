@@ -0,0 +1,75 @@
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import config
+import forking
+import headless
+import population
+
+LOCKDOWN = [{'enable': True, 'type': 'lockdown', 'frame_trigger': {'frame': 101}}]
+
+
+class ForkTests(unittest.TestCase):
+
+    def setUp(self):
+        self.configurations = config.load()
+        self.configurations['people']['number'] = 400
+        self.configurations['environment']['dimensions'] = [400, 300]
+        self.configurations['events'] = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.directory.name, 'snapshot.ckpt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fork(self, workers):
+        people = population.People.from_config(self.configurations, np.random.default_rng(9))
+        headless.simulate(people, self.configurations, 1, 100)
+        header, arrays = people.state()
+        results = forking.fork(people, 100, self.configurations, {'no action': [], 'lockdown': LOCKDOWN}, 300,
+                               workers, self.snapshot)
+
+        # The forked population is not changed
+        fork_header, fork_arrays = people.state()
+        self.assertEqual(fork_header, header)
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(fork_arrays[name], array, err_msg=name)
+        return people, results
+
+    def test_no_action_branch_equals_uninterrupted_run(self):
+        people, results = self.fork(0)
+        self.assertEqual(list(results), ['no action', 'lockdown'])
+        uninterrupted = headless.simulate(people, self.configurations, 101, 300, [])
+        for key, values in uninterrupted.items():
+            np.testing.assert_array_equal(results['no action'][key], values, err_msg=key)
+        self.assertFalse(np.array_equal(results['lockdown']['infected'], uninterrupted['infected']))
+
+    def test_branches_leave_the_snapshot_unchanged(self):
+        _, sequential = self.fork(0)
+        with open(self.snapshot, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        _, parallel = self.fork(2)
+        with open(self.snapshot, 'rb') as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), digest)
+        for name, series in sequential.items():
+            for key, values in series.items():
+                np.testing.assert_array_equal(parallel[name][key], values, err_msg=f'{name} {key}')
+
+    def test_run_joins_the_shared_part_and_each_branch(self):
+        self.configurations['forking'] = {'frame': 100, 'branches': {'no action': [], 'lockdown': LOCKDOWN}}
+        results = forking.run(self.configurations, 300, seed=9, workers=0)
+        people = population.People.from_config(self.configurations, np.random.default_rng(9))
+        uninterrupted = headless.simulate(people, self.configurations, 1, 300)
+        for key in ('frame', 'healthy', 'recovered', 'dead', 'infected'):
+            np.testing.assert_array_equal(results['no action'][key], uninterrupted[key], err_msg=key)
+        np.testing.assert_array_equal(results['lockdown']['frame'], np.arange(1, 301))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import config
+import health
+
+
+class DurationTests(unittest.TestCase):
+
+    def draw(self, distribution, n=20000, **parameters):
+        return health.Duration(distribution, **parameters).draw(n, np.random.default_rng(0))
+
+    def test_fixed(self):
+        frames = self.draw('fixed', frames=120)
+        self.assertEqual(frames.dtype, np.int64)
+        np.testing.assert_array_equal(frames, 120)
+
+    def test_uniform_includes_both_bounds(self):
+        frames = self.draw('uniform', low=100, high=110)
+        self.assertEqual(frames.min(), 100)
+        self.assertEqual(frames.max(), 110)
+        self.assertEqual(np.unique(frames).size, 11)
+
+    def test_normal(self):
+        frames = self.draw('normal', mean=250, sd=20)
+        self.assertEqual(frames.dtype, np.int64)
+        self.assertAlmostEqual(frames.mean(), 250, delta=1)
+        self.assertAlmostEqual(frames.std(), 20, delta=1)
+
+    def test_gamma(self):
+        frames = self.draw('gamma', mean=250, sd=50)
+        self.assertGreaterEqual(frames.min(), 0)
+        self.assertAlmostEqual(frames.mean(), 250, delta=2)
+        self.assertAlmostEqual(frames.std(), 50, delta=2)
+
+    def test_never_negative(self):
+        frames = self.draw('normal', mean=5, sd=20)
+        self.assertEqual(frames.min(), 0)
+
+    def test_spec(self):
+        spec = {'distribution': 'gamma', 'mean': 250, 'sd': 50}
+        self.assertEqual(health.Duration(**spec).spec(), spec)
+
+    def test_invalid(self):
+        with self.assertRaises(config.ConfigError):
+            health.Duration('poisson', mean=3)
+        with self.assertRaises(config.ConfigError):
+            health.Duration('uniform', low=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import environment
+import health
+import kernels
+import population
+import transmission
+
+STATUSES = (health.Status('healthy', 1.0, 0, health.HEALTHY),
+            health.Status('recovered', 1.0, 0, health.RECOVERED),
+            health.Status('dead', 0, 100, health.DEAD),
+            health.Status('infected', 0.8, 150, health.INFECTED))
+
+
+def seeded_population(seed=3, n_people=300, n_infected=8, debug=True, transmission_probability=1.0):
+    """A small population with fixed statuses and its own seeded random number generator."""
+    return population.People(environment.Area(np.array([300, 300])), n_people, n_infected, 5, [0, 100],
+                             statuses=STATUSES, rng=np.random.default_rng(seed), debug=debug,
+                             transmission_probability=transmission_probability)
+
+
+def run(people, mode, frames):
+    """Simulates frames 1 to frames, returning the status numbers of every frame."""
+    series = []
+    for frame in range(1, frames + 1):
+        people.update(frame, 80, mode, [])
+        people.test_population()
+        series.append(tuple(people.status_numbers.values()))
+    return series
+
+
+class TrajectoryTests(unittest.TestCase):
+
+    def test_kernel_matches_person_views(self):
+        people = seeded_population()
+        pos, vector = people.store.pos.copy(), people.store.vector.copy()
+        for _ in range(200):
+            for person in people:
+                person.move()
+                person.boundary()
+            kernels.move_and_bounce(pos, vector, people.speeds(), people.store.var_speed, people.size,
+                                    people.box.dimensions)
+        np.testing.assert_array_equal(pos, people.store.pos)
+        np.testing.assert_array_equal(vector, people.store.vector)
+
+    def test_seeded_trajectory(self):
+        people = seeded_population()
+        series = run(people, 'basic', 400)
+        self.assertEqual(series[99], (131, 0, 0, 169))
+        self.assertEqual(series[199], (11, 60, 12, 217))
+        self.assertEqual(series[399], (0, 240, 55, 5))
+        self.assertEqual(people.store.num_infected_by_me.sum(), 292)
+        self.assertAlmostEqual(people.store.pos.sum(), 87911.08275649979, places=6)
+
+    def test_same_seed_same_trajectory(self):
+        first, second = seeded_population(), seeded_population()
+        self.assertEqual(run(first, 'grid', 200), run(second, 'grid', 200))
+        np.testing.assert_array_equal(first.store.pos, second.store.pos)
+
+    def test_collision_modes_give_the_same_trajectory(self):
+        reference = seeded_population()
+        expected = run(reference, 'basic', 300)
+        for mode in ('selective', 'quadtree', 'grid', 'infected_index'):
+            with self.subTest(mode=mode):
+                people = seeded_population()
+                self.assertEqual(run(people, mode, 300), expected)
+                np.testing.assert_array_equal(people.store.pos, reference.store.pos)
+                np.testing.assert_array_equal(people.store.num_infected_by_me, reference.store.num_infected_by_me)
+
+
+class TransmissionTests(unittest.TestCase):
+
+    def test_log_matches_infection_counts(self):
+        people = seeded_population()
+        run(people, 'grid', 400)
+        log = people.transmissions
+        np.testing.assert_array_equal(log.secondary_cases(len(people)), people.store.num_infected_by_me)
+        np.testing.assert_array_equal(log.index_cases(), np.arange(292, 300))
+        self.assertEqual(len(log), np.count_nonzero(people.store.status != health.HEALTHY))
+
+    def test_r_zero_is_mean_infections_of_index_cases(self):
+        people = seeded_population()
+        run(people, 'grid', 400)
+        self.assertEqual(people.epi_stats['r_zero'], people.store.num_infected_by_me[292:].mean())
+        cohorts, numbers, sizes = people.transmissions.reproduction_numbers(n_people=len(people))
+        self.assertEqual(cohorts[0], 0)
+        self.assertEqual(sizes[0], 8)
+        self.assertEqual(numbers[0], people.epi_stats['r_zero'])
+
+    def test_partial_transmission(self):
+        # Contacts last several frames, so lower probabilities delay infections more than they prevent them
+        infected = {}
+        for probability in (1.0, 0.5, 0.1):
+            people = seeded_population(transmission_probability=probability)
+            series = run(people, 'grid', 200)
+            infected[probability] = len(people) - series[99][0]
+            log = people.transmissions
+            caused = log.infectors != transmission.NO_INFECTOR
+            infectors, infectees = log.infectors[caused], log.infectees[caused]
+            # Every credited infector was infected before, and infected no one twice
+            infected_on = log.infection_frames(len(people))
+            self.assertTrue(np.all(infected_on[infectors] < log.frames[caused]))
+            self.assertEqual(np.unique(infectees).size, infectees.size)
+            np.testing.assert_array_equal(log.secondary_cases(len(people)), people.store.num_infected_by_me)
+            self.assertEqual(people.store.num_infected_by_me.sum(), len(people) - series[-1][0] - 8)
+        self.assertEqual(infected, {1.0: 169, 0.5: 163, 0.1: 118})
+        self.assertEqual(len(people) - run(seeded_population(transmission_probability=0.1), 'grid', 100)[-1][0], 118)
+
+
+class CountTests(unittest.TestCase):
+
+    def assert_counts_match_recount(self, people):
+        counts, finished, finished_infections = people.recount()
+        np.testing.assert_array_equal(people.counts, counts)
+        self.assertEqual(people._finished, finished)
+        self.assertEqual(people._finished_infections, finished_infections)
+
+    def test_incremental_counts_match_recount(self):
+        people = seeded_population()
+        for frame in range(1, 401):
+            people.update(frame, 80, 'grid', [])
+            people.test_population()
+            if frame % 50 == 0:
+                self.assert_counts_match_recount(people)
+        self.assertEqual(sum(people.status_numbers.values()), len(people))
+
+    def test_person_views_keep_counts(self):
+        people = seeded_population()
+        people[0].infection()
+        people[1].infection()
+        people[1].recovery()
+        people[-1].death()
+        self.assert_counts_match_recount(people)
+        people.test_population()
+
+    def test_migration_keeps_counts(self):
+        people = seeded_population()
+        run(people, 'grid', 150)
+        rows = people.extract(np.arange(0, len(people), 7))
+        self.assert_counts_match_recount(people)
+        people.admit(rows)
+        self.assert_counts_match_recount(people)
+        self.assertEqual(len(people), 300)
+        people.test_population()
+
+    def test_debug_detects_a_status_changed_behind_set_status(self):
+        people = seeded_population()
+        people.store.status[0] = health.DEAD
+        with self.assertRaises(RuntimeError):
+            people.test_population()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import progression
+
+
+class TransitionQueueTests(unittest.TestCase):
+
+    def test_pop_releases_only_due_people(self):
+        queue = progression.TransitionQueue()
+        queue.push(np.array([0, 1, 2, 3, 4]), np.array([30, 10, 20, 10, 40]))
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(queue.pop(9).tolist(), [])
+        self.assertEqual(queue.pop(10).tolist(), [1, 3])
+        self.assertEqual(queue.pop(10).tolist(), [])
+        self.assertEqual(len(queue), 3)
+
+    def test_pop_releases_passed_frames_in_frame_order(self):
+        queue = progression.TransitionQueue()
+        queue.push(np.array([5, 6]), np.array([50, 20]))
+        queue.push(np.array([7, 8]), np.array([30, 20]))
+        self.assertEqual(queue.pop(35).tolist(), [6, 8, 7])
+        self.assertEqual(queue.pop(100).tolist(), [5])
+        self.assertEqual(len(queue), 0)
+
+    def test_same_frame_keeps_push_order(self):
+        queue = progression.TransitionQueue()
+        queue.push(np.array([9, 2, 4]), np.array([15, 15, 15]))
+        queue.push(np.array([1]), np.array([15]))
+        self.assertEqual(queue.pop(15).tolist(), [9, 2, 4, 1])
+
+    def test_remap(self):
+        queue = progression.TransitionQueue()
+        queue.push(np.array([0, 3, 5, 8, 9]), np.array([10, 10, 20, 20, 30]))
+        queue.remap(np.array([3, 4, 8]))
+        self.assertEqual(len(queue), 3)
+        self.assertEqual(queue.pop(10).tolist(), [0])
+        self.assertEqual(queue.pop(20).tolist(), [3])
+        self.assertEqual(queue.pop(30).tolist(), [6])
+
+    def test_remap_nothing_removed(self):
+        queue = progression.TransitionQueue()
+        queue.push(np.array([1, 2]), np.array([5, 6]))
+        queue.remap(np.zeros(0, dtype=np.int64))
+        self.assertEqual(queue.pop(6).tolist(), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
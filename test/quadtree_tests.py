@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import collision
+import quadtree
+
+
+def inside(points, domain):
+    """Indices of the points strictly inside a Rectangle, found by brute force."""
+    return np.flatnonzero((domain.left < points[:, 0]) & (points[:, 0] < domain.right) &
+                          (domain.top < points[:, 1]) & (points[:, 1] < domain.bottom))
+
+
+def pair_set(first, second):
+    return set(zip(np.minimum(first, second).tolist(), np.maximum(first, second).tolist()))
+
+
+class QuadtreeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.points = np.random.default_rng(0).random((500, 2)) * [400, 300]
+        self.tree = quadtree.Quadtree(quadtree.Rectangle(200, 150, 200, 150))
+        for i, (x, y) in enumerate(self.points):
+            self.tree.insert(quadtree.Point(x, y, i))
+
+    def test_subdivide_places_each_quadrant(self):
+        node = quadtree.Quadtree(quadtree.Rectangle(10, 20, 8, 4))
+        node.subdivide()
+        centres = [(child.boundary.x, child.boundary.y) for child in (node.nw, node.ne, node.sw, node.se)]
+        self.assertEqual(centres, [(6, 18), (14, 18), (6, 22), (14, 22)])
+
+    def test_every_point_is_kept(self):
+        found = self.tree.query(quadtree.Rectangle(200, 150, 201, 151))
+        self.assertEqual(sorted(point.data for point in found), list(range(len(self.points))))
+
+    def test_query_returns_only_the_domain(self):
+        for domain in (quadtree.Rectangle(50, 60, 20, 10), quadtree.Rectangle(330, 240, 40, 40),
+                       quadtree.Rectangle(200, 150, 3, 3)):
+            found = sorted(point.data for point in self.tree.query(domain))
+            self.assertEqual(found, inside(self.points, domain).tolist())
+
+
+class FlatQuadtreeTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        # A uniform background with a dense cluster, so that some nodes reach a deep level
+        self.points = np.concatenate((rng.random((800, 2)) * [400, 300], rng.normal([100, 100], 3, (200, 2))))
+
+    def test_query_matches_brute_force(self):
+        tree = quadtree.FlatQuadtree(self.points)
+        for domain in (quadtree.Rectangle(100, 100, 5, 5), quadtree.Rectangle(300, 50, 60, 30)):
+            np.testing.assert_array_equal(np.sort(tree.query(domain)), inside(self.points, domain))
+
+    def test_pairs_within_matches_brute_force(self):
+        for radius in (1, 5, 12):
+            with self.subTest(radius=radius):
+                first, second = quadtree.FlatQuadtree(self.points).pairs_within(2 * radius)
+                self.assertTrue(np.all(first < second))
+                self.assertEqual(len(first), len(pair_set(first, second)))
+                self.assertEqual(pair_set(first, second),
+                                 pair_set(*collision.brute_force_pairs(self.points, radius)))
+
+
+if __name__ == '__main__':
+    unittest.main()
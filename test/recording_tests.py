@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'animation'))
+
+import environment
+import health
+import population
+import recording
+
+STATUSES = (health.Status('healthy', 1.0, 0, health.HEALTHY),
+            health.Status('recovered', 1.0, 0, health.RECOVERED),
+            health.Status('dead', 0, 20, health.DEAD),
+            health.Status('infected', 0.8, 100, health.INFECTED))
+
+
+class RecordingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, 'run.rec')
+        self.people = population.People(environment.Area(np.array([300, 200])), 250, 10, 5, [0, 100],
+                                         statuses=STATUSES, rng=np.random.default_rng(6))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, frames):
+        """Records frames 1 to frames, returning the positions, statuses and visibility of every frame."""
+        expected = []
+        with recording.Recorder(self.file, self.people, frames_per_chunk=16, metadata={'seed': 6}) as recorder:
+            for frame in range(1, frames + 1):
+                self.people.update(frame, 60, 'grid', [])
+                self.people.test_population()
+                recorder.add(self.people)
+                expected.append((self.people.store.pos.copy(), self.people.store.status.copy(),
+                                 self.people.visible().copy(), dict(self.people.status_numbers)))
+        return expected
+
+    def test_round_trip(self):
+        expected = self.record(300)
+        replay = recording.Recording(self.file)
+        self.assertEqual(len(replay), 300)
+        self.assertEqual(replay.n_people, 250)
+        self.assertEqual(replay.header['metadata'], {'seed': 6})
+        np.testing.assert_array_equal(replay.dimensions, [300, 200])
+        self.assertEqual(replay.frames.dtype['pos'].base, np.uint16)
+        self.assertEqual(replay.frames.dtype['status'].base, np.uint8)
+
+        # Quantized to uint16, positions clipped to the area are within half a step of a 65535th of the dimensions
+        dimensions = np.array([300, 200])
+        tolerance = 0.5 * dimensions / recording.SCALE + 1e-9
+        hidden_seen = False
+        for frame, (pos, status, visible, status_numbers) in enumerate(expected):
+            self.assertTrue(np.all(np.abs(replay.positions(frame) - np.clip(pos, 0, dimensions)) <= tolerance))
+            statuses = replay.statuses(frame)
+            np.testing.assert_array_equal(statuses[visible], status[visible])
+            np.testing.assert_array_equal(statuses[~visible], recording.HIDDEN)
+            np.testing.assert_array_equal(status[~visible], health.DEAD)
+            self.assertEqual(replay.status_numbers(frame), status_numbers)
+            hidden_seen |= bool((~visible).any())
+        self.assertTrue(hidden_seen)
+
+    def test_truncated_file(self):
+        self.record(40)
+        frame_size = recording.frame_dtype(250).itemsize
+        with open(self.file, 'r+b') as f:
+            f.truncate(os.path.getsize(self.file) - frame_size // 2)
+        self.assertEqual(len(recording.Recording(self.file)), 39)
+        with open(self.file, 'r+b') as f:
+            f.truncate(os.path.getsize(self.file) - 39 * frame_size)
+        self.assertEqual(len(recording.Recording(self.file)), 0)
+
+    def test_not_a_recording(self):
+        with open(self.file, 'wb') as f:
+            f.write(b'NOTAREC!' + bytes(100))
+        with self.assertRaises(ValueError):
+            recording.Recording(self.file)
+
+    def test_population_size_must_not_change(self):
+        with recording.Recorder(self.file, self.people) as recorder:
+            self.people.extract(np.array([0]))
+            with self.assertRaises(ValueError):
+                recorder.add(self.people)
+
+
+if __name__ == '__main__':
+    unittest.main()